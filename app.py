@@ -2,29 +2,295 @@
 import io
 import json
 import re
+import time
 import zipfile
 import base64
+import os
+import cProfile
+import difflib
+import hashlib
+import logging
+import marshal
+import pickle
+import pstats
+import shutil
+import sqlite3
+import tempfile
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from io import BytesIO
 from pathlib import Path
 # [FIX] 타입 힌트(Tuple, List 등) 및 openpyxl 스타일 모듈 임포트 추가
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional, Callable, Union, NamedTuple
 import unicodedata  # 한글 자모 조합(NFC)을 위해 추가
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 import streamlit.components.v1 as components
 
 # openpyxl 및 스타일 관련 모듈 추가
 from openpyxl import load_workbook
+from openpyxl.cell.cell import MergedCell
 from openpyxl.styles import Alignment, Font
 from openpyxl.styles.borders import Border, Side
 from openpyxl.styles.colors import Color
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.numbers import BUILTIN_FORMATS_MAX_SIZE
+from openpyxl.utils.indexed_list import IndexedList
+from openpyxl.worksheet.hyperlink import Hyperlink
 
 # [FIX] ModuleNotFoundError 해결을 위해 RichText 임포트 제거
 # from openpyxl.text.rich_text import RichText
 # from openpyxl.cell.text import Text
 
 
+# =============================================================================
+#
+# 공통: 로깅 / 단계별 계측
+#
+# =============================================================================
+
+logger = logging.getLogger("excel_json_tool")
+if not logger.handlers:
+    # 한 줄 = JSON 1건(구조화 로그)으로 남기기 위해 메시지만 출력
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class StageTimer:
+    """파일 1개 처리의 단계별 소요 시간(초)과 크기(bytes)를 기록"""
+
+    def __init__(self, tool: str = "", file_name: str = ""):
+        self.tool = tool
+        self.file_name = file_name
+        self.stages: List[Dict[str, Any]] = []
+        self.peak_bytes: Optional[int] = None        # tracemalloc 피크(측정 시작 시점 대비)
+        self.rss_delta_bytes: Optional[int] = None   # 프로세스 RSS 증감
+
+    @contextmanager
+    def stage(self, name: str, size: Optional[int] = None):
+        """with timer.stage("save") as info: ... info["bytes"] = n  (크기는 블록 안에서 갱신 가능)"""
+        info = {"stage": name, "seconds": 0.0, "bytes": size}
+        t0 = time.perf_counter()
+        try:
+            yield info
+        finally:
+            info["seconds"] = time.perf_counter() - t0
+            self.stages.append(info)
+
+    def total_seconds(self) -> float:
+        return sum(s["seconds"] for s in self.stages)
+
+    def breakdown_row(self) -> Dict[str, Any]:
+        """표 한 행: 같은 이름의 단계(트랙별 반복 등)는 합산, ms 단위"""
+        row: Dict[str, Any] = {"파일": self.file_name}
+        for s in self.stages:
+            row[s["stage"]] = row.get(s["stage"], 0.0) + s["seconds"] * 1000
+        row["합계"] = self.total_seconds() * 1000
+        if self.peak_bytes is not None:
+            row["피크(MB)"] = self.peak_bytes / MB
+        if self.rss_delta_bytes is not None:
+            row["RSS Δ(MB)"] = self.rss_delta_bytes / MB
+        return row
+
+    def emit_log(self, status: str = "ok"):
+        logger.info(json.dumps({
+            "event": "file_timing",
+            "tool": self.tool,
+            "file": self.file_name,
+            "status": status,
+            "total_s": round(self.total_seconds(), 6),
+            "peak_bytes": self.peak_bytes,
+            "rss_delta_bytes": self.rss_delta_bytes,
+            "stages": [
+                {"stage": s["stage"], "seconds": round(s["seconds"], 6), "bytes": s["bytes"]}
+                for s in self.stages
+            ],
+        }, ensure_ascii=False))
+
+
+def timings_dataframe(timers: List[StageTimer]) -> pd.DataFrame:
+    """배치 단위 단계별 소요 시간(ms) 표 + 마지막 '배치 합계' 행 (메모리 열은 합계 대신 최대값)"""
+    df = pd.DataFrame([t.breakdown_row() for t in timers])
+    if df.empty:
+        return df
+    mem_cols = [c for c in ("피크(MB)", "RSS Δ(MB)") if c in df.columns]
+    cols = [c for c in df.columns if c not in ["파일", "합계"] + mem_cols]
+    df = df[["파일"] + cols + ["합계"] + mem_cols]
+    df[cols + ["합계"]] = df[cols + ["합계"]].fillna(0.0)
+    total = {"파일": "배치 합계"}
+    total.update(df[cols + ["합계"]].sum().to_dict())
+    total.update(df[mem_cols].max().to_dict())
+    return pd.concat([df, pd.DataFrame([total])], ignore_index=True).round(1)
+
+
+# ==========================
+# 메모리 계측 / 배치 메모리 예산
+# ==========================
+MB = 1024 * 1024
+# tracemalloc 실측 기준 대략치: openpyxl 워크북은 템플릿 xlsx 크기의 ~80배, JSON 파싱/채우기는 입력의 ~25배
+TEMPLATE_MEMORY_FACTOR = 80
+INPUT_MEMORY_FACTOR = 25
+DEFAULT_MEMORY_BUDGET_MB = 1024
+
+def current_rss_bytes() -> Optional[int]:
+    """현재 프로세스 RSS (Linux /proc 기준, 그 외 플랫폼은 None)"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+@contextmanager
+def measure_memory(timer: StageTimer, trace: bool = False, rss: bool = True):
+    """rss=True면 RSS 증감, trace=True면 tracemalloc 피크까지 timer에 기록.
+    둘 다 프로세스 전역 값이므로 파일별 수치는 순차 처리일 때만 의미가 있습니다 (병렬이면 rss=False로 호출)."""
+    started = False
+    if trace:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(); started = True
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+    rss0 = current_rss_bytes() if rss else None
+    try:
+        yield
+    finally:
+        if trace:
+            timer.peak_bytes = tracemalloc.get_traced_memory()[1] - base
+            if started:
+                tracemalloc.stop()
+        rss1 = current_rss_bytes() if rss else None
+        if rss0 is not None and rss1 is not None:
+            timer.rss_delta_bytes = rss1 - rss0
+
+def estimate_conversion_bytes(input_size: int, template_size: int) -> int:
+    return TEMPLATE_MEMORY_FACTOR * template_size + INPUT_MEMORY_FACTOR * input_size
+
+class MemoryBudget:
+    """배치 메모리 예산: 파일별 예상 사용량을 예약한 뒤 실행하고, 예산을 넘으면 앞선 파일이 끝날 때까지 대기(=병렬도 축소).
+    예산보다 큰 파일 1개는 단독으로 실행합니다(실패 대신 직렬화)."""
+
+    def __init__(self, limit_bytes: int):
+        self.limit = max(1, int(limit_bytes))
+        self.reserved = 0
+        self._cond = threading.Condition()
+
+    def reserve(self, n: int) -> int:
+        n = min(int(n), self.limit)
+        with self._cond:
+            while self.reserved > 0 and self.reserved + n > self.limit:
+                self._cond.wait()
+            self.reserved += n
+        return n
+
+    def release(self, n: int):
+        with self._cond:
+            self.reserved -= n
+            self._cond.notify_all()
+
+    @contextmanager
+    def hold(self, n: int):
+        held = self.reserve(n)
+        try:
+            yield held
+        finally:
+            self.release(held)
+
+class ResultStore:
+    """변환 결과(파일명 → bytes) 보관소. 메모리 보관량이 한도를 넘으면 이후 결과는 임시 폴더에 기록."""
+
+    def __init__(self, memory_limit_bytes: int):
+        self.memory_limit = memory_limit_bytes
+        self.memory_bytes = 0
+        self._mem: Dict[str, bytes] = {}
+        self._disk: Dict[str, Path] = {}
+        self._order: List[str] = []
+        self._spill_dir: Optional[Path] = None
+        self._lock = threading.Lock()
+
+    def put(self, name: str, data: bytes):
+        with self._lock:
+            if name not in self._mem and name not in self._disk:
+                self._order.append(name)
+            self._discard(name)
+            if self.memory_bytes + len(data) <= self.memory_limit:
+                self._mem[name] = data
+                self.memory_bytes += len(data)
+            else:
+                if self._spill_dir is None:
+                    self._spill_dir = Path(tempfile.mkdtemp(prefix="excel_json_results_"))
+                path = self._spill_dir / f"{len(self._order)}_{sanitize_filename_component(name)}"
+                path.write_bytes(data)
+                self._disk[name] = path
+
+    def _discard(self, name: str):
+        if name in self._mem:
+            self.memory_bytes -= len(self._mem.pop(name))
+        path = self._disk.pop(name, None)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def get(self, name: str) -> bytes:
+        if name in self._mem:
+            return self._mem[name]
+        return self._disk[name].read_bytes()
+
+    def loader(self, name: str):
+        """st.download_button(data=...)용 지연 로더 (디스크 결과는 클릭 시에만 읽음)"""
+        if name in self._mem:
+            return self._mem[name]
+        path = self._disk[name]
+        return lambda: path.read_bytes()
+
+    def names(self) -> List[str]:
+        return list(self._order)
+
+    def spilled_count(self) -> int:
+        return len(self._disk)
+
+    def __len__(self):
+        return len(self._order)
+
+    def __bool__(self):
+        return bool(self._order)
+
+    def items(self):
+        for name in self._order:
+            yield name, self.get(name)
+
+    def close(self):
+        with self._lock:
+            self._mem.clear(); self._disk.clear(); self._order.clear()
+            self.memory_bytes = 0
+            if self._spill_dir is not None:
+                shutil.rmtree(self._spill_dir, ignore_errors=True)
+                self._spill_dir = None
+
+def write_zip_from_store(store: "ResultStore") -> bytes:
+    """결과 전체를 ZIP으로 (디스크 결과는 한 개씩 읽어 추가)"""
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name in store.names():
+            zf.writestr(name, store.get(name))
+    return zip_buffer.getvalue()
+
+
+def profile_call(fn, *args, **kwargs):
+    """cProfile로 fn 1회 실행 → (결과, .prof 바이트(pstats 호환), 누적시간 상위 40개 텍스트)"""
+    prof = cProfile.Profile()
+    result = prof.runcall(fn, *args, **kwargs)
+    prof.create_stats()
+    out = io.StringIO()
+    pstats.Stats(prof, stream=out).sort_stats("cumulative").print_stats(40)
+    return result, marshal.dumps(prof.stats), out.getvalue()
+
+
 # =============================================================================
 #
 # 스크립트 1 (Excel → JSON) 헬퍼 함수
@@ -171,6 +437,24 @@ def excel_to_json_records(df: pd.DataFrame):
     return records
 
 
+def convert_excel_to_json_text(excel_file, timer: Optional[StageTimer] = None) -> str:
+    """엑셀(파일 경로/파일 객체) → 도구 1 JSON 문자열 (UI 밖에서 쓰는 진입점)"""
+    return convert_excel_to_records(excel_file, timer)[1]
+
+def convert_excel_to_records(excel_file, timer: Optional[StageTimer] = None) -> Tuple[List[Dict[str, Any]], str]:
+    """엑셀 → (도구 1 레코드, JSON 문자열)"""
+    timer = timer or StageTimer()
+    with timer.stage("read_excel"):
+        # [FIX] pandas가 openpyxl을 사용하도록 engine 명시
+        df = pd.read_excel(excel_file, header=None, engine='openpyxl')
+    with timer.stage("excel_to_json_records"):
+        records = excel_to_json_records(df)
+    with timer.stage("json_dumps") as info:
+        json_str = json.dumps(records, ensure_ascii=False, indent=2)
+        info["bytes"] = len(json_str)
+    return records, json_str
+
+
 # =============================================================================
 #
 # 스크립트 2 (JSON → Excel) 헬퍼 함수
@@ -186,6 +470,10 @@ TEMPLATE_DIR = APP_DIR / "templates"
 DEFAULT_TEMPLATE_NONTRACK = "Non Track_Paper Interview_상위조직명_직무명(포맷).xlsx"
 DEFAULT_TEMPLATE_TRACK    = "Track_Paper Interview_상위조직명_직무명(포맷).xlsx"
 
+# 도구 2 모드: Non Track + Track은 TXT를 한 번 읽어 두 워크북을 모두 생성
+OUTPUT_MODES = ("Non Track", "Track")
+MODE_BOTH = "Non Track + Track"
+
 # Non Track 쓰기 범위
 TASK_START_ROW_NT, TASK_END_ROW_NT   = 5, 14    # Task: A(이름), C(설명)
 SKILL_START_ROW_NT, SKILL_END_ROW_NT = 5, 11    # Skill: A/B/D/F
@@ -263,6 +551,49 @@ def with_wrap(cell):
         indent=a.indent
     )
 
+class ParsedTemplate:
+    """한 번 파싱한 템플릿 워크북을 pickle로 보관해 두고, 작업마다 load_workbook(XML 파싱) 대신 복제본을 만듭니다.
+    (unpickle이 load_workbook보다 수 배 빠름. pickle/복원이 안 되는 템플릿이나 openpyxl 버전은 원본 bytes로 다시 로드)"""
+
+    def __init__(self, template_bytes: bytes):
+        self.template_bytes = template_bytes
+        try:
+            self._pickled: Optional[bytes] = pickle.dumps(load_workbook(BytesIO(template_bytes)),
+                                                          protocol=pickle.HIGHEST_PROTOCOL)
+            self._unpickle()  # 복원까지 한 번 확인 (openpyxl 내부 구조가 다르면 여기서 실패)
+        except Exception as e:
+            logger.warning(f"템플릿 캐시 생성 실패, 매번 새로 로드합니다: {e}")
+            self._pickled = None
+
+    def __len__(self):
+        return len(self.template_bytes)
+
+    def _unpickle(self):
+        wb = pickle.loads(self._pickled)
+        # DimensionHolder(defaultdict)는 pickle 시 worksheet/default_factory 바인딩을 잃으므로 다시 연결
+        # (openpyxl 내부 속성에 기대므로 실패하면 호출한 쪽에서 load_workbook으로 대체)
+        for ws in wb.worksheets:
+            for holder, factory in ((ws.row_dimensions, ws._add_row), (ws.column_dimensions, ws._add_column)):
+                holder.worksheet = ws
+                holder.default_factory = factory
+        return wb
+
+    def new_workbook(self):
+        if self._pickled is not None:
+            try:
+                return self._unpickle()
+            except Exception as e:
+                logger.warning(f"템플릿 캐시 복원 실패, 이후로는 매번 새로 로드합니다: {e}")
+                self._pickled = None
+        return load_workbook(BytesIO(self.template_bytes))
+
+TemplateSource = Union[bytes, ParsedTemplate]
+
+def open_template_workbook(template: TemplateSource):
+    if isinstance(template, ParsedTemplate):
+        return template.new_workbook()
+    return load_workbook(BytesIO(template))
+
 def set_text(ws, coord: str, text: str, wrap: bool = True):
     cell = ws[coord]
     cell.value = text
@@ -278,7 +609,11 @@ def load_json_from_txt_bytes(b: bytes) -> Dict[str, Any]:
         start = txt.find("{")
         end = txt.rfind("}")
         if start != -1 and end != -1 and start < end:
-            return json.loads(txt[start:end+1])
+            try:
+                return json.loads(txt[start:end+1])
+            except json.JSONDecodeError as e:
+                # 줄/열 위치가 추출한 블록이 아니라 원래 파일 기준이 되도록 다시 만듦
+                raise json.JSONDecodeError(e.msg, txt, start + e.pos) from None
         raise
 
 def collect_tasks_nt(obj: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -295,35 +630,134 @@ def iter_skills_nt(obj: Dict[str, Any]):
     # 1. "도구 2"의 복잡한 형식 ({"skills": [...]})
     if isinstance(obj, dict) and "skills" in obj:
         skills = obj.get("skills") or []
+        interned: Dict[Tuple[Any, Any, Any], RelatedTask] = {}
         for item in skills:
             if isinstance(item, dict) and "skill" in item:
                 s = item.get("skill") or {}
-                name = s.get("name", "")
-                definition = s.get("definition", "")
-                stack = s.get("tech_stack", {})
+                s = s if isinstance(s, dict) else {}
                 related = item.get("related_tasks") or s.get("related_tasks") or []
             else:
                 s = item if isinstance(item, dict) else {}
-                name = s.get("name", "")
-                definition = s.get("definition", "")
-                stack = s.get("tech_stack", {})
                 related = s.get("related_tasks") or []
-            yield {"name": name, "definition": definition, "tech_stack": stack, "related_tasks": related}
+            yield SkillRecord(s.get("name", ""), s.get("definition", ""), tech_stack_of(s.get("tech_stack")),
+                              related_tasks_of(related, interned))
     
-    # 2. "도구 1"의 간단한 형식 (List[Task])
+    # 2. "도구 1"의 간단한 형식 (List[Task]) — 관련 Task 정보 없음
     elif isinstance(obj, list):
         for item in obj:
             if isinstance(item, dict):
-                name = item.get("task_name", "")
-                definition = item.get("task_description", "")
-                stack = item.get("tech_stack", {})
-                related = [] # "도구 1" 형식에는 관련 Task 정보가 없음
-                yield {"name": name, "definition": definition, "tech_stack": stack, "related_tasks": related}
+                yield SkillRecord(item.get("task_name", ""), item.get("task_description", ""),
+                                  tech_stack_of(item.get("tech_stack")), ())
     
     # 3. 그 외 (빈 값 반환)
     else:
         return
 
+# ---- 입력 레코드 (JSON을 파일당 한 번만 정규화) ----
+# 빌더는 아래 레코드만 읽습니다. {'skill': {...}} 래핑/평평한 dict/도구 1 list 구분과
+# tech_stack 키 정리는 job_input()에서 한 번만 하고, 원본 dict는 변환 전에 버릴 수 있습니다.
+class TechStack:
+    """tech_stack dict 래퍼. Non Track은 키 대소문자를 무시(get_lower), Track은 원래 키(get)로 찾음"""
+    __slots__ = ("raw",)
+
+    def __init__(self, raw: Optional[Dict[str, Any]] = None):
+        self.raw = raw or {}
+
+    def get(self, key: str, default=None):
+        return self.raw.get(key, default)
+
+    def get_lower(self, key: str, default=None):
+        found = default
+        for k, v in self.raw.items():  # 소문자로 겹치는 키는 뒤에 나온 값이 우선
+            if str(k).lower() == key:
+                found = v
+        return found
+
+    def items(self):
+        return self.raw.items()
+
+    def values(self):
+        return self.raw.values()
+
+    def __bool__(self):
+        return bool(self.raw)
+
+EMPTY_TECH_STACK = TechStack()
+
+class RelatedTask(NamedTuple):
+    task_id: Any
+    name: Any
+    track_name: Any
+
+class TaskRecord(NamedTuple):
+    task_id: Any
+    name: Any
+    description: Any
+    track_name: Any
+    track_code: Any
+    tech_stack: TechStack
+
+class SkillRecord(NamedTuple):
+    name: Any
+    definition: Any
+    tech_stack: TechStack
+    related: Tuple[RelatedTask, ...]
+
+class TrackInfo(NamedTuple):
+    index: int
+    name: Any
+    code: Any
+
+class JobInput(NamedTuple):
+    tasks: Tuple[TaskRecord, ...]
+    skills: Tuple[SkillRecord, ...]
+    tracks: Tuple[TrackInfo, ...]
+
+def tech_stack_of(raw: Any) -> TechStack:
+    return TechStack(raw) if raw and isinstance(raw, dict) else EMPTY_TECH_STACK
+
+def related_tasks_of(raw: Any, interned: Dict[Tuple[Any, Any, Any], RelatedTask]) -> Tuple[RelatedTask, ...]:
+    """related_tasks → RelatedTask 튜플. 여러 스킬이 같은 Task를 가리키므로 interned로 객체를 공유"""
+    out = []
+    for rt in raw or ():
+        if not isinstance(rt, dict):
+            continue
+        tr = rt.get("track")
+        key = (rt.get("task_id"), rt.get("task_name"), tr.get("name") if isinstance(tr, dict) else None)
+        rec = interned.get(key)
+        if rec is None:
+            rec = interned[key] = RelatedTask(*key)
+        out.append(rec)
+    return tuple(out)
+
+def job_input(data: Any) -> JobInput:
+    """도구 2 JSON(dict) 또는 도구 1 Task 목록(list) → JobInput"""
+    if isinstance(data, JobInput):
+        return data
+    tasks = []
+    for t in collect_tasks_nt(data):
+        if not isinstance(t, dict):
+            continue
+        tr = t.get("track")
+        tr = tr if isinstance(tr, dict) else {}
+        tasks.append(TaskRecord(t.get("task_id"), t.get("task_name"), t.get("task_description"),
+                                tr.get("name"), tr.get("code"), tech_stack_of(t.get("tech_stack"))))
+    skills = tuple(iter_skills_nt(data))
+    tracks = []
+    meta_tracks = (((data.get("meta") or {}).get("tracks")) or []) if isinstance(data, dict) else []
+    if meta_tracks:
+        for idx, tr in enumerate(meta_tracks, start=1):
+            tr = tr if isinstance(tr, dict) else {}
+            tracks.append(TrackInfo(idx, tr.get("track_name"), tr.get("track_code")))
+    else:
+        # 트랙 목록이 없으면 tasks[].track 순서대로
+        seen = set()
+        for t in tasks:
+            if t.track_name and (t.track_name, t.track_code) not in seen:
+                seen.add((t.track_name, t.track_code))
+                tracks.append(TrackInfo(len(tracks) + 1, t.track_name, t.track_code))
+    return JobInput(tuple(tasks), skills, tuple(tracks))
+
 def normalize_list(val) -> List[str]:
     if val is None:
         return []
@@ -339,21 +773,19 @@ def normalize_list(val) -> List[str]:
             parts.append(chunk)
     return parts
 
-def extract_tech_lines_nt(tech_stack: Dict[str, Any]) -> str:
-    if not isinstance(tech_stack, dict):
-        tech_stack = {}
-    lower_map = {str(k).lower(): v for k, v in tech_stack.items()}
+def extract_tech_lines_nt(tech_stack: TechStack) -> str:
+    get = tech_stack.get_lower  # 키 대소문자 무시
     
     # "도구 2" 형식 키
-    languages = normalize_list(lower_map.get("language") or lower_map.get("languages"))
-    os_list   = normalize_list(lower_map.get("os") or lower_map.get("platform") or lower_map.get("operating_system"))
-    tools     = normalize_list(lower_map.get("tools") or lower_map.get("tool"))
+    languages = normalize_list(get("language") or get("languages"))
+    os_list   = normalize_list(get("os") or get("platform") or get("operating_system"))
+    tools     = normalize_list(get("tools") or get("tool"))
 
     # [FIX] "도구 1"의 추가 키 지원 (audio, data, etc)
     # (languages, tools는 겹치므로 위에서 이미 처리됨)
-    audio = normalize_list(lower_map.get("audio_processing") or lower_map.get("audio"))
-    data = normalize_list(lower_map.get("data_handling") or lower_map.get("data"))
-    etc = normalize_list(lower_map.get("etc"))
+    audio = normalize_list(get("audio_processing") or get("audio"))
+    data = normalize_list(get("data_handling") or get("data"))
+    etc = normalize_list(get("etc"))
 
     lines = []
     if languages: lines.append(f"* language: {', '.join(languages)}")
@@ -370,86 +802,212 @@ def bullet_lines(items: List[str]) -> str:
     items = [str(i).strip() for i in items if str(i).strip()]
     return "\n".join(f"* {i}" for i in items)
 
-def related_task_names_nt(related_tasks: List[Dict[str, Any]], task_id_to_name: Dict[str, str]) -> List[str]:
+def related_task_names_nt(related_tasks: Tuple[RelatedTask, ...], task_id_to_name: Dict[str, str]) -> List[str]:
     names = []
-    for rt in related_tasks or []:
-        name = (rt.get("task_name") or "").strip()
+    for rt in related_tasks:
+        name = (rt.name or "").strip()
         if not name:
-            tid = (rt.get("task_id") or "").strip()
+            tid = (rt.task_id or "").strip()
             if tid and tid in task_id_to_name:
                 name = task_id_to_name[tid]
         if name:
             names.append(name)
     return names
 
-def build_workbook_nontrack(template_bytes: bytes, org: str, role: str, data: Dict[str, Any]) -> BytesIO:
+def build_workbook_nontrack(template_bytes: TemplateSource, org: str, role: str, data: Union[Dict[str, Any], JobInput],
+                            timer: Optional[StageTimer] = None) -> BytesIO:
     """템플릿 서식 유지, 값만 주입"""
-    wb = load_workbook(BytesIO(template_bytes))
+    timer = timer or StageTimer()
+    data = job_input(data)
+    with timer.stage("load_template", len(template_bytes)):
+        wb = open_template_workbook(template_bytes)
     ws_task  = wb["Task"] if "Task" in wb.sheetnames else wb[wb.sheetnames[0]]
     ws_skill = wb["Skill"] if "Skill" in wb.sheetnames else wb[wb.sheetnames[1]]
 
+    with timer.stage("fill_task"):
+        fill_task_sheet_nt(ws_task, org, role, data)
+    with timer.stage("fill_skill"):
+        fill_skill_sheet_nt(ws_skill, org, role, data)
+
+    apply_vba_styles(wb, timer)
+    return save_workbook_to_bytesio(wb, timer)
+
+def fill_task_sheet_nt(ws_task, org: str, role: str, data: Union[Dict[str, Any], JobInput]):
+    for coord, text in task_sheet_values_nt(org, role, data).items():
+        set_text(ws_task, coord, text)
+
+def fill_skill_sheet_nt(ws_skill, org: str, role: str, data: Union[Dict[str, Any], JobInput]):
+    for coord, text in skill_sheet_values_nt(org, role, data).items():
+        set_text(ws_skill, coord, text)
+
+def task_sheet_values_nt(org: str, role: str, data: Union[Dict[str, Any], JobInput]) -> Dict[str, str]:
+    """Task 시트에 쓸 값 {셀: 텍스트} — B1/B2와 A/C열 전체(빈 행은 "")"""
     # Task
-    set_text(ws_task, "B1", org) # B1, B2는 VBA 수정 함수에서 한글 교정됨
-    set_text(ws_task, "B2", role)
-    
-    # [FIX] 유연해진 파서 사용
-    tasks = collect_tasks_nt(data)
-    
-    task_id_to_name = {}
-    for t in tasks:
-        tid = str(t.get("task_id") or "").strip()
-        tname = str(t.get("task_name") or "").strip()
-        # [FIX] "도구 1" 형식을 위해, task_name도 맵에 추가 (related_tasks 조회용)
-        if tname:
-            task_id_to_name[tname] = tname
-        if tid and tname:
-            task_id_to_name[tid] = tname
-            
+    values = {"B1": org, "B2": role} # B1, B2는 VBA 수정 함수에서 한글 교정됨
+    tasks = job_input(data).tasks
+
     row = TASK_START_ROW_NT
     for t in tasks[: (TASK_END_ROW_NT - TASK_START_ROW_NT + 1) ]:
-        set_text(ws_task, f"A{row}", str(t.get("task_name") or "").strip())
-        set_text(ws_task, f"C{row}", str(t.get("task_description") or "").strip())
+        values[f"A{row}"] = str(t.name or "").strip()
+        values[f"C{row}"] = str(t.description or "").strip()
         row += 1
     for r in range(row, TASK_END_ROW_NT + 1):
-        set_text(ws_task, f"A{r}", ""); set_text(ws_task, f"C{r}", "")
+        values[f"A{r}"] = ""; values[f"C{r}"] = ""
+    return values
+
+def skill_sheet_values_nt(org: str, role: str, data: Union[Dict[str, Any], JobInput]) -> Dict[str, str]:
+    """Skill 시트에 쓸 값 {셀: 텍스트} — B1/B2와 A/B/D/F열 전체(빈 행은 "")"""
+    data = job_input(data)
+    task_id_to_name = task_id_to_name_nt(data.tasks)
 
     # Skill
-    set_text(ws_skill, "B1", org) # B1, B2는 VBA 수정 함수에서 한글 교정됨
-    set_text(ws_skill, "B2", role)
+    values = {"B1": org, "B2": role} # B1, B2는 VBA 수정 함수에서 한글 교정됨
     processed = 0
     max_rows = SKILL_END_ROW_NT - SKILL_START_ROW_NT + 1
     
-    # [FIX] 유연해진 파서 사용 (list(..)로 제너레이터 실행)
-    for s in iter_skills_nt(data):
+    for s in data.skills:
         if processed >= max_rows: break
         r = SKILL_START_ROW_NT + processed
-        rel_names = related_task_names_nt(s.get("related_tasks"), task_id_to_name)
-        set_text(ws_skill, f"A{r}", bullet_lines(rel_names) if rel_names else "")
-        set_text(ws_skill, f"B{r}", str(s.get("name") or "").strip())
-        set_text(ws_skill, f"D{r}", strip_markers(s.get("definition")))
-        set_text(ws_skill, f"F{r}", extract_tech_lines_nt(s.get("tech_stack")))
+        rel_names = related_task_names_nt(s.related, task_id_to_name)
+        values[f"A{r}"] = bullet_lines(rel_names) if rel_names else ""
+        values[f"B{r}"] = str(s.name or "").strip()
+        values[f"D{r}"] = strip_markers(s.definition)
+        values[f"F{r}"] = extract_tech_lines_nt(s.tech_stack)
         processed += 1
     for r in range(SKILL_START_ROW_NT + processed, SKILL_END_ROW_NT + 1):
         for c in ("A","B","D","F"):
-            set_text(ws_skill, f"{c}{r}", "")
-
-    # --- VBA 스타일 적용 ---
-    apply_vba_description_edits(wb)
-    apply_vba_extra_borders_and_dims(wb)
-    apply_vba_global_font(wb, "현대하모니 L")
-    apply_vba_korean_fix_to_headers(wb) # B1, B2 한글 교정
-    # --- ---
-
-    bio = BytesIO(); wb.save(bio); bio.seek(0); return bio
-
-def process_uploaded_txt_nontrack(uploaded_file, template_bytes: bytes):
-    org, role_display, role_for_filename = parse_org_role_from_filename_nt(uploaded_file.name)
-    safe_org  = sanitize_filename_component(org, "org")
-    safe_role = sanitize_filename_component(role_for_filename, "role")
-    out_name = f"Non Track_Paper Interview_{safe_org}_{safe_role}.xlsx"
-    data = load_json_from_txt_bytes(uploaded_file.read())
+            values[f"{c}{r}"] = ""
+    return values
+
+def task_id_to_name_nt(tasks: Tuple[TaskRecord, ...]) -> Dict[str, str]:
+    task_id_to_name = {}
+    for t in tasks:
+        tid = str(t.task_id or "").strip()
+        tname = str(t.name or "").strip()
+        # [FIX] "도구 1" 형식을 위해, task_name도 맵에 추가 (related_tasks 조회용)
+        if tname:
+            task_id_to_name[tname] = tname
+        if tid and tname:
+            task_id_to_name[tid] = tname
+    return task_id_to_name
+
+def apply_vba_styles(wb, timer: Optional[StageTimer] = None):
+    """VBA 서식 패스를 순서대로 적용 (단계별 시간 기록)"""
+    timer = timer or StageTimer()
+    with timer.stage("vba_description"):
+        apply_vba_description_edits(wb)
+    with timer.stage("vba_borders"):
+        apply_vba_extra_borders_and_dims(wb)
+    with timer.stage("vba_font"):
+        apply_vba_global_font(wb, "현대하모니 L")
+    with timer.stage("vba_korean_fix"):
+        apply_vba_korean_fix_to_headers(wb) # B1, B2 한글 교정
+
+# 스타일 표 정리 대상: (StyleArray 필드, 워크북 목록, 항상 남길 앞쪽 기본 항목 수)
+# Excel은 글꼴/테두리 0번, 채우기 0·1번(none, gray125)을 기본값으로 읽으므로 사용 여부와 무관하게 유지
+STYLE_TABLES = (("fontId", "_fonts", 1), ("fillId", "_fills", 2), ("borderId", "_borders", 1),
+                ("alignmentId", "_alignments", 1), ("protectionId", "_protections", 1))
+COMPACT_STYLES = True  # False면 저장 전 정리 생략 (bench 비교용)
+
+def compact_styles(wb) -> Dict[str, Tuple[int, int]]:
+    """저장 직전 스타일 표 정리: 셀·행·열·이름 있는 스타일이 실제로 쓰는 글꼴/채우기/테두리/맞춤/보호/숫자 형식과
+    cellXfs만 남기고, 값이 같은 항목은 하나로 합칩니다 (템플릿에서 온 미사용 항목, 삭제된 원본 시트, 서식 패스가 바꿔 둔 이전 값).
+    → {목록 이름: (정리 전, 정리 후 개수)}"""
+    styled: List[StyleArray] = []
+    for ws in wb.worksheets:
+        styled += [c._style for c in ws._cells.values() if c.has_style]
+        for dims in (ws.row_dimensions, ws.column_dimensions):
+            styled += [d._style for d in dims.values() if d.has_style]
+    default = StyleArray(wb._cell_styles[0]) if len(wb._cell_styles) else StyleArray()
+    tables = [name for _, name, _ in STYLE_TABLES] + ["_number_formats", "_cell_styles"]
+    before = {name: len(getattr(wb, name)) for name in tables}
+
+    fresh: Dict[str, IndexedList] = {}
+    for _, name, keep in STYLE_TABLES:
+        fresh[name] = IndexedList()
+        for item in getattr(wb, name)[:keep]:
+            fresh[name].add(item)
+    formats = IndexedList()
+    remapped: Dict[Tuple[int, ...], StyleArray] = {}
+    done: set = set()  # 여러 셀이 같은 StyleArray를 공유해도 한 번만 바꿈
+    for style in [default] + styled:
+        if id(style) in done:
+            continue
+        done.add(id(style))
+        key = tuple(style)
+        new = remapped.get(key)
+        if new is None:
+            new = remapped[key] = StyleArray(style)
+            for field, name, _ in STYLE_TABLES:
+                setattr(new, field, fresh[name].add(getattr(wb, name)[getattr(style, field)]))
+            if style.numFmtId >= BUILTIN_FORMATS_MAX_SIZE:  # 사용자 지정 형식만 목록에 있음
+                code = wb._number_formats[style.numFmtId - BUILTIN_FORMATS_MAX_SIZE]
+                new.numFmtId = formats.add(code) + BUILTIN_FORMATS_MAX_SIZE
+        style[:] = new
+
+    for name, items in fresh.items():
+        setattr(wb, name, items)
+    wb._number_formats = formats
+    wb._cell_styles = IndexedList([default])  # cellXfs 0번 = 스타일 없는 셀의 기본값
+    for style in styled:
+        wb._cell_styles.add(style)
+    for named in wb._named_styles:  # 이름 있는 스타일은 자기 글꼴 등을 새 목록에 다시 등록
+        named.bind(wb)
+    return {name: (before[name], len(getattr(wb, name))) for name in tables}
+
+def save_workbook_to_bytesio(wb, timer: Optional[StageTimer] = None) -> BytesIO:
+    timer = timer or StageTimer()
+    if COMPACT_STYLES:
+        with timer.stage("compact_styles"):
+            compact_styles(wb)
+    with timer.stage("save") as info:
+        bio = BytesIO(); wb.save(bio)
+        info["bytes"] = bio.tell()
+    bio.seek(0); return bio
+
+class NamedBytesIO(BytesIO):
+    """st.UploadedFile과 같은 인터페이스(name/size/read)를 갖는 메모리 파일 (UI 밖 호출용)"""
+
+    def __init__(self, name: str, data: bytes):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+def read_uploaded_json(uploaded_file, timer: StageTimer) -> JobInput:
+    with timer.stage("read_input") as info:
+        raw = uploaded_file.read()
+        info["bytes"] = len(raw)
+    with timer.stage("parse_json", len(raw)):
+        return job_input(load_json_from_txt_bytes(raw))
+
+def process_uploaded_txt_nontrack(uploaded_file, template_bytes: TemplateSource, timer: Optional[StageTimer] = None):
+    timer = timer or StageTimer("Non Track", uploaded_file.name)
+    out_name, (org, role_display) = txt_output_identity(uploaded_file.name, "Non Track")
+    data = read_uploaded_json(uploaded_file, timer)
     # build_workbook_nontrack 내부에서 VBA 스타일 적용
-    wb_bytes = build_workbook_nontrack(template_bytes, org, role_display, data)
+    wb_bytes = build_workbook_nontrack(template_bytes, org, role_display, data, timer=timer)
+    return out_name, wb_bytes
+
+def process_excel_to_nontrack(excel_file, template_bytes: TemplateSource, timer: Optional[StageTimer] = None,
+                              json_sink: Optional[Callable[[str, str], None]] = None, json_name: Optional[str] = None):
+    """원본 엑셀 → Non Track 워크북 (TXT 왕복 없이 도구 1 레코드를 그대로 빌더에 넘김).
+    Non Track 파서가 도구 1 list 형식을 직접 읽으므로 별도 변환은 없고, 파일명 규칙은 엑셀 파일명에 적용합니다.
+    json_sink(파일명, JSON 문자열)를 넘긴 경우에만 중간 JSON 텍스트를 만듭니다.
+    json_name은 배치에서 충돌 없이 확정한 JSON 파일명 (없으면 엑셀 파일명 기준)"""
+    timer = timer or StageTimer("Excel→Non Track", excel_file.name)
+    out_name, (org, role_display) = txt_output_identity(excel_file.name, "Non Track")
+    with timer.stage("read_excel") as info:
+        raw = upload_bytes(excel_file)
+        info["bytes"] = len(raw)
+        # [FIX] pandas가 openpyxl을 사용하도록 engine 명시
+        df = pd.read_excel(BytesIO(raw), header=None, engine='openpyxl')
+    with timer.stage("excel_to_json_records"):
+        records = excel_to_json_records(df)
+    if json_sink is not None:
+        with timer.stage("json_dumps"):
+            json_sink(json_name or json_output_identity(excel_file.name)[0],
+                      json.dumps(records, ensure_ascii=False, indent=2))
+    wb_bytes = build_workbook_nontrack(template_bytes, org, role_display, job_input(records), timer=timer)
     return out_name, wb_bytes
 
 # ==========================
@@ -525,59 +1083,37 @@ def copy_sheet_by_template(wb, template_sheet_name: str, new_title: str):
     return new_ws
 
 # ---- 트랙 데이터 선택 ----
-def select_tasks_for_track(all_tasks: List[Dict[str, Any]], track_name: str, limit: int) -> List[Dict[str, Any]]:
-    sel = [t for t in (all_tasks or []) if ((t.get("track") or {}).get("name")) == track_name]
-    return sel[:limit]
-
-def get_skill_field(s: Dict[str, Any], key: str, default=None):
-    """스킬 항목이 {'skill': {...}} 또는 평평한 dict 모두 지원"""
-    if isinstance(s, dict) and "skill" in s and isinstance(s["skill"], dict):
-        return s["skill"].get(key, default)
-    return s.get(key, default)
-
-def get_skill_related_tasks(s: Dict[str, Any]):
-    if isinstance(s, dict) and "skill" in s:
-        return s.get("related_tasks") or s["skill"].get("related_tasks") or []
-    return s.get("related_tasks") or []
-
-def get_skill_track(s: Dict[str, Any]) -> Dict[str, Any]:
-    # 주로 최상위에 'track'이 온다고 가정
-    return s.get("track") or {}
-
-def select_skills_for_track(all_skills: List[Dict[str, Any]], track_name: str, track_code: str, limit: int) -> List[Dict[str, Any]]:
-    matched = []
-    for s in all_skills or []:
-        tr = get_skill_track(s) or {}
-        scope = s.get("track_scope")
-        name_match = (tr.get("name") == track_name) or (tr.get("code") == track_code)
-        if name_match:
-            matched.append(s); continue
-        if scope == "common":
-            for rt in get_skill_related_tasks(s) or []:
-                trt = (rt.get("track") or {})
-                if (trt.get("name") == track_name) or (trt.get("code") == track_code):
-                    matched.append(s); break
+def tasks_by_track(all_tasks: Tuple[TaskRecord, ...]) -> Dict[Any, List[TaskRecord]]:
+    """트랙명 → Task 목록 (트랙마다 전체 Task를 다시 훑지 않도록 한 번만 묶음)"""
+    grouped: Dict[Any, List[TaskRecord]] = {}
+    for t in all_tasks:
+        grouped.setdefault(t.track_name, []).append(t)
+    return grouped
+
+def select_tasks_for_track(grouped: Dict[Any, List[TaskRecord]], track_name: str, limit: int) -> List[TaskRecord]:
+    return grouped.get(track_name, [])[:limit]
+
+def select_skills_for_track(all_skills: Tuple[SkillRecord, ...], track_name: str, track_code: str, limit: int) -> List[SkillRecord]:
+    # 스킬 항목에는 track/track_scope/rank가 넘어오지 않으므로(iter_skills_nt) 스킬 쪽 트랙은 항상 비어 있음.
+    # 기존 동작 그대로: 트랙명 또는 코드가 비어 있는 트랙에만 스킬이 매칭되고, 순서는 입력 순서
+    if track_name is not None and track_code is not None:
+        return []
     # 중복 제거(스킬명 기준)
     uniq, seen = [], set()
-    for s in matched:
-        sk_name = (get_skill_field(s, "name") or "").strip()
+    for s in all_skills:
+        sk_name = (s.name or "").strip()
         if sk_name and sk_name not in seen:
             seen.add(sk_name); uniq.append(s)
-    # rank 오름차순, None은 뒤
-    def rank_key(s):
-        r = get_skill_field(s, "rank")
-        return (r is None, r if r is not None else 10**9)
-    uniq.sort(key=rank_key)
+            if len(uniq) >= limit: break
     return uniq[:limit]
 
 # ---- 트랙 본문 가공 ----
-def bullets_from_related_tasks(related_tasks: List[Dict[str, Any]], current_track_name: str) -> str:
+def bullets_from_related_tasks(related_tasks: Tuple[RelatedTask, ...], current_track_name: str) -> str:
     if not related_tasks: return ""
     names, seen = [], set()
     for rt in related_tasks:
-        tname = (rt or {}).get("task_name")
-        ttrack = ((rt or {}).get("track") or {}).get("name")
-        if tname and (ttrack == current_track_name) and (tname not in seen):
+        tname = rt.name
+        if tname and (rt.track_name == current_track_name) and (tname not in seen):
             seen.add(tname); names.append(tname)
     return "\n".join(f"* {n}" for n in names)
 
@@ -588,8 +1124,7 @@ def listify_tech_value(v) -> List[str]:
     # 문자열이면 구분자로 분리
     return [strip_markers(x.strip()) for x in re.split(r"[;,/]", str(v)) if x.strip()]
 
-def bullets_from_tech_stack(tech_stack: Dict[str, Any]) -> str:
-    tech_stack = tech_stack or {}
+def bullets_from_tech_stack(tech_stack: TechStack) -> str:
     lines = []
     for key in ("language", "os", "tools"):
         vals = tech_stack.get(key)
@@ -600,109 +1135,1790 @@ def bullets_from_tech_stack(tech_stack: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 # ---- 트랙 시트 쓰기 ----
-def write_task_sheet(ws, org_name: str, job_name: str, track_name: str, tasks: List[Dict[str, Any]]):
-    ws["B1"].value = org_name # B1, B2는 VBA 수정 함수에서 한글 교정됨
-    ws["B2"].value = job_name
+# 트랙 시트에서 줄바꿈을 적용하는 열
+TASK_WRAP_COLS_T  = ("C",)
+SKILL_WRAP_COLS_T = ("A", "D", "F")
+
+def write_task_sheet(ws, org_name: str, job_name: str, track_name: str, tasks: List[TaskRecord]):
+    ensure_merge(ws, TRACK_TITLE_RANGE_T)
+    write_track_values(ws, task_sheet_values_t(org_name, job_name, track_name, tasks), TASK_WRAP_COLS_T)
+    set_vertical_center_all(ws)
+
+def write_skill_sheet(ws, org_name: str, job_name: str, track_name: str, skills: List[SkillRecord]):
     ensure_merge(ws, TRACK_TITLE_RANGE_T)
-    ws["D1"].value = track_name
-    ws["D1"].alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    write_track_values(ws, skill_sheet_values_t(org_name, job_name, track_name, skills), SKILL_WRAP_COLS_T)
+    set_vertical_center_all(ws)
+
+def write_track_values(ws, values: Dict[str, Any], wrap_cols: Tuple[str, ...]):
+    for coord, value in values.items():
+        ws[coord].value = value
+        if coord == "D1":
+            ws["D1"].alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+        elif coord[0] in wrap_cols and int(coord[1:]) >= TASK_ROW_START_T:
+            ensure_wrap(ws, int(coord[1:]), ord(coord[0]) - 64, vertical="center")
+
+def task_sheet_values_t(org_name: str, job_name: str, track_name: str, tasks: List[TaskRecord]) -> Dict[str, Any]:
+    """트랙 Task 시트에 쓸 값 {셀: 값} — B1/B2, D1(트랙명), 내용이 있는 행의 A/C열"""
+    values = {"B1": org_name, "B2": job_name, "D1": track_name} # B1, B2는 VBA 수정 함수에서 한글 교정됨
 
     row = TASK_ROW_START_T
     for t in tasks:
         if row > TASK_ROW_END_T: break
-        ws.cell(row=row, column=1).value = t.get("task_name") or ""
-        desc = t.get("task_description") or ""
-        ws.cell(row=row, column=3).value = desc
-        ensure_wrap(ws, row, 3, vertical="center")
+        values[f"A{row}"] = t.name or ""
+        values[f"C{row}"] = t.description or ""
         row += 1
-    set_vertical_center_all(ws)
+    return values
 
-def write_skill_sheet(ws, org_name: str, job_name: str, track_name: str, skills: List[Dict[str, Any]]):
-    ws["B1"].value = org_name # B1, B2는 VBA 수정 함수에서 한글 교정됨
-    ws["B2"].value = job_name
-    ensure_merge(ws, TRACK_TITLE_RANGE_T)
-    ws["D1"].value = track_name
-    ws["D1"].alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+def skill_sheet_values_t(org_name: str, job_name: str, track_name: str, skills: List[SkillRecord]) -> Dict[str, Any]:
+    """트랙 Skill 시트에 쓸 값 {셀: 값} — B1/B2, D1(트랙명), 내용이 있는 행의 A/B/D/F열"""
+    values = {"B1": org_name, "B2": job_name, "D1": track_name} # B1, B2는 VBA 수정 함수에서 한글 교정됨
 
     row = SKILL_ROW_START_T
     for s in skills:
         if row > SKILL_ROW_END_T: break
         # A: 유관업무(현재 트랙 기준)
-        a_text = bullets_from_related_tasks(get_skill_related_tasks(s), current_track_name=track_name)
-        ws.cell(row=row, column=1).value = a_text
-        ensure_wrap(ws, row, 1, vertical="center")
+        values[f"A{row}"] = bullets_from_related_tasks(s.related, current_track_name=track_name)
         # B: 스킬명
-        ws.cell(row=row, column=2).value = (get_skill_field(s, "name") or "")
+        values[f"B{row}"] = (s.name or "")
         # D: 설명(마커 제거)
-        d_text = strip_markers(get_skill_field(s, "definition"))
-        ws.cell(row=row, column=4).value = d_text
-        ensure_wrap(ws, row, 4, vertical="center")
+        values[f"D{row}"] = strip_markers(s.definition)
         # F: tech_stack(language/os/tools) (마커 제거 포함)
-        f_text = bullets_from_tech_stack(get_skill_field(s, "tech_stack") or {})
-        ws.cell(row=row, column=6).value = f_text
-        ensure_wrap(ws, row, 6, vertical="center")
+        values[f"F{row}"] = bullets_from_tech_stack(s.tech_stack)
         row += 1
-    set_vertical_center_all(ws)
+    return values
 
-def build_workbook_track(template_bytes: bytes, org: str, job: str, data: Dict[str, Any]) -> BytesIO:
-    wb = load_workbook(BytesIO(template_bytes))
+def build_workbook_track(template_bytes: TemplateSource, org: str, job: str, data: Union[Dict[str, Any], JobInput],
+                         timer: Optional[StageTimer] = None) -> BytesIO:
+    timer = timer or StageTimer()
+    with timer.stage("load_template", len(template_bytes)):
+        wb = open_template_workbook(template_bytes)
 
-    # 트랙 목록(meta.tracks 우선)
-    tracks = []
-    meta_tracks = (((data.get("meta") or {}).get("tracks")) or [])
-    if meta_tracks:
-        for idx, tr in enumerate(meta_tracks, start=1):
-            tracks.append({"index": idx, "name": tr.get("track_name"), "code": tr.get("track_code")})
-    else:
-        seen, idx = set(), 1
-        for t in data.get("tasks", []):
-            tn = (t.get("track") or {}).get("name")
-            tc = (t.get("track") or {}).get("code")
-            if tn and (tn, tc) not in seen:
-                tracks.append({"index": idx, "name": tn, "code": tc})
-                seen.add((tn, tc)); idx += 1
-
-    # [FIX] 유연해진 파서 사용
-    all_tasks  = collect_tasks_nt(data)
-    all_skills = list(iter_skills_nt(data)) # 제너레이터 실행
-
-    for tr in tracks:
-        t_idx = tr["index"]; t_name = tr["name"]; t_code = tr.get("code")
-        # Task 시트
-        task_ws_title = f"트랙 {t_idx}_Task"
-        task_ws = copy_sheet_by_template(wb, TASK_TEMPLATE_SHEET_T, task_ws_title)
-        tasks_for_track = select_tasks_for_track(all_tasks, t_name, limit=(TASK_ROW_END_T - TASK_ROW_START_T + 1))
-        write_task_sheet(task_ws, org_name=org, job_name=job, track_name=t_name, tasks=tasks_for_track)
-        # Skill 시트
-        skill_ws_title = f"트랙 {t_idx}_Skill"
-        skill_ws = copy_sheet_by_template(wb, SKILL_TEMPLATE_SHEET_T, skill_ws_title)
-        skills_for_track = select_skills_for_track(all_skills, t_name, t_code, limit=(SKILL_ROW_END_T - SKILL_ROW_END_T + 1))
-        write_skill_sheet(skill_ws, org_name=org, job_name=job, track_name=t_name, skills=skills_for_track)
+    add_track_sheets(wb, org, job, data, timer)
 
     # 원본 템플릿 Task/Skill 시트 제거(Description 등은 유지)
     for base in (TASK_TEMPLATE_SHEET_T, SKILL_TEMPLATE_SHEET_T):
         if base in wb.sheetnames:
             wb.remove(wb[base])
 
-    # --- VBA 스타일 적용 ---
-    apply_vba_description_edits(wb)
-    apply_vba_extra_borders_and_dims(wb)
-    apply_vba_global_font(wb, "현대하모니 L")
-    apply_vba_korean_fix_to_headers(wb) # B1, B2 한글 교정
-    # --- ---
-
-    bio = BytesIO(); wb.save(bio); bio.seek(0); return bio
-
-def process_uploaded_txt_track(uploaded_file, template_bytes: bytes):
-    org, job = parse_org_and_job_from_filename_track(uploaded_file.name)
-    safe_org = sanitize_filename_component(org, "org")
-    safe_job = sanitize_filename_component(job, "job")
-    out_name = f"Track_Paper Interview_{safe_org}_{safe_job}.xlsx"
-    data = load_json_from_txt_bytes(uploaded_file.read())
+    apply_vba_styles(wb, timer)
+    return save_workbook_to_bytesio(wb, timer)
+
+def add_track_sheets(wb, org: str, job: str, data: Union[Dict[str, Any], JobInput], timer: Optional[StageTimer] = None,
+                     title_prefix: str = "") -> List[str]:
+    """트랙마다 템플릿 Task/Skill 시트를 복사해 채우고, 추가된 시트 이름을 반환"""
+    timer = timer or StageTimer()
+    data = job_input(data)
+    added = []
+    grouped = tasks_by_track(data.tasks)
+
+    for t_idx, t_name, t_code in data.tracks:
+        # Task 시트
+        task_ws_title = f"{title_prefix}트랙 {t_idx}_Task"
+        with timer.stage("copy_sheets"):
+            task_ws = copy_sheet_by_template(wb, TASK_TEMPLATE_SHEET_T, task_ws_title)
+        with timer.stage("fill_task"):
+            tasks_for_track = select_tasks_for_track(grouped, t_name, limit=(TASK_ROW_END_T - TASK_ROW_START_T + 1))
+            write_task_sheet(task_ws, org_name=org, job_name=job, track_name=t_name, tasks=tasks_for_track)
+        # Skill 시트
+        skill_ws_title = f"{title_prefix}트랙 {t_idx}_Skill"
+        with timer.stage("copy_sheets"):
+            skill_ws = copy_sheet_by_template(wb, SKILL_TEMPLATE_SHEET_T, skill_ws_title)
+        with timer.stage("fill_skill"):
+            skills_for_track = select_skills_for_track(data.skills, t_name, t_code, limit=(SKILL_ROW_END_T - SKILL_ROW_END_T + 1))
+            write_skill_sheet(skill_ws, org_name=org, job_name=job, track_name=t_name, skills=skills_for_track)
+        added += [task_ws_title, skill_ws_title]
+    return added
+
+def process_uploaded_txt_track(uploaded_file, template_bytes: TemplateSource, timer: Optional[StageTimer] = None):
+    timer = timer or StageTimer("Track", uploaded_file.name)
+    out_name, (org, job) = txt_output_identity(uploaded_file.name, "Track")
+    data = read_uploaded_json(uploaded_file, timer)
     # build_workbook_track 내부에서 VBA 스타일 적용
-    wb_bytes = build_workbook_track(template_bytes, org, job, data)
+    wb_bytes = build_workbook_track(template_bytes, org, job, data, timer=timer)
     return out_name, wb_bytes
 
+# ==========================
+# Non Track + Track (한 번 파싱해 두 워크북)
+# ==========================
+def process_uploaded_txt_both(uploaded_file, templates: Dict[str, TemplateSource], timer: Optional[StageTimer] = None,
+                              parallel: bool = False) -> List[Tuple[str, BytesIO]]:
+    """TXT 1개를 한 번만 읽고 정규화(JobInput)한 뒤 Non Track/Track 워크북을 모두 생성 → [(파일명, 워크북)] (OUTPUT_MODES 순서).
+    parallel이면 두 빌드를 스레드 2개로 동시에 실행합니다. 빌드별 단계는 '모드/단계' 이름으로 timer에 합칩니다."""
+    timer = timer or StageTimer(MODE_BOTH, uploaded_file.name)
+    data = read_uploaded_json(uploaded_file, timer)
+    builders = {"Non Track": build_workbook_nontrack, "Track": build_workbook_track}
+
+    def build(mode: str) -> Tuple[str, BytesIO, StageTimer]:
+        out_name, (org, job) = txt_output_identity(uploaded_file.name, mode)
+        sub = StageTimer(mode, uploaded_file.name)
+        return out_name, builders[mode](templates[mode], org, job, data, timer=sub), sub
+
+    if parallel:
+        with ThreadPoolExecutor(max_workers=len(OUTPUT_MODES)) as ex:
+            built = list(ex.map(build, OUTPUT_MODES))
+    else:
+        built = [build(mode) for mode in OUTPUT_MODES]
+    for mode, (_, _, sub) in zip(OUTPUT_MODES, built):
+        timer.stages += [dict(info, stage=f"{mode}/{info['stage']}") for info in sub.stages]
+    return [(out_name, bio) for out_name, bio, _ in built]
+
+# ==========================
+# 기술 스택 분석 (배치 집계)
+# ==========================
+TECH_CATEGORIES = ["language", "os", "tools", "audio_processing", "data_handling", "etc"]
+TECH_OS_KEYS = {"os", "platform", "operating_system"}
+# 비교 키(소문자, 공백/-/_/. 제거) → 대표 키
+TECH_ALIASES = {
+    "py": "python", "python3": "python", "js": "javascript", "ts": "typescript",
+    "golang": "go", "k8s": "kubernetes", "postgres": "postgresql", "cpp": "c++",
+    "sklearn": "scikitlearn", "tf": "tensorflow", "node": "nodejs", "msexcel": "excel",
+}
+TECH_ALL_ORGS = "(전체)"
+
+def tech_category(raw_key: Any) -> str:
+    key = str(raw_key).strip().lower()
+    return "os" if key in TECH_OS_KEYS else normalize_category_name(key)
+
+def tech_entries_from_records(file_name: str, records: List[Dict[str, Any]]):
+    """도구 1 레코드 → (조직, 파일명, tech_stack) 묶음"""
+    org = parse_org_role_from_filename_nt(file_name)[0]
+    for rec in records:
+        yield org, file_name, rec.get("tech_stack")
+
+def tech_entries_from_txt(uploaded_file, mode: str):
+    """도구 2 TXT(JSON) → 스킬별 (조직, 파일명, tech_stack) 묶음"""
+    if mode == "Track":
+        org = parse_org_and_job_from_filename_track(uploaded_file.name)[0]
+    else:
+        org = parse_org_role_from_filename_nt(uploaded_file.name)[0]
+    data = load_json_from_txt_bytes(uploaded_file.getvalue())
+    for s in iter_skills_nt(data):
+        yield org, uploaded_file.name, s.tech_stack
+
+def tech_entries_from_uploads(uploads: List[Any], mode: str):
+    for f in uploads:
+        try:
+            yield from tech_entries_from_txt(f, mode)
+        except Exception as e:
+            logger.warning(f"{f.name} 기술 스택 집계 제외 (JSON 파싱 실패: {e})")
+
+def tech_items_frame(entries) -> pd.DataFrame:
+    """(조직, 파일명, tech_stack) 묶음 → 항목 1개당 1행인 표 [org, file, record, category, item]"""
+    orgs, files, rec_ids, cats, raws = [], [], [], [], []
+    for rec_id, (org, file_name, tech_stack) in enumerate(entries):
+        if not isinstance(tech_stack, (dict, TechStack)):
+            continue
+        for k, v in tech_stack.items():
+            cat = tech_category(k)
+            items = normalize_list(v)
+            orgs += [org] * len(items); files += [file_name] * len(items)
+            rec_ids += [rec_id] * len(items); cats += [cat] * len(items)
+            raws += items
+    if not raws:  # 빈 열은 float이 되어 .str을 쓸 수 없으므로 빈 표를 바로 반환
+        return pd.DataFrame({"org": pd.Series(dtype=object), "file": pd.Series(dtype=object),
+                             "record": pd.Series(dtype="int64"),
+                             "category": pd.Categorical([], categories=TECH_CATEGORIES),
+                             "item": pd.Series(dtype=object)})
+    df = pd.DataFrame({"org": orgs, "file": files, "record": rec_ids, "category": cats, "raw": raws})
+
+    # 마커/공백 정리 → 비교 키 → 별칭 통합 (모두 열 단위 연산)
+    raw = df["raw"].str.replace(CITE_PATTERN, " ", regex=True).str.replace(r"\s+", " ", regex=True).str.strip()
+    df = df.assign(raw=raw)[raw != ""]
+    key = df["raw"].str.lower().str.replace(r"[\s\-_.]+", "", regex=True)
+    df = df.assign(key=key.replace(TECH_ALIASES), alias=key.isin(TECH_ALIASES.keys()))
+    # 대표 표기: 별칭이 아닌 표기 중 가장 많이 쓰인 것 (py/python3보다 Python)
+    spelling = (df.groupby(["key", "alias", "raw"]).size().rename("n").reset_index()
+                  .sort_values(["key", "alias", "n", "raw"], ascending=[True, True, False, True])
+                  .drop_duplicates("key").set_index("key")["raw"])
+    df = df.assign(item=df["key"].map(spelling))
+    df = df.drop_duplicates(["record", "category", "item"])
+    df["category"] = pd.Categorical(df["category"], categories=TECH_CATEGORIES)
+    return df[["org", "file", "record", "category", "item"]].reset_index(drop=True)
+
+def with_all_orgs(items: pd.DataFrame) -> pd.DataFrame:
+    return pd.concat([items, items.assign(org=TECH_ALL_ORGS)], ignore_index=True)
+
+def tech_frequency(items: pd.DataFrame) -> pd.DataFrame:
+    """조직×분류×항목별 언급 레코드 수와 조직 내 비율"""
+    both = with_all_orgs(items)
+    freq = both.groupby(["org", "category", "item"], observed=True).agg(
+        records=("record", "size"), files=("file", "nunique")).reset_index()
+    totals = both.groupby("org")["record"].nunique()
+    freq["share"] = (freq["records"] / freq["org"].map(totals)).round(3)
+    return freq.sort_values(["org", "category", "records", "item"],
+                            ascending=[True, True, False, True]).reset_index(drop=True)
+
+def tech_cooccurrence(items: pd.DataFrame, min_count: int = 2) -> pd.DataFrame:
+    """같은 레코드에 함께 나온 항목 쌍의 조직별 빈도 (min_count 미만 제외)"""
+    both = with_all_orgs(items)
+    codes, uniques = pd.factorize(pd.MultiIndex.from_arrays([both["category"].astype(str), both["item"]]))
+    left = pd.DataFrame({"org": both["org"].to_numpy(), "record": both["record"].to_numpy(), "code": codes})
+    pairs = left.merge(left, on=["org", "record"], suffixes=("_a", "_b"))
+    pairs = pairs[pairs["code_a"] < pairs["code_b"]]
+    counts = pairs.groupby(["org", "code_a", "code_b"]).size().rename("records").reset_index()
+    counts = counts[counts["records"] >= min_count]
+    a, b = uniques[counts["code_a"].to_numpy()], uniques[counts["code_b"].to_numpy()]
+    out = pd.DataFrame({
+        "org": counts["org"].to_numpy(),
+        "category_a": a.get_level_values(0), "item_a": a.get_level_values(1),
+        "category_b": b.get_level_values(0), "item_b": b.get_level_values(1),
+        "records": counts["records"].to_numpy(),
+    })
+    return out.sort_values(["org", "records", "item_a", "item_b"],
+                           ascending=[True, False, True, True]).reset_index(drop=True)
+
+def tech_report_zip(items: pd.DataFrame, freq: pd.DataFrame, cooc: pd.DataFrame) -> bytes:
+    """분석 결과 CSV 3종 ZIP (엑셀에서 한글이 깨지지 않도록 BOM 포함)"""
+    bio = BytesIO()
+    with zipfile.ZipFile(bio, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, df in (("tech_items.csv", items), ("tech_frequency.csv", freq), ("tech_cooccurrence.csv", cooc)):
+            zf.writestr(name, df.to_csv(index=False).encode("utf-8-sig"))
+    return bio.getvalue()
+
+# ==========================
+# 코퍼스 검색 인덱스 (로컬 SQLite)
+# ==========================
+CORPUS_INDEX_DIR = APP_DIR / "corpus_index"  # 네임스페이스마다 SQLite 파일 1개
+CORPUS_FIELDS = {"전체": None, "이름": "name", "설명": "text", "기술 스택": "tech"}
+CORPUS_MODES = ("포함", "접두", "유사")
+CORPUS_FUZZY_MIN_RATIO = 0.6
+CORPUS_FUZZY_CANDIDATES = 2000
+CORPUS_FUZZY_TERMS = 8  # 검색어 단어 1개당 쓸 유사 단어 수
+CORPUS_TOKEN_PATTERN = re.compile(r"\w{3,}")  # 사전 단어 (트라이그램 최소 길이)
+CORPUS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (name TEXT PRIMARY KEY, tool TEXT, digest TEXT, org TEXT, job TEXT,
+                                    records INTEGER, indexed_at REAL);
+CREATE TABLE IF NOT EXISTS docs (id INTEGER PRIMARY KEY, source TEXT, org TEXT, job TEXT, track TEXT, kind TEXT,
+                                 name TEXT, text TEXT, tech TEXT, name_key TEXT);
+CREATE INDEX IF NOT EXISTS docs_source ON docs(source);
+CREATE INDEX IF NOT EXISTS docs_name_key ON docs(name_key);
+CREATE INDEX IF NOT EXISTS docs_kind_name ON docs(kind, name_key, org);
+CREATE TABLE IF NOT EXISTS doc_tech (doc_id INTEGER, key TEXT);
+CREATE INDEX IF NOT EXISTS doc_tech_key ON doc_tech(key, doc_id);
+CREATE INDEX IF NOT EXISTS doc_tech_doc ON doc_tech(doc_id);
+CREATE TABLE IF NOT EXISTS terms (id INTEGER PRIMARY KEY, field TEXT, key TEXT, UNIQUE(field, key));
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(name, text, tech, content='docs', content_rowid='id',
+                                                       tokenize='trigram');
+CREATE VIRTUAL TABLE IF NOT EXISTS terms_fts USING fts5(key, content='terms', content_rowid='id', tokenize='trigram');
+"""
+
+def corpus_key(s: Any) -> str:
+    """비교 키: NFC + 소문자 + 공백 1칸"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", str(s or "")).casefold()).strip()
+
+def corpus_tech_items(tech_stack: Any) -> List[str]:
+    values = tech_stack.values() if isinstance(tech_stack, (dict, TechStack)) else [tech_stack]
+    return [item for v in values for item in (strip_markers(x) for x in normalize_list(v)) if item]
+
+def corpus_docs_from_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """도구 1 레코드 / 도구 2 JSON 안의 Task 목록 → 검색 문서"""
+    return [{"kind": "task", "track": str(r["track"].get("name") or "") if isinstance(r.get("track"), dict) else "",
+             "name": str(r.get("task_name") or "").strip(), "text": strip_markers(r.get("task_description")),
+             "tech": corpus_tech_items(r.get("tech_stack"))}
+            for r in records if isinstance(r, dict)]
+
+def corpus_docs_from_json(data: Any) -> List[Dict[str, Any]]:
+    """도구 2 JSON → Task + Skill 검색 문서 (도구 1 형식 list는 Task만)"""
+    docs = corpus_docs_from_records(collect_tasks_nt(data))
+    if isinstance(data, dict):
+        docs += [{"kind": "skill", "track": "", "name": str(s.name or "").strip(),
+                  "text": strip_markers(s.definition), "tech": corpus_tech_items(s.tech_stack)}
+                 for s in iter_skills_nt(data)]
+    return [d for d in docs if d["name"] or d["text"] or d["tech"]]
+
+def fts_phrase(s: str) -> str:
+    return '"' + s.replace('"', '""') + '"'
+
+@contextmanager
+def sqlite_session(path: str):
+    con = sqlite3.connect(path, timeout=30)
+    try:
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")  # WAL에서는 전원 장애 시 마지막 커밋만 잃을 수 있음
+        with con:  # 트랜잭션 (예외 시 롤백)
+            yield con
+    finally:
+        con.close()
+
+class CorpusIndex:
+    """변환한 Task/Skill을 파일 단위로 쌓아 두는 검색 인덱스.
+    - 포함: FTS5 트라이그램(3글자 이상 토큰) + 짧은 토큰은 LIKE
+    - 접두: 이름/기술 항목의 비교 키 범위 검색
+    - 유사: 이름·설명 단어와 기술 항목 사전(terms)에서 단어별 유사 표기를 찾아 FTS로 문서 검색
+    같은 이름의 파일이 다른 내용으로 다시 들어오면 그 파일의 문서만 교체합니다 (사전은 추가만).
+    인덱스 디렉터리는 이 서버의 모든 세션이 함께 쓰므로, 팀/프로젝트처럼 명시한 네임스페이스마다 파일을 따로 둡니다
+    (문서뿐 아니라 유사 검색 사전도 네임스페이스 밖으로 보이지 않음)."""
+
+    def __init__(self, namespace: str, path: Optional[Union[str, Path]] = None):
+        if not namespace.strip():
+            raise ValueError("검색 인덱스 네임스페이스가 비어 있습니다.")
+        self.namespace = namespace.strip()
+        self.path = str(path or corpus_index_path(self.namespace))
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as con:
+            con.executescript(CORPUS_SCHEMA)
+
+    def _connect(self):
+        return sqlite_session(self.path)
+
+    def add_source(self, name: str, tool: str, digest: str, org: str, job: str,
+                   docs: List[Dict[str, Any]]) -> bool:
+        """파일 1개 색인 (같은 이름·같은 내용이면 건너뛰고 False)"""
+        with self._connect() as con:
+            row = con.execute("SELECT digest FROM sources WHERE name = ?", (name,)).fetchone()
+            if row and row[0] == digest:
+                return False
+            self._delete_docs(con, name)
+            start = (con.execute("SELECT max(id) FROM docs").fetchone()[0] or 0) + 1
+            rows, tech_rows, terms = [], [], set()
+            for doc_id, d in enumerate(docs, start=start):
+                name_key = corpus_key(d["name"])
+                tech_keys = list(dict.fromkeys(corpus_key(t) for t in d["tech"]))
+                rows.append((doc_id, name, org, job, d["track"], d["kind"], d["name"], d["text"],
+                             " · ".join(d["tech"]), name_key))
+                tech_rows += [(doc_id, k) for k in tech_keys]
+                terms.update(("name", t) for t in CORPUS_TOKEN_PATTERN.findall(name_key))
+                terms.update(("tech", k) for k in tech_keys if len(k) >= 3)
+                terms.update(("text", t) for t in CORPUS_TOKEN_PATTERN.findall(corpus_key(d["text"])))
+            con.executemany("INSERT INTO docs VALUES (?,?,?,?,?,?,?,?,?,?)", rows)
+            con.executemany("INSERT INTO doc_tech VALUES (?,?)", tech_rows)
+            con.execute("INSERT INTO docs_fts(rowid, name, text, tech) SELECT id, name, text, tech FROM docs WHERE id >= ?",
+                        (start,))
+            last_term = con.execute("SELECT coalesce(max(id), 0) FROM terms").fetchone()[0]
+            con.executemany("INSERT OR IGNORE INTO terms(field, key) VALUES (?,?)", sorted(terms))
+            con.execute("INSERT INTO terms_fts(rowid, key) SELECT id, key FROM terms WHERE id > ?", (last_term,))
+            con.execute("INSERT OR REPLACE INTO sources VALUES (?,?,?,?,?,?,?)",
+                        (name, tool, digest, org, job, len(rows), time.time()))
+        return True
+
+    @staticmethod
+    def _delete_docs(con, source: str):
+        # external content FTS는 지울 때 원래 값을 함께 넘겨야 함
+        con.execute("INSERT INTO docs_fts(docs_fts, rowid, name, text, tech) "
+                    "SELECT 'delete', id, name, text, tech FROM docs WHERE source = ?", (source,))
+        con.execute("DELETE FROM doc_tech WHERE doc_id IN (SELECT id FROM docs WHERE source = ?)", (source,))
+        con.execute("DELETE FROM docs WHERE source = ?", (source,))
+
+    def remove_source(self, name: str):
+        with self._connect() as con:
+            self._delete_docs(con, name)
+            con.execute("DELETE FROM sources WHERE name = ?", (name,))
+
+    def stats(self) -> Dict[str, int]:
+        with self._connect() as con:
+            files, records = con.execute("SELECT count(*), coalesce(sum(records), 0) FROM sources").fetchone()
+            terms = con.execute("SELECT count(*) FROM terms").fetchone()[0]
+        return {"files": files, "records": records, "terms": terms}
+
+    def search(self, query: str, field: Optional[str] = None, mode: str = "포함", limit: int = 50) -> pd.DataFrame:
+        """검색 결과 [source, org, job, track, kind, name, text, tech, match]"""
+        q = corpus_key(query)
+        if not q:
+            return pd.DataFrame(columns=["source", "org", "job", "track", "kind", "name", "text", "tech", "match"])
+        with self._connect() as con:
+            if mode == "유사" and len(q) >= 3:
+                hits = self._fuzzy_ids(con, q, field, limit)
+            elif mode == "접두":
+                hits = self._prefix_ids(con, q, field, limit)
+            else:
+                hits = self._contains_ids(con, q, field, limit)
+            ids = [doc_id for doc_id, _ in hits]
+            rows = {r[0]: r[1:] for r in con.execute(
+                f"SELECT id, source, org, job, track, kind, name, text, tech FROM docs "
+                f"WHERE id IN ({','.join('?' * len(ids))})", ids)}
+        out = [(*rows[doc_id], match) for doc_id, match in hits if doc_id in rows]
+        return pd.DataFrame(out, columns=["source", "org", "job", "track", "kind", "name", "text", "tech", "match"])
+
+    @staticmethod
+    def _columns(field: Optional[str]) -> List[str]:
+        return [field] if field else ["name", "text", "tech"]
+
+    def _contains_ids(self, con, q: str, field: Optional[str], limit: int) -> List[Tuple[int, str]]:
+        cols = self._columns(field)
+        long_toks = [t for t in q.split(" ") if len(t) >= 3]
+        short_toks = [t for t in q.split(" ") if len(t) < 3]
+        # 2글자 이하 토큰은 트라이그램으로 찾을 수 없으므로 LIKE로 거름
+        like_sql = "".join(f" AND ({' OR '.join(f'd.{c} LIKE ? ESCAPE ?' for c in cols)})" for _ in short_toks)
+        like_args = [a for t in short_toks for _ in cols
+                     for a in ("%" + t.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%", "\\")]
+        if long_toks:
+            match = "{" + " ".join(cols) + "} : (" + " AND ".join(fts_phrase(t) for t in long_toks) + ")"
+            sql = ("SELECT d.id FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid "
+                   f"WHERE docs_fts MATCH ?{like_sql} ORDER BY docs_fts.rowid DESC LIMIT ?")  # 최근 색인 순 (rank 정렬은 전체 채점)
+            args = [match, *like_args, limit]
+        else:
+            sql = f"SELECT d.id FROM docs d WHERE 1{like_sql} ORDER BY d.id DESC LIMIT ?"
+            args = [*like_args, limit]
+        return [(r[0], q) for r in con.execute(sql, args)]
+
+    def _prefix_ids(self, con, q: str, field: Optional[str], limit: int) -> List[Tuple[int, str]]:
+        hi = q + "\U0010ffff"
+        hits: Dict[int, str] = {}
+        if field in (None, "name"):
+            for doc_id, key in con.execute("SELECT id, name_key FROM docs WHERE name_key >= ? AND name_key < ? "
+                                           "ORDER BY name_key, id LIMIT ?", (q, hi, limit)):
+                hits.setdefault(doc_id, key)
+        if field in (None, "tech") and len(hits) < limit:
+            for doc_id, key in con.execute("SELECT doc_id, key FROM doc_tech WHERE key >= ? AND key < ? "
+                                           "ORDER BY key, doc_id LIMIT ?", (q, hi, limit)):
+                hits.setdefault(doc_id, key)
+        # 이름·설명 안의 단어 접두: 부분 일치 후보를 단어 시작으로 한 번 더 거름
+        word = re.compile(r"(?<!\w)" + re.escape(q))
+        for col in [c for c in ("name", "text") if field in (None, c)]:
+            if len(hits) >= limit:
+                break
+            ids = [doc_id for doc_id, _ in self._contains_ids(con, q, col, limit * 4)]
+            texts = dict(con.execute(f"SELECT id, {col} FROM docs WHERE id IN ({','.join('?' * len(ids))})", ids))
+            for doc_id in ids:
+                if word.search(corpus_key(texts[doc_id])):
+                    hits.setdefault(doc_id, q)
+        return list(hits.items())[:limit]
+
+    def _similar_terms(self, con, word: str, fields: List[str]) -> List[Tuple[float, str]]:
+        """사전에서 word와 비슷한 단어 (유사도 높은 순)"""
+        grams = [word[i:i + 3] for i in range(len(word) - 2)]
+        # 이웃한 트라이그램 2개(=4글자 조각)를 공유하는 단어 + 앞 2글자가 같은 단어 (짧은 단어의 자리바꿈 대비)
+        match = " OR ".join(f"({fts_phrase(a)} AND {fts_phrase(b)})" for a, b in zip(grams, grams[1:])) or fts_phrase(word)
+        marks = ",".join("?" * len(fields))
+        keys = {k for (k,) in con.execute(
+            f"SELECT t.key FROM terms_fts JOIN terms t ON t.id = terms_fts.rowid "
+            f"WHERE terms_fts MATCH ? AND t.field IN ({marks}) LIMIT ?", [match, *fields, CORPUS_FUZZY_CANDIDATES])}
+        keys.update(k for (k,) in con.execute(
+            f"SELECT key FROM terms WHERE field IN ({marks}) AND key >= ? AND key < ? LIMIT ?",
+            [*fields, word[:2], word[:2] + "\U0010ffff", CORPUS_FUZZY_CANDIDATES]))
+        scored = sorted(((difflib.SequenceMatcher(None, word, k).ratio(), k) for k in keys), key=lambda x: (-x[0], x[1]))
+        return [(r, k) for r, k in scored[:CORPUS_FUZZY_TERMS] if r >= CORPUS_FUZZY_MIN_RATIO]
+
+    def _fuzzy_ids(self, con, q: str, field: Optional[str], limit: int) -> List[Tuple[int, str]]:
+        # 검색어 단어마다 유사 단어 OR 묶음 → 단어끼리는 AND (2글자 이하 단어는 그대로 LIKE 조건)
+        cols = self._columns(field)
+        groups, labels, short = [], [], []
+        for word in q.split(" "):
+            if len(word) < 3:
+                short.append(word)
+                continue
+            similar = self._similar_terms(con, word, cols)
+            if not similar:
+                return []
+            groups.append("(" + " OR ".join(fts_phrase(k) for _, k in similar) + ")")
+            labels.append(similar[0][1])
+        if not groups:
+            return self._contains_ids(con, q, field, limit)
+        match = "{" + " ".join(cols) + "} : (" + " AND ".join(groups) + ")"
+        label = " ".join(labels)
+        hits = [(doc_id, label) for (doc_id,) in con.execute(
+            "SELECT rowid FROM docs_fts WHERE docs_fts MATCH ? ORDER BY rowid DESC LIMIT ?",
+            (match, limit * 4 if short else limit))]
+        if short:
+            keep = {doc_id for doc_id, _ in self._contains_ids(con, " ".join(short), field, 10 ** 9)}
+            hits = [h for h in hits if h[0] in keep]
+        return hits[:limit]
+
+    def duplicate_names(self, kind: str = "task", min_orgs: int = 2) -> pd.DataFrame:
+        """여러 조직에 같은 이름(비교 키 기준)으로 나오는 Task/Skill"""
+        with self._connect() as con:
+            rows = con.execute(
+                "SELECT min(name), count(DISTINCT org), count(DISTINCT source), group_concat(DISTINCT org) "
+                "FROM docs WHERE kind = ? AND name_key != '' GROUP BY name_key HAVING count(DISTINCT org) >= ? "
+                "ORDER BY 2 DESC, 1", (kind, min_orgs)).fetchall()
+        return pd.DataFrame(rows, columns=["name", "orgs", "files", "org_list"])
+
+    def near_dup_docs(self, kind: Optional[str] = None) -> pd.DataFrame:
+        """근접 중복 묶기용 문서 전체 [source, org, job, track, kind, name, text] (kind=None이면 Task+Skill)"""
+        with self._connect() as con:
+            rows = con.execute("SELECT source, org, job, track, kind, name, text FROM docs "
+                               "WHERE ? IS NULL OR kind = ? ORDER BY id", (kind, kind)).fetchall()
+        return pd.DataFrame(rows, columns=["source", "org", "job", "track", "kind", "name", "text"])
+
+def corpus_index_path(namespace: str) -> Path:
+    """네임스페이스 → 인덱스 파일 (읽기 쉬운 이름 + 해시: 'a/b'와 'a_b'처럼 정리 후 같아지는 이름도 구분)"""
+    readable = sanitize_filename_component(namespace, "corpus").replace(" ", "_")[:40]
+    return CORPUS_INDEX_DIR / f"{readable}-{hashlib.sha256(namespace.encode('utf-8')).hexdigest()[:12]}.sqlite3"
+
+def corpus_namespace() -> str:
+    return str(st.session_state.get("corpus_namespace") or "").strip()
+
+def get_corpus_index() -> Optional[CorpusIndex]:
+    """검색 탭의 '변환 시 자동 색인'을 켜고 네임스페이스를 적었을 때만 인덱스를 엶 (기본은 꺼짐)"""
+    namespace = corpus_namespace()
+    if not st.session_state.get("corpus_enabled", False) or not namespace:
+        return None
+    try:
+        return CorpusIndex(namespace)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"검색 인덱스를 열 수 없습니다 ({corpus_index_path(namespace)}): {e}")
+        return None
+
+def index_corpus_source(index: Optional[CorpusIndex], name: str, raw: bytes, tool: str,
+                        docs: Callable[[], List[Dict[str, Any]]], identity: Tuple[str, str]):
+    """변환 흐름에서 호출: 색인 실패는 경고만 남기고 변환은 계속"""
+    if index is None:
+        return
+    try:
+        index.add_source(name, tool, hashlib.sha256(raw).hexdigest(), identity[0], identity[1], docs())
+    except Exception as e:
+        logger.warning(f"{name} 검색 인덱스 반영 실패: {e}")
+
+# ==========================
+# 근접 중복 묶음 (MinHash + LSH)
+# ==========================
+NEAR_DUP_SHINGLE = 4            # 글자 n-gram 길이 (공백·기호를 뺀 비교 키 기준)
+NEAR_DUP_PERMS = 64             # MinHash 서명 길이
+NEAR_DUP_BANDS = 16             # LSH 밴드 수: 밴드당 4행 → 유사도 0.5 안팎부터 후보, 이후 서명 일치율로 검증
+NEAR_DUP_THRESHOLD = 0.7
+NEAR_DUP_BUCKET_PAIRS = 32      # 버킷이 이보다 크면 모든 쌍 대신 버킷 첫 문서·이웃 문서와만 비교
+NEAR_DUP_CHUNK = 1 << 20        # 서명 계산 시 한 번에 처리할 n-gram 수
+NEAR_DUP_MEDOID_SAMPLE = 256    # 대표 선정 시 비교할 최대 문구 수 (큰 묶음은 사본이 많은 문구 순)
+NEAR_DUP_SEED = 46
+NEAR_DUP_BASE = np.uint64(0x100000001B3)
+NEAR_DUP_STRIP = re.compile(r"[\W_]+")
+NEAR_DUP_MEMBER_COLUMNS = ["cluster", "kind", "similarity", "representative", "source", "org", "job", "track",
+                           "name", "text"]
+NEAR_DUP_CLUSTER_COLUMNS = ["cluster", "kind", "records", "texts", "orgs", "files", "min_similarity",
+                            "name", "text", "source", "org"]
+
+def near_dup_key(name: Any, text: Any) -> str:
+    """근접 중복 비교 키: 이름 + 설명의 비교 키에서 공백·기호 제거"""
+    return NEAR_DUP_STRIP.sub("", corpus_key(f"{name or ''} {text or ''}"))
+
+def minhash_signatures(keys: List[str]) -> np.ndarray:
+    """비교 키별 MinHash 서명 (len(keys) × NEAR_DUP_PERMS, uint64).
+    글자 n-gram 해시와 순열별 최솟값을 문서 묶음 단위로 numpy에서 한 번에 계산"""
+    k = NEAR_DUP_SHINGLE
+    rng = np.random.default_rng(NEAR_DUP_SEED)
+    top = np.iinfo(np.uint64).max
+    mults = rng.integers(0, top, size=NEAR_DUP_PERMS, dtype=np.uint64, endpoint=True) | np.uint64(1)
+    xors = rng.integers(0, top, size=NEAR_DUP_PERMS, dtype=np.uint64, endpoint=True)
+    keys = [key.ljust(k, "\0") for key in keys]  # n보다 짧은 키는 통째로 n-gram 1개
+    lengths = np.fromiter(map(len, keys), dtype=np.int64, count=len(keys))
+    grams = lengths - k + 1
+    ends = np.cumsum(grams)
+    sig = np.empty((len(keys), NEAR_DUP_PERMS), dtype=np.uint64)
+    start = 0
+    while start < len(keys):
+        base = ends[start - 1] if start else 0
+        stop = max(start + 1, int(np.searchsorted(ends, base + NEAR_DUP_CHUNK, side="right")))
+        cps = np.frombuffer("".join(keys[start:stop]).encode("utf-32-le", "surrogatepass"),
+                            dtype=np.uint32).astype(np.uint64)
+        g, size = grams[start:stop], lengths[start:stop]
+        seg = np.cumsum(g) - g                       # 문서별 첫 n-gram 위치
+        pos = np.arange(g.sum()) + np.repeat(np.cumsum(size) - size - seg, g)
+        h = np.zeros(len(pos), dtype=np.uint64)
+        for j in range(k):
+            h = h * NEAR_DUP_BASE + cps[pos + j]
+        for i in range(NEAR_DUP_PERMS):
+            x = (h ^ xors[i]) * mults[i]
+            x ^= x >> np.uint64(31)
+            sig[start:stop, i] = np.minimum.reduceat(x, seg)
+        start = stop
+    return sig
+
+def lsh_candidate_pairs(sig: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """밴드별로 서명 조각이 같은 문서끼리 후보 쌍 (a < b, 중복 제거)"""
+    n = len(sig)
+    rows = sig.shape[1] // NEAR_DUP_BANDS
+    found = [np.empty((2, 0), dtype=np.int64)]
+    for b in range(NEAR_DUP_BANDS):
+        band = sig[:, b * rows:(b + 1) * rows]
+        key = band[:, 0].copy()
+        for c in range(1, rows):
+            key = key * NEAR_DUP_BASE ^ band[:, c]
+        order = np.argsort(key, kind="stable")
+        sk = key[order]
+        starts = np.flatnonzero(np.r_[True, sk[1:] != sk[:-1]])
+        sizes = np.diff(np.r_[starts, n])
+        for size in np.unique(sizes[sizes > 1]):
+            members = order[starts[sizes == size][:, None] + np.arange(size)]
+            if size <= NEAR_DUP_BUCKET_PAIRS:
+                i, j = np.triu_indices(size, 1)
+            else:  # 큰 버킷: 첫 문서(별) + 바로 옆 문서(사슬)만 이어 쌍 수를 선형으로 제한
+                i = np.r_[np.zeros(size - 1, dtype=np.int64), np.arange(1, size - 1)]
+                j = np.r_[np.arange(1, size), np.arange(2, size)]
+            found.append(np.stack([members[:, i].ravel(), members[:, j].ravel()]))
+    pairs = np.concatenate(found, axis=1)
+    codes = np.unique(np.minimum(pairs[0], pairs[1]) * n + np.maximum(pairs[0], pairs[1]))
+    return codes // n, codes % n
+
+def signature_similarity(sig: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """쌍별 서명 일치율 (= 추정 Jaccard 유사도)"""
+    out = np.empty(len(a))
+    step = 1 << 16
+    for s in range(0, len(a), step):
+        out[s:s + step] = (sig[a[s:s + step]] == sig[b[s:s + step]]).mean(axis=1)
+    return out
+
+def connected_labels(n: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """간선 (a, b)로 이어진 문서 묶음 번호 (묶음 안 가장 작은 번호). 루트 연결 + 경로 압축을 벡터로 반복"""
+    labels = np.arange(n)
+    while len(a):
+        la, lb = labels[a], labels[b]
+        low = np.minimum(la, lb)
+        np.minimum.at(labels, la, low)
+        np.minimum.at(labels, lb, low)
+        while True:
+            nxt = labels[labels]
+            if np.array_equal(nxt, labels):
+                break
+            labels = nxt
+        keep = labels[a] != labels[b]
+        a, b = a[keep], b[keep]
+    return labels
+
+def near_dup_medoid(sig: np.ndarray, members: np.ndarray, copies: np.ndarray) -> int:
+    """묶음 대표: 다른 문구들(사본 수 가중)과의 서명 일치율 합이 가장 큰 문구"""
+    if len(members) == 1:
+        return int(members[0])
+    ref = members[np.argsort(-copies[members], kind="stable")[:NEAR_DUP_MEDOID_SAMPLE]]
+    ref_sig, weights = sig[ref], copies[ref]
+    scores = np.concatenate([(sig[members[s:s + 512], None, :] == ref_sig[None, :, :]).mean(axis=2) @ weights
+                             for s in range(0, len(members), 512)])
+    return int(members[np.argmax(scores)])
+
+def find_near_duplicates(docs: pd.DataFrame, threshold: float = NEAR_DUP_THRESHOLD,
+                         timer: Optional[StageTimer] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """코퍼스 문서 [source, org, job, track, kind, name, text] → (묶음 표, 묶음별 문서 표).
+    같은 kind 안에서만 비교하며, 비교 키가 같은 문서는 한 번만 서명을 계산합니다.
+    후보는 LSH 버킷에서만 뽑으므로 전체 쌍 비교 없이 문서 수에 거의 비례해 늘어납니다.
+    묶음은 유사도 threshold 이상인 쌍으로 이어진 연결 요소이고, 대표 문구와 같은 문서는 representative=True."""
+    timer = timer or StageTimer()
+    frames = []
+    for kind, group in docs.groupby("kind", sort=True):
+        with timer.stage(f"{kind}/normalize"):
+            keys = pd.Series([near_dup_key(n, t) for n, t in zip(group["name"], group["text"])], index=group.index)
+            group, keys = group[keys != ""], keys[keys != ""]
+            codes, uniq = pd.factorize(keys)
+            copies = np.bincount(codes, minlength=len(uniq))
+        with timer.stage(f"{kind}/minhash"):
+            sig = minhash_signatures(list(uniq))
+        with timer.stage(f"{kind}/lsh"):
+            a, b = lsh_candidate_pairs(sig)
+            keep = signature_similarity(sig, a, b) >= threshold
+            labels = connected_labels(len(uniq), a[keep], b[keep])
+        with timer.stage(f"{kind}/representative"):
+            rep_of = np.full(len(uniq), -1)
+            sim_to_rep = np.zeros(len(uniq))
+            order = np.argsort(labels, kind="stable")
+            sorted_labels = labels[order]
+            for members in np.split(order, np.flatnonzero(sorted_labels[1:] != sorted_labels[:-1]) + 1):
+                if copies[members].sum() < 2:
+                    continue
+                rep = near_dup_medoid(sig, members, copies)
+                rep_of[members] = rep
+                sim_to_rep[members] = (sig[members] == sig[rep]).mean(axis=1)
+            rec_rep = rep_of[codes]
+            mask = rec_rep >= 0
+            m = group.loc[mask, ["source", "org", "job", "track", "kind", "name", "text"]].copy()
+            m["similarity"] = sim_to_rep[codes][mask].round(3)
+            m["representative"] = (codes == rec_rep)[mask]
+            m["_rep"], m["_code"] = rec_rep[mask], codes[mask]
+            sizes = m["_rep"].value_counts()
+            ranked = sorted(sizes.index, key=lambda r: (-sizes[r], r))
+            m["cluster"] = m["_rep"].map({r: f"{kind}-{i:04d}" for i, r in enumerate(ranked, 1)})
+        frames.append(m)
+    if not frames or not sum(len(f) for f in frames):
+        return (pd.DataFrame(columns=NEAR_DUP_CLUSTER_COLUMNS), pd.DataFrame(columns=NEAR_DUP_MEMBER_COLUMNS))
+    members = pd.concat(frames).sort_values(["cluster", "representative", "similarity"],
+                                            ascending=[True, False, False], kind="stable")
+    reps = members[members["representative"]].drop_duplicates("cluster").set_index("cluster")
+    clusters = members.groupby("cluster").agg(
+        kind=("kind", "first"), records=("name", "size"), texts=("_code", "nunique"), orgs=("org", "nunique"),
+        files=("source", "nunique"), min_similarity=("similarity", "min"),
+    ).join(reps[["name", "text", "source", "org"]]).reset_index()
+    clusters = clusters.sort_values(["records", "cluster"], ascending=[False, True], kind="stable")
+    return clusters[NEAR_DUP_CLUSTER_COLUMNS].reset_index(drop=True), members[NEAR_DUP_MEMBER_COLUMNS].reset_index(drop=True)
+
+def near_dup_report_json(clusters: pd.DataFrame, members: pd.DataFrame, threshold: float) -> bytes:
+    """검토용 묶음 보고서: 묶음마다 대표 문구 + 구성 문서"""
+    grouped = {c: g.drop(columns=["cluster", "kind"]).to_dict("records") for c, g in members.groupby("cluster")}
+    report = {
+        "threshold": threshold,
+        "clusters": [{**{k: row[k] for k in ("cluster", "kind", "records", "texts", "orgs", "files", "min_similarity")},
+                      "representative": {k: row[k] for k in ("name", "text", "source", "org")},
+                      "members": grouped.get(row["cluster"], [])}
+                     for row in clusters.to_dict("records")],
+    }
+    return json.dumps(report, ensure_ascii=False, indent=2, default=lambda o: o.item()).encode("utf-8")
+
+# ==========================
+# 도구 1 변경분 (직전 실행 대비 행 단위 change feed)
+# ==========================
+FEED_STORE_PATH = APP_DIR / "tool1_snapshots.sqlite3"
+FEED_FIRST_ROW = 12  # excel_to_json_records의 첫 행 (D12)
+FEED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS source_snapshots (namespace TEXT, source TEXT, org TEXT, job TEXT, digest TEXT,
+                                             records TEXT, updated_at REAL, PRIMARY KEY (namespace, source));
+"""
+
+def item_ids(items: List[Tuple[Any, Any]]) -> List[str]:
+    """(이름, 설명) → 행 식별자: 이름 비교 키(비어 있으면 설명) + 같은 키 중 몇 번째인지 → 행을 끼워 넣거나 옮겨도 유지"""
+    seen: Dict[str, int] = {}
+    ids = []
+    for name, desc in items:
+        key = corpus_key(name) or "desc:" + corpus_key(desc)
+        seen[key] = seen.get(key, 0) + 1
+        ids.append(hashlib.blake2b(f"{key}\0{seen[key]}".encode("utf-8"), digest_size=8).hexdigest())
+    return ids
+
+def match_items(old_items: List[Tuple[Any, Any]], new_items: List[Tuple[Any, Any]]) -> Tuple[List[Optional[int]], List[str], List[str]]:
+    """(이름, 설명) 목록끼리 대응 → (새 항목별 옛 위치 또는 None, 옛 식별자, 새 식별자). dict 조회만 하므로 항목 수에 비례.
+    1) 식별자가 같은 항목끼리  2) 남은 항목 중 설명이 같은 항목은 이름만 바뀐 것으로 연결"""
+    old_ids, new_ids = item_ids(old_items), item_ids(new_items)
+    old_by_id = {rid: i for i, rid in enumerate(old_ids)}
+    match = [old_by_id.get(rid) for rid in new_ids]
+    left = set(range(len(old_items))) - {i for i in match if i is not None}
+    by_desc: Dict[str, List[int]] = {}
+    for i in sorted(left, reverse=True):  # pop()이 앞쪽 항목부터 꺼내도록 역순으로 쌓음
+        key = corpus_key(old_items[i][1])
+        if key:
+            by_desc.setdefault(key, []).append(i)
+    for j, i in enumerate(match):
+        if i is None:
+            cands = by_desc.get(corpus_key(new_items[j][1]))
+            if cands:
+                match[j] = cands.pop()
+    return match, old_ids, new_ids
+
+def task_items(records: List[Dict[str, Any]]) -> List[Tuple[Any, Any]]:
+    return [(r.get("task_name"), r.get("task_description")) for r in records]
+
+def feed_row_ids(records: List[Dict[str, Any]]) -> List[str]:
+    """도구 1 레코드의 행 식별자 (item_ids 참고)"""
+    return item_ids(task_items(records))
+
+def record_field_diffs(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """필드 단위 차이 {필드: {old, new}} (tech_stack은 'tech_stack.분류'별)"""
+    diffs = {f: {"old": old.get(f), "new": new.get(f)}
+             for f in ("task_name", "task_description") if old.get(f) != new.get(f)}
+    old_tech, new_tech = old.get("tech_stack") or {}, new.get("tech_stack") or {}
+    for cat in dict.fromkeys([*old_tech, *new_tech]):
+        if old_tech.get(cat, []) != new_tech.get(cat, []):
+            diffs[f"tech_stack.{cat}"] = {"old": old_tech.get(cat, []), "new": new_tech.get(cat, [])}
+    return diffs
+
+def record_change_feed(old_records: List[Dict[str, Any]], new_records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """직전/이번 레코드 → 추가·삭제·수정 목록 (match_items로 대응하므로 레코드 수에 비례).
+    Task 명만 바뀐 행은 설명으로 이어 수정(previous_id 포함)으로 냅니다."""
+    match, old_ids, new_ids = match_items(task_items(old_records), task_items(new_records))
+    left = set(range(len(old_records))) - {i for i in match if i is not None}
+    changes = []
+    for j, (rid, rec, i) in enumerate(zip(new_ids, new_records, match)):
+        if i is None:
+            changes.append({"op": "added", "id": rid, "row": FEED_FIRST_ROW + j, "record": rec})
+            continue
+        diffs = record_field_diffs(old_records[i], rec)
+        if diffs:
+            change = {"op": "modified", "id": rid, "row": FEED_FIRST_ROW + j, "task_name": rec.get("task_name"),
+                      "changes": diffs}
+            if old_ids[i] != rid:
+                change["previous_id"] = old_ids[i]
+            changes.append(change)
+    changes += [{"op": "removed", "id": old_ids[i], "row": FEED_FIRST_ROW + i,
+                 "task_name": old_records[i].get("task_name")} for i in sorted(left)]
+    return changes
+
+class ChangeFeedStore:
+    """(네임스페이스, 소스 파일명)별 직전 실행의 도구 1 레코드 (로컬 SQLite).
+    저장소 파일은 이 서버의 모든 세션이 함께 쓰므로, 같은 이름의 다른 워크북과 섞이지 않도록
+    팀/프로젝트처럼 명시한 네임스페이스 안에서만 비교합니다.
+    내용(digest)이 바뀐 실행에서만 변경분을 만들고 스냅숏을 교체하므로, 같은 내용을 다시 올리면 변경분은 비어 있습니다."""
+
+    def __init__(self, namespace: str, path: Union[str, Path] = FEED_STORE_PATH):
+        if not namespace.strip():
+            raise ValueError("변경분 네임스페이스가 비어 있습니다.")
+        self.namespace = namespace.strip()
+        self.path = str(path)
+        with self._connect() as con:
+            con.executescript(FEED_SCHEMA)
+
+    def _connect(self):
+        return sqlite_session(self.path)
+
+    def advance(self, source: str, digest: str, records: List[Dict[str, Any]],
+                identity: Tuple[str, str] = ("", "")) -> Dict[str, Any]:
+        """이번 실행 기록 → {namespace, source, org, job, previous_digest, digest, summary, changes}"""
+        org, job = identity
+        with self._connect() as con:
+            row = con.execute("SELECT digest, records FROM source_snapshots WHERE namespace = ? AND source = ?",
+                              (self.namespace, source)).fetchone()
+            if row and row[0] == digest:
+                changes = []
+            else:
+                changes = record_change_feed(json.loads(row[1]) if row else [], records)
+                con.execute("INSERT OR REPLACE INTO source_snapshots VALUES (?,?,?,?,?,?,?)",
+                            (self.namespace, source, org, job, digest, json.dumps(records, ensure_ascii=False),
+                             time.time()))
+        summary = {op: sum(1 for c in changes if c["op"] == op) for op in ("added", "removed", "modified")}
+        summary["unchanged"] = len(records) - summary["added"] - summary["modified"]
+        return {"namespace": self.namespace, "source": source, "org": org, "job": job,
+                "previous_digest": row[0] if row else None, "digest": digest, "summary": summary, "changes": changes}
+
+def get_change_feed_store() -> Optional[ChangeFeedStore]:
+    """도구 1의 '직전 실행 대비 변경분 기록'을 켜고 네임스페이스를 적었을 때만 저장소를 엶 (기본은 꺼짐)"""
+    namespace = str(st.session_state.get("feed_namespace_s1") or "").strip()
+    if not st.session_state.get("feed_enabled_s1", False) or not namespace:
+        return None
+    try:
+        return ChangeFeedStore(namespace)
+    except sqlite3.Error as e:
+        logger.warning(f"변경분 저장소를 열 수 없습니다 ({FEED_STORE_PATH}): {e}")
+        return None
+
+def feed_sources(names: List[str], digests: List[str]) -> List[str]:
+    """업로드 파일별 스냅숏 이름. 이름이 같고 내용이 다른 파일은 업로드 순서대로 '이름 (2)'처럼 구분
+    (이름과 내용이 모두 같으면 같은 스냅숏)"""
+    by_key: Dict[Tuple[str, str], str] = {}
+    count: Dict[str, int] = {}
+    sources = []
+    for name, digest in zip(names, digests):
+        if (name, digest) not in by_key:
+            count[name] = count.get(name, 0) + 1
+            by_key[(name, digest)] = name if count[name] == 1 else f"{name} ({count[name]})"
+        sources.append(by_key[(name, digest)])
+    return sources
+
+def advance_change_feed(store: Optional[ChangeFeedStore], source: str, name: str, digest: str,
+                        records: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """변환 흐름에서 호출: source는 스냅숏 이름(ZIP 항목은 폴더 포함 경로), 조직/직무는 파일명 name에서.
+    저장소 오류는 경고만 남기고 변환은 계속"""
+    if store is None:
+        return None
+    try:
+        return store.advance(source, digest, records, parse_org_role_from_filename_nt(name)[:2])
+    except Exception as e:
+        logger.warning(f"{source} 변경분 기록 실패: {e}")
+        return None
+
+def change_feed_jsonl(feeds: List[Dict[str, Any]]) -> bytes:
+    """하류 적재용 JSON Lines: 변경 1건 = 1줄 (namespace, source 포함)"""
+    return "".join(json.dumps({"namespace": f["namespace"], "source": f["source"], **c}, ensure_ascii=False) + "\n"
+                   for f in feeds for c in f["changes"]).encode("utf-8")
+
+# ==========================
+# 입력 사전 검증 (배치 변환 전 1회)
+# ==========================
+SHAPE_TOOL1_LIST  = "도구 1 형식 (Task 목록)"
+SHAPE_NESTED      = "도구 2 형식 (skills[].skill)"
+SHAPE_FLAT        = "도구 2 형식 (skills[] 평면)"
+SHAPE_TASKS_ONLY  = "도구 2 형식 (tasks만)"
+SHAPE_UNKNOWN     = "알 수 없음"
+MAX_TASKS_NT  = TASK_END_ROW_NT - TASK_START_ROW_NT + 1
+MAX_SKILLS_NT = SKILL_END_ROW_NT - SKILL_START_ROW_NT + 1
+
+class InputCheck:
+    """TXT 파일 1개의 사전 검증 결과: 감지된 입력 형식, 오류(변환 불가), 경고(변환은 되지만 확인 필요)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.shape = SHAPE_UNKNOWN
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def summary(self) -> str:
+        if self.errors:
+            return "❌ " + "; ".join(self.errors)
+        if self.warnings:
+            return "⚠️ " + "; ".join(self.warnings)
+        return "✅"
+
+def json_error_hint(e: json.JSONDecodeError) -> str:
+    lines = e.doc.splitlines() or [""]
+    line = lines[min(e.lineno, len(lines)) - 1]
+    excerpt = line[max(0, e.colno - 30): e.colno + 30].strip()
+    return f"JSON 파싱 실패: {e.msg} (줄 {e.lineno}, 열 {e.colno}: `{excerpt}`)"
+
+def detect_input_shape(data: Any) -> str:
+    if isinstance(data, list):
+        return SHAPE_TOOL1_LIST
+    if not isinstance(data, dict):
+        return SHAPE_UNKNOWN
+    skills = data.get("skills")
+    if isinstance(skills, list) and skills:
+        first = skills[0]
+        return SHAPE_NESTED if isinstance(first, dict) and "skill" in first else SHAPE_FLAT
+    if "skills" in data or "tasks" in data:
+        return SHAPE_TASKS_ONLY
+    return SHAPE_UNKNOWN
+
+def check_tasks(data: Any, check: InputCheck) -> List[Dict[str, Any]]:
+    tasks = data if isinstance(data, list) else data.get("tasks")
+    if tasks is None:
+        if data.get("skills"):
+            check.warnings.append("'tasks' 없음 (Task 시트가 비어 있게 됨)")
+        else:
+            check.errors.append("'tasks'와 'skills'가 모두 없음")
+        return []
+    if not isinstance(tasks, list):
+        check.errors.append(f"'tasks'가 목록이 아님 ({type(tasks).__name__})")
+        return []
+    bad = [i for i, t in enumerate(tasks) if not isinstance(t, dict)]
+    if bad:
+        check.errors.append(f"Task 항목이 객체가 아님: {len(bad)}개 (첫 위치 {bad[0]})")
+    tasks = [t for t in tasks if isinstance(t, dict)]
+    unnamed = sum(1 for t in tasks if not str(t.get("task_name") or "").strip())
+    if unnamed:
+        check.warnings.append(f"task_name 없는 Task {unnamed}개")
+    return tasks
+
+def check_skills(data: Any, check: InputCheck) -> List[Dict[str, Any]]:
+    if isinstance(data, list):
+        return []  # 도구 1 형식은 Task를 스킬로도 사용
+    skills = data.get("skills")
+    if skills is None:
+        check.warnings.append("'skills' 없음 (Skill 시트가 비어 있게 됨)")
+        return []
+    if not isinstance(skills, list):
+        check.errors.append(f"'skills'가 목록이 아님 ({type(skills).__name__})")
+        return []
+    for i, item in enumerate(skills):
+        if isinstance(item, dict) and "skill" in item and not isinstance(item["skill"] or {}, dict):
+            check.errors.append(f"skills[{i}].skill이 객체가 아님")
+            break
+    return skills
+
+def validate_txt_input(name: str, raw: bytes, mode: str) -> InputCheck:
+    """TXT(JSON) 1개를 템플릿을 열기 전에 검사 (형식 감지 + 모드별 필수 구조, 파싱은 모드 수와 무관하게 1회)"""
+    check = InputCheck(name)
+    if not raw.strip():
+        check.errors.append("빈 파일")
+        return check
+    try:
+        data = load_json_from_txt_bytes(raw)
+    except json.JSONDecodeError as e:
+        check.errors.append(json_error_hint(e))
+        return check
+    check.shape = detect_input_shape(data)
+    if check.shape == SHAPE_UNKNOWN:
+        top = f"키: {', '.join(list(data)[:5])}" if isinstance(data, dict) else type(data).__name__
+        check.errors.append(f"지원하지 않는 구조 ({top}) — 'tasks'/'skills' 객체 또는 도구 1 Task 목록이어야 함")
+        return check
+
+    tasks = check_tasks(data, check)
+    skills = check_skills(data, check)
+    meta = (data.get("meta") or {}) if isinstance(data, dict) else {}
+    has_task_tracks = any(isinstance(t.get("track"), dict) and t["track"].get("name") for t in tasks)
+    has_track_info = has_task_tracks or (isinstance(meta, dict) and bool(meta.get("tracks")))
+
+    modes = output_modes(mode)
+    if "Non Track" in modes:
+        if has_track_info and mode == "Non Track":
+            check.warnings.append("트랙 정보가 있음 — Track 모드 파일일 수 있음")
+        if len(tasks) > MAX_TASKS_NT:
+            check.warnings.append(f"Task {len(tasks)}개 중 처음 {MAX_TASKS_NT}개만 기록")
+        if len(skills) > MAX_SKILLS_NT:
+            check.warnings.append(f"Skill {len(skills)}개 중 처음 {MAX_SKILLS_NT}개만 기록")
+    if "Track" not in modes:
+        return check
+
+    # Track (Non Track + Track이면 Track 조건까지 통과해야 변환)
+    if check.shape == SHAPE_TOOL1_LIST:
+        check.errors.append("도구 1 형식(Task 목록)은 Track 모드에서 지원하지 않음 — Non Track 모드를 사용하세요")
+        return check
+    if not isinstance(meta, dict):
+        check.errors.append(f"'meta'가 객체가 아님 ({type(meta).__name__})")
+        return check
+    meta_tracks = meta.get("tracks") or []
+    if meta_tracks:
+        check.shape += " + meta.tracks"
+        if not isinstance(meta_tracks, list) or not all(isinstance(tr, dict) for tr in meta_tracks):
+            check.errors.append("'meta.tracks'는 객체 목록이어야 함")
+            return check
+        unnamed = [i for i, tr in enumerate(meta_tracks, start=1) if not str(tr.get("track_name") or "").strip()]
+        if unnamed:
+            check.errors.append(f"이름(track_name) 없는 트랙: {', '.join(map(str, unnamed))}번")
+        task_tracks = {(t.get("track") or {}).get("name") for t in tasks if isinstance(t.get("track"), dict)}
+        empty = [tr.get("track_name") for tr in meta_tracks if tr.get("track_name") and tr.get("track_name") not in task_tracks]
+        if empty:
+            check.warnings.append(f"Task가 없는 트랙: {', '.join(map(str, empty))}")
+    elif has_task_tracks:
+        check.shape += " + tasks[].track"
+        bad = [i for i, t in enumerate(tasks) if "track" in t and not isinstance(t["track"], dict)]
+        if bad:
+            check.errors.append(f"tasks[{bad[0]}].track이 객체가 아님")
+    else:
+        check.errors.append("트랙 정보 없음 (meta.tracks 또는 tasks[].track.name 필요) — Non Track 모드 파일일 수 있음")
+    return check
+
+def validate_upload(uploaded_file, mode: str) -> InputCheck:
+    return validate_txt_input(uploaded_file.name, upload_bytes(uploaded_file), mode)
+
+def preflight_txt_batch(uploads: List[Any], mode: str, cache: Optional[Dict[Any, InputCheck]] = None) -> List[InputCheck]:
+    """배치 전체를 한 번에 검사 (워크북 생성 전).
+    cache를 넘기면 (파일명, 모드, 내용 해시)가 같은 파일은 다시 파싱하지 않고, 이번 배치에 없는 항목은 비웁니다."""
+    if cache is None:
+        return [validate_upload(uf, mode) for uf in uploads]
+    checks, seen = [], set()
+    for uf in uploads:
+        raw = upload_bytes(uf)
+        key = (uf.name, mode, hashlib.sha256(raw).hexdigest())
+        if key not in cache:
+            cache[key] = validate_txt_input(uf.name, raw, mode)
+        checks.append(cache[key]); seen.add(key)
+    for key in set(cache) - seen:
+        del cache[key]
+    return checks
+
+# ==========================
+# 통합 워크북 (여러 직무 → 파일 1개)
+# ==========================
+COMBINED_INDEX_SHEET = "목록"
+SHEET_TITLE_MAX = 31
+INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+def combined_sheet_prefix(n: int, width: int, role: str, suffix_len: int) -> str:
+    """통합 워크북의 직무별 시트 이름 앞부분: '07_직무명_' (시트 이름 31자 제한 안에서 직무명을 자름)"""
+    head = f"{n:0{width}d}_"
+    room = SHEET_TITLE_MAX - len(head) - suffix_len - 1
+    role = INVALID_SHEET_CHARS.sub("", str(role or "")).strip()[:max(room, 0)].strip()
+    return f"{head}{role}_" if role else head
+
+def combined_output_name(mode: str, orgs: List[str]) -> str:
+    org = orgs[0] if len(set(orgs)) == 1 else "여러 조직"
+    return f"{mode}_Paper Interview_{sanitize_filename_component(org, 'org')}_통합({len(orgs)}개 직무).xlsx"
+
+def write_combined_index(ws, rows: List[Dict[str, Any]]):
+    headers = ["No", "상위조직명", "직무명", "트랙", "원본 파일", "Task 시트", "Skill 시트"]
+    widths = [6, 20, 30, 20, 40, 34, 34]
+    header_font = Font(bold=True)
+    for c, (h, w) in enumerate(zip(headers, widths), start=1):
+        ws.cell(row=1, column=c, value=h).font = header_font
+        ws.column_dimensions[ws.cell(row=1, column=c).column_letter].width = w
+    for r, row in enumerate(rows, start=2):
+        values = [row["no"], row["org"], row["role"], row["track"], row["source"], row["task_sheet"], row["skill_sheet"]]
+        for c, v in enumerate(values, start=1):
+            ws.cell(row=r, column=c, value=v)
+        for c in (6, 7):  # 시트 이름 셀 → 해당 시트로 이동 (문서 내부 링크)
+            cell = ws.cell(row=r, column=c)
+            cell.hyperlink = Hyperlink(ref=cell.coordinate, location=f"'{cell.value}'!A1")
+            cell.style = "Hyperlink"
+    ws.freeze_panes = "A2"
+
+def build_combined_workbook(template_bytes: TemplateSource, jobs: List[Tuple[str, Dict[str, Any]]], mode: str,
+                            timer: Optional[StageTimer] = None, cancel: Optional[threading.Event] = None,
+                            on_job: Optional[Callable[[int, str], None]] = None) -> Tuple[BytesIO, List[Optional[str]]]:
+    """jobs = [(원본 파일명, data)] → 직무(Track은 직무×트랙)마다 Task/Skill 시트 한 쌍을 담은 워크북 1개.
+    템플릿 로드·VBA 서식·저장은 한 번만 하고, 맨 앞에 시트 목록을 둡니다. (결과, 직무별 오류 메시지)를 반환"""
+    timer = timer or StageTimer()
+    on_job = on_job or (lambda k, status: None)
+    with timer.stage("load_template", len(template_bytes)):
+        wb = open_template_workbook(template_bytes)
+    if mode == "Track":
+        base_task, base_skill = TASK_TEMPLATE_SHEET_T, SKILL_TEMPLATE_SHEET_T
+    else:
+        base_task = "Task" if "Task" in wb.sheetnames else wb.sheetnames[0]
+        base_skill = "Skill" if "Skill" in wb.sheetnames else wb.sheetnames[1]
+    index_ws = wb.create_sheet(COMBINED_INDEX_SHEET, index=1 if "Description" in wb.sheetnames else 0)
+
+    width = len(str(len(jobs)))
+    suffix_len = len("트랙 99_Skill") if mode == "Track" else len("Skill")
+    index_rows: List[Dict[str, Any]] = []
+    errors: List[Optional[str]] = [None] * len(jobs)
+    for k, (source, data) in enumerate(jobs):
+        if cancel is not None and cancel.is_set():
+            on_job(k, FILE_CANCELLED); continue
+        on_job(k, FILE_RUNNING)
+        _, (org, role) = txt_output_identity(source, mode)
+        prefix = combined_sheet_prefix(k + 1, width, role, suffix_len)
+        before = set(wb.sheetnames)
+        try:
+            if mode == "Track":
+                data = job_input(data)
+                added = add_track_sheets(wb, org, role, data, timer, title_prefix=prefix)
+                for tr, (task_title, skill_title) in zip(data.tracks, zip(added[::2], added[1::2])):
+                    index_rows.append({"no": k + 1, "org": org, "role": role, "track": tr.name, "source": source,
+                                       "task_sheet": task_title, "skill_sheet": skill_title})
+            else:
+                with timer.stage("copy_sheets"):
+                    ws_task = copy_sheet_by_template(wb, base_task, f"{prefix}Task")
+                    ws_skill = copy_sheet_by_template(wb, base_skill, f"{prefix}Skill")
+                with timer.stage("fill_task"):
+                    fill_task_sheet_nt(ws_task, org, role, data)
+                with timer.stage("fill_skill"):
+                    fill_skill_sheet_nt(ws_skill, org, role, data)
+                index_rows.append({"no": k + 1, "org": org, "role": role, "track": "", "source": source,
+                                   "task_sheet": ws_task.title, "skill_sheet": ws_skill.title})
+            on_job(k, FILE_DONE)
+        except Exception as e:
+            for title in set(wb.sheetnames) - before:  # 실패한 직무의 시트는 제거
+                wb.remove(wb[title])
+            logger.exception(f"{source} 통합 워크북 추가 실패")
+            errors[k] = f"{source} → 실패: {e}"
+            on_job(k, FILE_FAILED)
+
+    for base in (base_task, base_skill):
+        if base in wb.sheetnames:
+            wb.remove(wb[base])
+    with timer.stage("write_index"):
+        write_combined_index(index_ws, index_rows)
+    apply_vba_styles(wb, timer)
+    return save_workbook_to_bytesio(wb, timer), errors
+
+# ==========================
+# 기존 워크북 업데이트 (검토 내용 유지)
+# ==========================
+# 템플릿이 소유한(변환기가 쓰는) 열과 검토자 수정안 열
+TASK_OWNED_COLS, TASK_CORRECTION_COLS   = ("A", "C"), ("B", "D")
+SKILL_OWNED_COLS, SKILL_CORRECTION_COLS = ("A", "B", "D", "F"), ("C", "E", "G")
+
+def owned_cells(cols: Tuple[str, ...], row_start: int, row_end: int, headers: Tuple[str, ...]) -> List[str]:
+    return list(headers) + [f"{c}{r}" for r in range(row_start, row_end + 1) for c in cols]
+
+def cell_text_value(v: Any) -> str:
+    return "" if v is None else str(v)
+
+def sync_sheet_values(ws, desired: Dict[str, Any], cells: List[str], write: Callable[[Any, str, Any], None],
+                      changes: List[Dict[str, Any]]):
+    """cells 중 현재 값과 desired가 다른 셀만 write로 다시 씀 (desired에 없으면 빈 값)"""
+    for coord in cells:
+        new = desired.get(coord)
+        if coord in ("B1", "B2") and isinstance(new, str):
+            new = unicodedata.normalize("NFC", new)  # 생성 시 한글 교정(VBA)과 같은 값으로 비교
+        if isinstance(ws[coord], MergedCell):  # 병합 영역 안쪽 셀은 값을 가질 수 없음
+            continue
+        old = ws[coord].value
+        if cell_text_value(old) == cell_text_value(new):
+            continue
+        write(ws, coord, new)
+        changes.append({"sheet": ws.title, "cell": coord, "old": old, "new": new})
+
+def sheet_item(values: Dict[str, Any], name_col: str, desc_col: str, r: int) -> Tuple[str, str]:
+    return (cell_text_value(values.get(f"{name_col}{r}")).strip(), cell_text_value(values.get(f"{desc_col}{r}")).strip())
+
+def relocate_corrections(ws, desired: Dict[str, Any], name_col: str, desc_col: str, correction_cols: Tuple[str, ...],
+                         row_start: int, row_end: int, changes: List[Dict[str, Any]], notes: List[str]):
+    """수정안 열을 행 번호가 아닌 항목(이름 식별자, 없으면 설명) 기준으로 새 행 위치에 옮김.
+    desired를 쓰기 전에 호출합니다. 새 JSON에 없는 항목이나, 항목 없던 행에 새 항목이 들어온 경우의 수정안은
+    다른 항목 옆에 남지 않도록 지우고 notes에 원문을 남깁니다."""
+    rows = range(row_start, row_end + 1)
+    current = {f"{c}{r}": ws[f"{c}{r}"].value for r in rows for c in (name_col, desc_col)}
+    old_rows = [r for r in rows if any(sheet_item(current, name_col, desc_col, r))]
+    new_rows = [r for r in rows if any(sheet_item(desired, name_col, desc_col, r))]
+    match, _, _ = match_items([sheet_item(current, name_col, desc_col, r) for r in old_rows],
+                              [sheet_item(desired, name_col, desc_col, r) for r in new_rows])
+    saved = {r: {c: ws[f"{c}{r}"].value for c in correction_cols} for r in rows}
+    target: Dict[int, Dict[str, Any]] = {r: {} for r in rows}
+    placed = set()
+    for j, i in enumerate(match):
+        if i is not None:
+            target[new_rows[j]] = saved[old_rows[i]]
+            placed.add(old_rows[i])
+    for r in set(rows) - set(old_rows) - set(new_rows):  # 항목이 없던 행이 계속 비어 있으면 그대로
+        target[r] = saved[r]
+        placed.add(r)
+    for r in rows:
+        if r in placed:
+            continue
+        name = sheet_item(current, name_col, desc_col, r)[0]
+        for c, v in saved[r].items():
+            if cell_text_value(v).strip():
+                where = f"항목 '{name}'이(가) 새 JSON에 없어" if r in old_rows else "항목이 없던 행에 새 항목이 들어와"
+                notes.append(f"{ws.title}!{c}{r} 수정안을 지웠습니다 — {where} 옮길 곳이 없습니다: {cell_text_value(v)}")
+    for r in rows:
+        for c in correction_cols:
+            coord = f"{c}{r}"
+            if isinstance(ws[coord], MergedCell):
+                continue
+            old, new = ws[coord].value, target[r].get(c)
+            if cell_text_value(old) != cell_text_value(new):
+                ws[coord].value = new
+                changes.append({"sheet": ws.title, "cell": coord, "old": old, "new": new})
+
+def write_text_nt(ws, coord: str, value: Any):
+    set_text(ws, coord, value or "")
+
+def track_value_writer(wrap_cols: Tuple[str, ...]) -> Callable[[Any, str, Any], None]:
+    def write(ws, coord: str, value: Any):
+        write_track_values(ws, {coord: value if value != "" else None}, wrap_cols)
+    return write
+
+def clear_data_rows(ws, cols: Tuple[str, ...], row_start: int, row_end: int):
+    for r in range(row_start, row_end + 1):
+        for c in cols:
+            if not isinstance(ws[f"{c}{r}"], MergedCell):
+                ws[f"{c}{r}"].value = None
+
+def update_workbook_nontrack(existing: bytes, org: str, role: str, data: Union[Dict[str, Any], JobInput],
+                             timer: Optional[StageTimer] = None) -> Tuple[Optional[BytesIO], List[Dict[str, Any]], List[str]]:
+    """생성된 Non Track 워크북의 템플릿 소유 셀(Task A/C, Skill A/B/D/F, B1/B2) 중 달라진 셀만 다시 씀.
+    수정안 열은 항목을 따라 옮김 (relocate_corrections).
+    (바뀐 워크북 또는 변경 없음이면 None, 변경 셀 목록, 참고 메시지)"""
+    timer = timer or StageTimer()
+    with timer.stage("load_existing", len(existing)):
+        wb = load_workbook(BytesIO(existing))
+    changes: List[Dict[str, Any]] = []
+    notes: List[str] = []
+    data = job_input(data)
+    with timer.stage("sync"):
+        ws_task  = wb["Task"] if "Task" in wb.sheetnames else wb[wb.sheetnames[0]]
+        ws_skill = wb["Skill"] if "Skill" in wb.sheetnames else wb[wb.sheetnames[1]]
+        desired = task_sheet_values_nt(org, role, data)
+        relocate_corrections(ws_task, desired, "A", "C", TASK_CORRECTION_COLS,
+                             TASK_START_ROW_NT, TASK_END_ROW_NT, changes, notes)
+        sync_sheet_values(ws_task, desired,
+                          owned_cells(TASK_OWNED_COLS, TASK_START_ROW_NT, TASK_END_ROW_NT, ("B1", "B2")),
+                          write_text_nt, changes)
+        desired = skill_sheet_values_nt(org, role, data)
+        relocate_corrections(ws_skill, desired, "B", "D", SKILL_CORRECTION_COLS,
+                             SKILL_START_ROW_NT, SKILL_END_ROW_NT, changes, notes)
+        sync_sheet_values(ws_skill, desired,
+                          owned_cells(SKILL_OWNED_COLS, SKILL_START_ROW_NT, SKILL_END_ROW_NT, ("B1", "B2")),
+                          write_text_nt, changes)
+    if not changes:
+        return None, changes, notes
+    return save_workbook_to_bytesio(wb, timer), changes, notes
+
+def update_workbook_track(existing: bytes, org: str, job: str, data: Union[Dict[str, Any], JobInput],
+                          timer: Optional[StageTimer] = None) -> Tuple[Optional[BytesIO], List[Dict[str, Any]], List[str]]:
+    """생성된 Track 워크북의 '트랙 n_Task/Skill' 시트에서 템플릿 소유 셀 중 달라진 셀만 다시 씀 (수정안 열은 항목을 따라 옮김).
+    새 트랙은 기존 트랙 시트를 복사(값·수정안 비움)해 추가하고, JSON에서 빠진 트랙 시트는 그대로 둡니다."""
+    timer = timer or StageTimer()
+    with timer.stage("load_existing", len(existing)):
+        wb = load_workbook(BytesIO(existing))
+    changes: List[Dict[str, Any]] = []
+    notes: List[str] = []
+    data = job_input(data)
+    grouped = tasks_by_track(data.tasks)
+    with timer.stage("sync"):
+        for kind, owned, corrections, row_start, row_end, wrap_cols, name_col, desc_col in (
+            ("Task", TASK_OWNED_COLS, TASK_CORRECTION_COLS, TASK_ROW_START_T, TASK_ROW_END_T, TASK_WRAP_COLS_T, "A", "C"),
+            ("Skill", SKILL_OWNED_COLS, SKILL_CORRECTION_COLS, SKILL_ROW_START_T, SKILL_ROW_END_T, SKILL_WRAP_COLS_T, "B", "D"),
+        ):
+            existing_titles = [t for t in wb.sheetnames if re.fullmatch(rf"트랙 \d+_{kind}", t)]
+            for tr in data.tracks:
+                title = f"트랙 {tr.index}_{kind}"
+                if title not in wb.sheetnames:
+                    if not existing_titles:
+                        notes.append(f"{title}: 복사할 기존 트랙 시트가 없어 추가하지 못했습니다.")
+                        continue
+                    ws = copy_sheet_by_template(wb, existing_titles[0], title)
+                    clear_data_rows(ws, owned + corrections, row_start, row_end)
+                    notes.append(f"{title}: 새 트랙 시트 추가")
+                ws = wb[title]
+                if kind == "Task":
+                    items = select_tasks_for_track(grouped, tr.name, limit=(TASK_ROW_END_T - TASK_ROW_START_T + 1))
+                    desired = task_sheet_values_t(org, job, tr.name, items)
+                else:
+                    items = select_skills_for_track(data.skills, tr.name, tr.code, limit=(SKILL_ROW_END_T - SKILL_ROW_END_T + 1))
+                    desired = skill_sheet_values_t(org, job, tr.name, items)
+                relocate_corrections(ws, desired, name_col, desc_col, corrections, row_start, row_end, changes, notes)
+                sync_sheet_values(ws, desired, owned_cells(owned, row_start, row_end, ("B1", "B2", "D1")),
+                                  track_value_writer(wrap_cols), changes)
+            wanted = {f"트랙 {tr.index}_{kind}" for tr in data.tracks}
+            for title in existing_titles:
+                if title not in wanted:
+                    notes.append(f"{title}: 새 JSON에 없는 트랙 — 시트를 그대로 두었습니다.")
+    if not changes:
+        return None, changes, notes
+    return save_workbook_to_bytesio(wb, timer), changes, notes
+
+def update_existing_workbook(existing: bytes, txt_name: str, raw: bytes, mode: str,
+                             timer: Optional[StageTimer] = None) -> Tuple[Optional[BytesIO], List[Dict[str, Any]], List[str]]:
+    """TXT 파일명 규칙으로 조직/직무를 정해 기존 워크북을 증분 업데이트"""
+    timer = timer or StageTimer(f"{mode} 업데이트", txt_name)
+    _, (org, role) = txt_output_identity(txt_name, mode)
+    with timer.stage("parse_json", len(raw)):
+        data = job_input(load_json_from_txt_bytes(raw))
+    update_fn = update_workbook_track if mode == "Track" else update_workbook_nontrack
+    return update_fn(existing, org, role, data, timer=timer)
+
+# ==========================
+# ZIP 입력 (항목을 하나씩 풀어 처리)
+# ==========================
+ARCHIVE_SUFFIX = ".zip"
+DEFAULT_ARCHIVE_INFLIGHT_MB = 64  # 동시에 풀어 둘 수 있는 항목 크기 합계
+ARCHIVE_MAX_ENTRY_MB = 200        # 이보다 큰 항목은 풀지 않음 (압축 폭탄 방지)
+ZIP_FLAG_UTF8 = 0x800
+
+class ArchiveMember(NamedTuple):
+    """ZIP 중앙 디렉터리의 항목 1개 (아직 풀지 않은 상태). name/size는 업로드 파일과 같은 의미"""
+    archive: Any              # ZIP 업로드 파일
+    info: zipfile.ZipInfo
+    name: str                 # 폴더를 뺀 파일명 (파일명 규칙 적용 대상)
+    size: int                 # 압축 해제 크기
+
+    @property
+    def label(self) -> str:
+        """ZIP 이름 + 폴더를 포함한 항목 경로 (폴더만 다른 같은 파일명도 구분)"""
+        return f"{self.archive.name}/{archive_entry_path(self.info)}"
+
+class ArchiveEntry(NamedBytesIO):
+    """풀린 ZIP 항목. close() 시 예약해 둔 압축 해제 예산을 돌려줌"""
+
+    def __init__(self, name: str, data: bytes, budget: MemoryBudget, held: int):
+        super().__init__(name, data)
+        self._budget, self._held = budget, held
+
+    def close(self):
+        if self._held:
+            self._budget.release(self._held)
+            self._held = 0
+        super().close()
+
+def split_archive_uploads(uploads: List[Any]) -> Tuple[List[Any], List[Any]]:
+    """업로드 목록 → (일반 파일, ZIP 파일)"""
+    loose = [f for f in uploads if not f.name.lower().endswith(ARCHIVE_SUFFIX)]
+    archives = [f for f in uploads if f.name.lower().endswith(ARCHIVE_SUFFIX)]
+    return loose, archives
+
+def archive_entry_path(info: zipfile.ZipInfo) -> str:
+    """항목 경로. UTF-8 표시가 없으면 한국어 Windows 압축(cp949)으로 다시 해석"""
+    name = info.filename
+    if not info.flag_bits & ZIP_FLAG_UTF8:
+        try:
+            name = name.encode("cp437").decode("cp949")
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
+    return name
+
+def archive_entry_name(info: zipfile.ZipInfo) -> str:
+    """항목 경로에서 파일명만"""
+    return archive_entry_path(info).rsplit("/", 1)[-1]
+
+def list_archive_members(archive_file, suffixes: Tuple[str, ...]) -> List[ArchiveMember]:
+    """중앙 디렉터리만 읽어 변환 대상 항목 목록 (압축은 풀지 않음). 폴더/숨김/잠금 파일/__MACOSX 제외, 압축 순서 유지"""
+    members = []
+    with zipfile.ZipFile(BytesIO(upload_bytes(archive_file))) as zf:
+        for info in zf.infolist():
+            name = archive_entry_name(info)
+            if info.is_dir() or info.filename.startswith("__MACOSX/") or name.startswith(("~$", ".")):
+                continue
+            if name.lower().endswith(suffixes):
+                members.append(ArchiveMember(archive_file, info, name, info.file_size))
+    return members
+
+def iter_archive_entries(archive_file, members: List[ArchiveMember], budget: MemoryBudget):
+    """members를 순서대로 하나씩 풀어 (항목, ArchiveEntry 또는 None, 오류 메시지) 생성.
+    풀기 전에 항목 크기를 budget에 예약하므로, 앞서 내준 항목들이 close()될 때까지 기다려
+    동시에 풀린 바이트 합계가 예산을 넘지 않습니다 (예산보다 큰 항목 1개는 단독으로 풂)."""
+    with zipfile.ZipFile(BytesIO(upload_bytes(archive_file))) as zf:
+        for m in members:
+            if m.size > ARCHIVE_MAX_ENTRY_MB * MB:
+                yield m, None, f"압축 해제 크기 {m.size / MB:.0f}MB — 상한 {ARCHIVE_MAX_ENTRY_MB}MB 초과"
+                continue
+            held = budget.reserve(m.size)
+            try:
+                data = zf.read(m.info)  # 기록된 크기까지만 읽고 CRC 확인
+            except Exception as e:
+                budget.release(held)
+                yield m, None, f"압축 해제 실패: {e}"
+                continue
+            yield m, ArchiveEntry(m.name, data, budget, held), None
+
+def iter_uploads_with_archives(uploads: List[Any], suffixes: Tuple[str, ...]):
+    """일반 파일은 그대로, ZIP은 항목을 하나씩 풀어 생성 (다음 항목으로 넘어가면 앞 항목은 닫힘)"""
+    loose, archives = split_archive_uploads(uploads)
+    yield from loose
+    budget = MemoryBudget(DEFAULT_ARCHIVE_INFLIGHT_MB * MB)
+    for archive in archives:
+        try:
+            members = list_archive_members(archive, suffixes)
+        except zipfile.BadZipFile as e:
+            logger.warning(f"{archive.name} 건너뜀 (ZIP 읽기 실패: {e})")
+            continue
+        for m, entry, error in iter_archive_entries(archive, members, budget):
+            if entry is None:
+                logger.warning(f"{m.label} 건너뜀 ({error})")
+                continue
+            with entry:
+                yield entry
+
+# ==========================
+# 배치 변환 (메모리 예산 / 병렬)
+# ==========================
+def output_modes(mode: str) -> Tuple[str, ...]:
+    """도구 2 모드 → 생성할 워크북 종류 (MODE_BOTH는 OUTPUT_MODES 전부)"""
+    return OUTPUT_MODES if mode == MODE_BOTH else (mode,)
+
+def txt_output_identity(filename: str, mode: str) -> Tuple[Any, Any]:
+    """TXT 파일명 → (생성될 엑셀 파일명, 시트에 기록되는 (상위조직명, 직무명)).
+    MODE_BOTH는 두 값 모두 OUTPUT_MODES 순서의 튜플"""
+    if mode == MODE_BOTH:
+        names, derived = zip(*(txt_output_identity(filename, m) for m in OUTPUT_MODES))
+        return names, derived
+    if mode == "Track":
+        org, job = parse_org_and_job_from_filename_track(filename)
+        safe_org, safe_job = sanitize_filename_component(org, "org"), sanitize_filename_component(job, "job")
+        return f"Track_Paper Interview_{safe_org}_{safe_job}.xlsx", (org, job)
+    org, role_display, role_for_filename = parse_org_role_from_filename_nt(filename)
+    safe_org, safe_role = sanitize_filename_component(org, "org"), sanitize_filename_component(role_for_filename, "role")
+    return f"Non Track_Paper Interview_{safe_org}_{safe_role}.xlsx", (org, role_display)
+
+def output_names_text(names: Any) -> str:
+    """화면 표시용: 출력 파일명 (MODE_BOTH의 이름 튜플은 쉼표로 연결)"""
+    return ", ".join(names) if isinstance(names, tuple) else names
+
+def json_output_identity(filename: str) -> Tuple[str, None]:
+    """도구 1: 결과는 내용에만 의존하므로 파일명 유래 값 없음"""
+    return f"{filename.rsplit('.', 1)[0]}.json.txt", None
+
+def unique_output_name(name: Any, used: set) -> Any:
+    """이미 쓰인 이름이면 '이름 (2).xlsx' 형태로 (이름 튜플이면 각각, 도구 1 결과는 '이름 (2).json.txt')"""
+    if isinstance(name, tuple):
+        return tuple(unique_output_name(n, used) for n in name)
+    candidate, n = name, 2
+    suffix = ".json.txt" if name.endswith(".json.txt") else Path(name).suffix
+    stem = name[:len(name) - len(suffix)]
+    while candidate in used:
+        candidate = f"{stem} ({n}){suffix}"; n += 1
+    used.add(candidate)
+    return candidate
+
+def plan_batch_outputs(names: List[str], raws: List[bytes],
+                       identity: Callable[[str], Tuple[str, Any]]) -> Tuple[List[int], List[str]]:
+    """입력별 (같은 결과를 내는 대표 입력 인덱스, 충돌 없는 출력 파일명).
+    결과가 같으려면 내용(sha256)과 파일명 유래 값(identity의 두 번째 값)이 같아야 하며, 대표만 변환합니다.
+    이름 충돌 시 접미사는 업로드 순서와 무관하게 (원본 파일명, 해시) 순으로 붙입니다."""
+    digests = [hashlib.sha256(raw).hexdigest() for raw in raws]
+    reps, outs = list(range(len(names))), [""] * len(names)
+    rep_by_key: Dict[Tuple[str, Any], int] = {}
+    name_by_output: Dict[Tuple[str, Any, str], str] = {}
+    used: set = set()
+    for i in sorted(range(len(names)), key=lambda i: (names[i], digests[i])):
+        base, derived = identity(names[i])
+        reps[i] = rep_by_key.setdefault((digests[i], derived), i)
+        key = (digests[i], derived, base)
+        if key not in name_by_output:
+            name_by_output[key] = unique_output_name(base, used)
+        outs[i] = name_by_output[key]
+    return reps, outs
+
+def upload_bytes(uploaded_file) -> bytes:
+    try:
+        return uploaded_file.getvalue()
+    except AttributeError:  # getvalue가 없는 파일 객체
+        raw = uploaded_file.read(); uploaded_file.seek(0)
+        return raw
+
+FILE_PENDING, FILE_RUNNING, FILE_DONE, FILE_FAILED, FILE_CANCELLED = "대기", "변환 중", "완료", "실패", "취소"
+FILE_INVALID = "검증 실패"
+
+def convert_txt_batch(uploads: List[Any], mode: str, template_bytes: Union[TemplateSource, Dict[str, TemplateSource]],
+                      store: ResultStore,
+                      budget: Optional[MemoryBudget] = None, max_workers: int = 1,
+                      trace_memory: bool = False, profile_target: Optional[str] = None,
+                      cancel: Optional[threading.Event] = None,
+                      on_status: Optional[Callable[[int, str, Optional[str]], None]] = None,
+                      out_names: Optional[List[str]] = None, process_fn: Optional[Callable] = None,
+                      concurrent: bool = False):
+    """TXT 배치를 uploads 순서대로 변환해 store에 담고 (timers, errors, profile)을 반환.
+    파일별 예상 메모리를 budget에 예약한 뒤 실행하므로, 예산을 넘으면 병렬도가 자동으로 줄어듭니다.
+    cancel이 set되면 아직 시작하지 않은 파일은 건너뛰고, on_status(i, 상태, 결과 파일명)로 진행 상황을 알립니다.
+    out_names가 있으면 생성된 파일명 대신 그 이름으로 저장합니다 (충돌 해소된 이름).
+    MODE_BOTH는 template_bytes로 {모드: 템플릿}을 받아 파일마다 두 워크북을 만들고, out_names도 모드별 이름 튜플입니다.
+    process_fn(파일, 템플릿, timer=)을 넘기면 모드별 TXT 변환 대신 사용합니다 (예: 엑셀 → Non Track 바로 변환).
+    파일별 RSS 증감은 다른 파일의 할당이 섞이지 않는 순차 처리에서만 기록합니다 (concurrent: 호출부가 이미 병렬 실행 중)."""
+    on_status = on_status or (lambda i, status, out_name=None: None)
+    budget = budget or MemoryBudget(DEFAULT_MEMORY_BUDGET_MB * MB)
+    if trace_memory or profile_target:
+        max_workers = 1  # tracemalloc/cProfile은 프로세스 전역이라 파일별로 분리하려면 순차 처리
+    if process_fn is None and mode == MODE_BOTH:
+        # 파일 수보다 작업자가 많을 때만 파일 안의 두 빌드도 나눠 실행 (남는 작업자 활용)
+        parallel = max_workers > len(uploads)
+        process_fn = lambda uf, templates, timer=None: process_uploaded_txt_both(uf, templates, timer=timer, parallel=parallel)
+    elif process_fn is None:
+        process_fn = process_uploaded_txt_nontrack if mode == "Non Track" else process_uploaded_txt_track
+    template_size = sum(map(len, template_bytes.values())) if isinstance(template_bytes, dict) else len(template_bytes)
+    per_file_rss = not concurrent and (max_workers <= 1 or len(uploads) <= 1)
+    timers = [StageTimer(mode, uf.name) for uf in uploads]
+    errors: List[Optional[str]] = [None] * len(uploads)
+    profile: Dict[str, Any] = {}
+
+    def run(i: int):
+        uf, timer = uploads[i], timers[i]
+        estimate = estimate_conversion_bytes(getattr(uf, "size", 0) or 0, template_size)
+        if cancel is not None and cancel.is_set():
+            on_status(i, FILE_CANCELLED, None); return
+        with budget.hold(estimate):
+            if cancel is not None and cancel.is_set():  # 예산 대기 중 취소된 경우
+                on_status(i, FILE_CANCELLED, None); return
+            on_status(i, FILE_RUNNING, None)
+            try:
+                with measure_memory(timer, trace=trace_memory, rss=per_file_rss):
+                    if uf.name == profile_target:
+                        built, prof_bytes, prof_text = profile_call(process_fn, uf, template_bytes, timer=timer)
+                        profile.update({"file": uf.name, "prof": prof_bytes, "text": prof_text})
+                    else:
+                        built = process_fn(uf, template_bytes, timer=timer)
+                    if not isinstance(built, list):  # MODE_BOTH는 [(파일명, 워크북)] 여러 개
+                        built = [built]
+                    names, payloads = [name for name, _ in built], []
+                    for _, bio in built:
+                        with timer.stage("getvalue") as info:
+                            payloads.append(bio.getvalue())
+                            info["bytes"] = len(payloads[-1])
+                    del built, bio  # BytesIO 원본은 바로 해제 (결과 사본은 store에만 보관)
+                if out_names:
+                    names = [out_names[i]] if isinstance(out_names[i], str) else list(out_names[i])
+                for name, data in zip(names, payloads):
+                    store.put(name, data)
+                timer.emit_log()
+                on_status(i, FILE_DONE, output_names_text(tuple(names)))
+            except Exception as e:
+                timer.emit_log(status="error")
+                logger.exception(f"{uf.name} 변환 실패")
+                errors[i] = f"{uf.name} → 실패: {e} (line: {e.__traceback__.tb_lineno if e.__traceback__ else 'N/A'})" # 오류 디버깅을 위해 라인 번호 추가
+                on_status(i, FILE_FAILED, None)
+
+    if max_workers <= 1 or len(uploads) <= 1:
+        for i in range(len(uploads)):
+            run(i)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            list(ex.map(run, range(len(uploads))))
+    return [t for t in timers if t.stages], [e for e in errors if e], (profile or None)
+
+class ConversionJob:
+    """백그라운드 변환 작업. 작은 파일부터 처리하고, 파일별 상태/결과를 완료 즉시 노출하며, 취소를 지원합니다.
+    ZIP 업로드는 항목을 압축 순서대로 하나씩 풀어 일반 파일 다음에 변환합니다.
+    st.session_state에 보관하므로 화면 재실행(rerun)에도 진행 중인 작업이 유지됩니다."""
+
+    def __init__(self, uploads: List[Any], mode: str, template_bytes: Union[bytes, Dict[str, bytes]], budget_bytes: int,
+                 max_workers: int = 1, trace_memory: bool = False, profile_target: Optional[str] = None,
+                 combined: bool = False, corpus: Optional[CorpusIndex] = None,
+                 archive_inflight_bytes: int = DEFAULT_ARCHIVE_INFLIGHT_MB * MB):
+        if combined and mode == MODE_BOTH:
+            raise ValueError("통합 워크북은 Non Track 또는 Track 모드에서만 만들 수 있습니다")
+        self.mode = mode
+        self.combined = combined
+        self.corpus = corpus
+        loose, self.archives = split_archive_uploads(uploads)
+        self.archive_inflight_bytes = archive_inflight_bytes
+        self.errors: List[str] = []
+        members: List[ArchiveMember] = []
+        for archive in self.archives:
+            try:
+                members += list_archive_members(archive, (".txt",))
+            except zipfile.BadZipFile as e:
+                self.errors.append(f"{archive.name} → ZIP 읽기 실패: {e}")
+        # 작은 파일 우선, ZIP 항목은 압축 순서대로 뒤에
+        self.uploads = sorted(loose, key=lambda uf: getattr(uf, "size", 0) or 0) + members
+        self.template_bytes = template_bytes
+        self.max_workers = max_workers
+        self.trace_memory = trace_memory
+        self.profile_target = profile_target
+        self.store = ResultStore(memory_limit_bytes=budget_bytes // 2)
+        self.budget = MemoryBudget(budget_bytes // 2)
+        self.status: List[str] = [FILE_PENDING] * len(self.uploads)
+        self.outputs: List[Optional[str]] = [None] * len(self.uploads)
+        self.checks: List[Optional[InputCheck]] = [None] * len(self.uploads)
+        self.duplicate_of: List[Optional[str]] = [None] * len(self.uploads)
+        self.timers: List[StageTimer] = []
+        self.profile: Optional[Dict[str, Any]] = None
+        self.cancel_event = threading.Event()
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._thread = threading.Thread(target=self._run, name="conversion-job", daemon=True)
+
+    def start(self) -> "ConversionJob":
+        self._thread.start()
+        return self
+
+    def _on_status(self, i: int, status: str, out_name: Optional[str]):
+        self.status[i] = status
+        if out_name:
+            self.outputs[i] = out_name
+
+    def _on_group_status(self, indices: List[int], status: str, out_name: Optional[str]):
+        for i in indices:  # 대표 파일의 상태/결과를 같은 내용의 파일 모두에 반영
+            self._on_status(i, status, out_name)
+
+    def _run(self):
+        try:
+            # 1) 사전 검증: 실패할 파일은 템플릿/워크북 작업 없이 바로 제외 (ZIP 항목은 풀 때 검증)
+            loose = [i for i, uf in enumerate(self.uploads) if not isinstance(uf, ArchiveMember)]
+            for i, c in zip(loose, preflight_txt_batch([self.uploads[i] for i in loose], self.mode)):
+                self.checks[i] = c
+                if not c.ok:
+                    self.status[i] = FILE_INVALID
+                    self.errors.append(f"{c.name} → 검증 실패 [{c.shape}]: {'; '.join(c.errors)}")
+            valid = [i for i in loose if self.checks[i].ok]
+            # 2) 중복 제거: 같은 결과를 낼 입력은 대표 1개만 변환하고, 결과 파일명은 충돌 없이 확정
+            raws = [upload_bytes(self.uploads[i]) for i in valid]
+            reps, out_names = plan_batch_outputs(
+                [self.uploads[i].name for i in valid], raws,
+                lambda name: txt_output_identity(name, self.mode),
+            )
+            groups: Dict[int, List[int]] = {}
+            seen: Dict[Tuple[str, Any], List[int]] = {}  # (내용 해시, 파일명 유래 값) → 같은 결과를 내는 입력들
+            for j, r in enumerate(reps):
+                groups.setdefault(r, []).append(valid[j])
+                if r != j:
+                    self.duplicate_of[valid[j]] = self.uploads[valid[r]].name
+                else:
+                    seen[(hashlib.sha256(raws[j]).hexdigest(),
+                          txt_output_identity(self.uploads[valid[j]].name, self.mode)[1])] = groups[r]
+            todo = sorted(groups)  # 작은 파일 우선 순서 유지
+            used = {n for o in out_names for n in (o if isinstance(o, tuple) else (o,))}  # MODE_BOTH는 이름 튜플
+            if self.combined:
+                archive_groups, parsed = self._stream_archives(None, used, seen)
+                self._run_combined([groups[j] for j in todo] + archive_groups, parsed)
+            else:
+                # 3) 변환
+                # 배치 전체에서 템플릿 파싱은 1회 (Non Track + Track은 모드별로)
+                if isinstance(self.template_bytes, dict):
+                    template = {m: ParsedTemplate(b) for m, b in self.template_bytes.items()}
+                else:
+                    template = ParsedTemplate(self.template_bytes)
+                if todo:
+                    self.timers, errors, self.profile = convert_txt_batch(
+                        [self.uploads[valid[j]] for j in todo], self.mode, template, self.store,
+                        budget=self.budget, max_workers=self.max_workers,
+                        trace_memory=self.trace_memory, profile_target=self.profile_target,
+                        cancel=self.cancel_event,
+                        on_status=lambda k, status, out_name=None: self._on_group_status(groups[todo[k]], status, out_name),
+                        out_names=[out_names[j] for j in todo],
+                    )
+                    self.errors.extend(errors)
+                self._stream_archives(template, used, seen)
+            for group in seen.values():  # 대표보다 늦게 들어온 같은 내용의 ZIP 항목
+                self._on_group_status(group[1:], self.status[group[0]], self.outputs[group[0]])
+            # 4) 검색 인덱스 반영 (대표 입력만, 같은 내용이면 건너뜀)
+            for j in todo:
+                self._index_corpus(self.uploads[valid[j]].name, raws[j])
+        except Exception as e:
+            logger.exception("변환 작업 실패")
+            self.errors.append(f"작업 실패: {e}")
+        finally:
+            self.finished_at = time.time()
+
+    def _stream_archives(self, template: Optional[Union[ParsedTemplate, Dict[str, ParsedTemplate]]], used: set,
+                         seen: Dict[Tuple[str, Any], List[int]]) -> Tuple[List[List[int]], Dict[int, JobInput]]:
+        """ZIP 항목을 하나씩 풀어 검증 → 중복 확인 → 변환. 풀린 항목은 변환이 끝날 때까지 압축 해제 예산을 잡고 있으므로
+        한꺼번에 메모리에 올라가는 양은 archive_inflight_bytes 이내이고, 첫 항목이 풀리는 즉시 변환이 시작됩니다.
+        통합 모드(template=None)는 JobInput으로만 바꿔 두고 원문은 바로 버립니다 → (직무 그룹, 대표 인덱스별 JobInput)"""
+        index_of = {id(m): i for i, m in enumerate(self.uploads) if isinstance(m, ArchiveMember)}
+        inflight = MemoryBudget(self.archive_inflight_bytes)
+        groups: List[List[int]] = []
+        parsed: Dict[int, JobInput] = {}
+        workers = 1 if self.trace_memory else self.max_workers
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            for archive in self.archives:
+                if self.cancel_event.is_set():
+                    break
+                members = [m for m in self.uploads if isinstance(m, ArchiveMember) and m.archive is archive]
+                for m, entry, error in iter_archive_entries(archive, members, inflight):
+                    i = index_of[id(m)]
+                    if entry is None:
+                        self.status[i] = FILE_FAILED
+                        self.errors.append(f"{m.label} → {error}")
+                        continue
+                    owned = entry  # 변환 작업에 넘기기 전까지는 여기서 닫음
+                    try:
+                        if self.cancel_event.is_set():  # 남은 항목은 풀지 않음
+                            break
+                        raw = entry.getvalue()
+                        check = self.checks[i] = validate_txt_input(m.name, raw, self.mode)
+                        if not check.ok:
+                            self.status[i] = FILE_INVALID
+                            self.errors.append(f"{m.label} → 검증 실패 [{check.shape}]: {'; '.join(check.errors)}")
+                            continue
+                        base, derived = txt_output_identity(m.name, self.mode)
+                        key = (hashlib.sha256(raw).hexdigest(), derived)
+                        if key in seen:
+                            seen[key].append(i)
+                            rep_upload = self.uploads[seen[key][0]]
+                            self.duplicate_of[i] = getattr(rep_upload, "label", rep_upload.name)
+                            continue
+                        group = seen[key] = [i]
+                        self._index_corpus(m.name, raw)
+                        if template is None:
+                            parsed[i] = job_input(load_json_from_txt_bytes(raw))
+                            groups.append(group)
+                            continue
+                        ex.submit(self._convert_entry, entry, group, unique_output_name(base, used), template)
+                        owned = None
+                    finally:
+                        raw = None
+                        if owned is not None:
+                            owned.close()
+        for i, m in enumerate(self.uploads):
+            if isinstance(m, ArchiveMember) and self.status[i] == FILE_PENDING and self.cancel_event.is_set():
+                self.status[i] = FILE_CANCELLED
+        return groups, parsed
+
+    def _index_corpus(self, name: str, raw: bytes):
+        """검색 인덱스 반영. 조직/직무는 첫 출력 모드의 파일명 규칙으로 (Non Track + Track이면 Non Track)"""
+        index_corpus_source(self.corpus, name, raw, self.mode,
+                            lambda: corpus_docs_from_json(load_json_from_txt_bytes(raw)),
+                            txt_output_identity(name, output_modes(self.mode)[0])[1])
+
+    def _convert_entry(self, entry: ArchiveEntry, group: List[int], out_name: Any,
+                       template: Union[ParsedTemplate, Dict[str, ParsedTemplate]]):
+        with entry:
+            timers, errors, _ = convert_txt_batch(
+                [entry], self.mode, template, self.store, budget=self.budget,
+                trace_memory=self.trace_memory, cancel=self.cancel_event,
+                on_status=lambda k, status, name=None: self._on_group_status(group, status, name),
+                out_names=[out_name], concurrent=self.max_workers > 1 and not self.trace_memory,
+            )
+        self.timers.extend(timers)
+        self.errors.extend(errors)
+
+    def _run_combined(self, groups: List[List[int]], parsed: Optional[Dict[int, JobInput]] = None):
+        """검증·중복 제거를 거친 직무들을 워크북 1개로 (시트는 원본 파일명 순서).
+        parsed에 있는 직무(ZIP 항목)는 이미 읽어 둔 JobInput을 씀"""
+        if not groups:
+            return
+        parsed = parsed or {}
+        groups = sorted(groups, key=lambda g: self.uploads[g[0]].name)
+        reps = [self.uploads[g[0]] for g in groups]
+        name = combined_output_name(self.mode, [txt_output_identity(uf.name, self.mode)[1][0] for uf in reps])
+        timer = StageTimer(f"{self.mode} 통합", f"{len(reps)}개 직무")
+        self.timers = [timer]
+        estimate = estimate_conversion_bytes(sum(getattr(uf, "size", 0) or 0 for uf in reps), len(self.template_bytes))
+
+        def on_job(k: int, status: str):
+            self._on_group_status(groups[k], status, name if status == FILE_DONE else None)
+
+        with self.budget.hold(estimate), measure_memory(timer, trace=self.trace_memory):
+            with timer.stage("parse_json"):
+                jobs = [(uf.name, parsed.pop(g[0]) if g[0] in parsed else job_input(load_json_from_txt_bytes(upload_bytes(uf))))
+                        for g, uf in zip(groups, reps)]
+            build = (self.template_bytes, jobs, self.mode)
+            options = {"timer": timer, "cancel": self.cancel_event, "on_job": on_job}
+            if self.profile_target:
+                (bio, errors), prof_bytes, prof_text = profile_call(build_combined_workbook, *build, **options)
+                self.profile = {"file": name, "prof": prof_bytes, "text": prof_text}
+            else:
+                bio, errors = build_combined_workbook(*build, **options)
+            with timer.stage("getvalue") as info:
+                data = bio.getvalue()
+                info["bytes"] = len(data)
+            del bio
+        if any(s == FILE_DONE for s in self.status):
+            self.store.put(name, data)
+        timer.emit_log()
+        self.errors.extend(e for e in errors if e)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def running(self) -> bool:
+        return self.finished_at is None
+
+    def count(self, status: str) -> int:
+        return sum(1 for s in self.status if s == status)
+
+    def finished_count(self) -> int:
+        return sum(1 for s in self.status if s in (FILE_DONE, FILE_FAILED, FILE_CANCELLED, FILE_INVALID))
+
+    def status_rows(self) -> List[Dict[str, Any]]:
+        return [
+            {"원본 파일": getattr(uf, "label", uf.name), "크기(KB)": round((getattr(uf, "size", 0) or 0) / 1024, 1),
+             "입력 형식": check.shape if check else "", "상태": st_, "생성된 엑셀": out or "",
+             "동일 내용": dup or "", "검증": check.summary() if check else ""}
+            for uf, st_, out, check, dup in zip(self.uploads, self.status, self.outputs, self.checks, self.duplicate_of)
+        ]
+
+    def close(self):
+        self.cancel()
+        self._thread.join()
+        self.store.close()
+
 # ==========================
 # 순차(멀티) 다운로드
 # ==========================
@@ -748,6 +2964,8 @@ def render_sequential_downloads(results_bytes: Dict[str, bytes], height: int = 2
 # =============================================================================
 
 # --- VBA: APPLY_GLOBAL_FONT ---
+THEME_LATIN_FONT_PATTERN = re.compile(rb'(<a:(?:major|minor)Font>\s*<a:latin typeface=")[^"]*"')
+
 def apply_vba_global_font(wb, font_name: str):
     """워크북의 모든 셀에 글로벌 폰트 적용"""
     if not font_name:
@@ -761,11 +2979,12 @@ def apply_vba_global_font(wb, font_name: str):
             # 하지만 더 효율적인 방법으로 스타일 객체를 수정합니다.
             
             # 1. 워크북의 기본 폰트 변경 시도 (테마 폰트가 사용된 경우)
-            if wb.loaded_theme:
-                if wb.loaded_theme.font_scheme and wb.loaded_theme.font_scheme.majorFont and wb.loaded_theme.font_scheme.majorFont.latin:
-                    wb.loaded_theme.font_scheme.majorFont.latin.typeface = font_name
-                if wb.loaded_theme.font_scheme and wb.loaded_theme.font_scheme.minorFont and wb.loaded_theme.font_scheme.minorFont.latin:
-                    wb.loaded_theme.font_scheme.minorFont.latin.typeface = font_name
+            # [FIX] openpyxl의 loaded_theme는 테마 XML 원문(bytes)이므로 major/minor latin typeface를 직접 치환
+            if isinstance(wb.loaded_theme, bytes):
+                wb.loaded_theme = THEME_LATIN_FONT_PATTERN.sub(
+                    lambda m: m.group(1) + font_name.encode("utf-8") + b'"',
+                    wb.loaded_theme
+                )
 
             # 2. 이미 개별 스타일이 적용된 셀 폰트 변경
             for row in ws.iter_rows():
@@ -797,7 +3016,7 @@ def apply_vba_global_font(wb, font_name: str):
                         # -> VBA의 동작을 가장 가깝게 흉내 낸 것은 위 'if cell.has_style:' 블록임.
 
     except Exception as e:
-        print(f"Warning: Global font '{font_name}' 적용 실패: {e}")
+        logger.warning(f"Global font '{font_name}' 적용 실패: {e}")
 
 
 # --- VBA: APPLY_KOREAN_FIX ---
@@ -817,7 +3036,7 @@ def apply_vba_korean_fix_to_headers(wb):
                         if normalized_text != cell.value:
                             cell.value = normalized_text
     except Exception as e:
-        print(f"Warning: Korean header fix (NFC) 적용 실패: {e}")
+        logger.warning(f"Korean header fix (NFC) 적용 실패: {e}")
 
 
 # --- VBA: APPLY_DESCRIPTION_EDITS ---
@@ -911,7 +3130,7 @@ def apply_vba_description_edits(wb):
         ws.row_dimensions[15].height = 165 # 행 높이
 
     except Exception as e:
-        print(f"Warning: Description 시트 편집(VBA) 적용 실패: {e}")
+        logger.warning(f"Description 시트 편집(VBA) 적용 실패: {e}")
 
 
 # --- VBA: APPLY_EXTRA_BORDERS ---
@@ -954,7 +3173,7 @@ def apply_vba_extra_borders_and_dims(wb):
                 ws.row_dimensions[13].height = 53
 
     except Exception as e:
-        print(f"Warning: 추가 테두리(VBA) 적용 실패: {e}")
+        logger.warning(f"추가 테두리(VBA) 적용 실패: {e}")
 
 
 # =============================================================================
@@ -963,131 +3182,354 @@ def apply_vba_extra_borders_and_dims(wb):
 #
 # =============================================================================
 
-st.set_page_config(page_title="Excel ↔ JSON 변환 도구", layout="wide")
-st.title("🚀 Excel ↔ JSON 변환 도구")
-st.write("두 가지 변환 도구를 탭으로 분리하여 제공합니다.")
-
-tab1, tab2 = st.tabs([
-    "🛠️ 도구 1: 엑셀 (D12:F) → JSON 변환기",
-    "✨ 도구 2: TXT (JSON) → 엑셀 (양식 채우기)"
-])
+# --- 공통: 재실행 비용 줄이기 ---
+def read_template_file(path: Path) -> bytes:
+    """기본 템플릿 읽기 (세션에 보관하고, 파일의 mtime/크기가 바뀔 때만 다시 읽음)"""
+    stat = path.stat()
+    cache: Dict[str, Tuple[Tuple[int, int], bytes]] = st.session_state.setdefault("template_cache", {})
+    key = (stat.st_mtime_ns, stat.st_size)
+    if str(path) not in cache or cache[str(path)][0] != key:
+        cache[str(path)] = (key, path.read_bytes())
+    return cache[str(path)][1]
+
+def preview_identity_s2(filename: str, mode: str) -> Dict[str, str]:
+    """미리보기 열: 상위조직명 + 모드별 파일명 규칙의 직무명"""
+    row: Dict[str, str] = {}
+    for m in output_modes(mode):
+        _, (org, job) = txt_output_identity(filename, m)
+        row.setdefault("상위조직명", org)
+        row["직무명" if m == "Non Track" else "직무명(파일 규칙)"] = job
+    return row
+
+def render_template_source_s2(mode: str, key: str, label: str = "템플릿 업로드 (.xlsx) — (선택)") -> Optional[bytes]:
+    """모드 1개의 템플릿: 업로드한 파일, 없으면 기본 템플릿 (못 찾으면 None)"""
+    tpl_upload_s2 = st.file_uploader(label, type=["xlsx"], accept_multiple_files=False, key=key)
+    if tpl_upload_s2 is not None:
+        st.success(f"업로드한 템플릿 사용: {tpl_upload_s2.name}")
+        return upload_bytes(tpl_upload_s2)
+
+    tpl_label = DEFAULT_TEMPLATE_NONTRACK if mode == "Non Track" else DEFAULT_TEMPLATE_TRACK
+    # 기본 템플릿 로드 시도
+    try:
+        # Streamlit 배포 환경에서는 상대 경로가 다를 수 있으므로,
+        # 스크립트 위치 기준으로 경로를 잡습니다.
+        script_dir = Path(__file__).parent
+        default_tpl_path_abs = script_dir / TEMPLATE_DIR / tpl_label
+
+        if default_tpl_path_abs.exists():
+            st.success(f"기본 템플릿 사용: {tpl_label}")
+            return read_template_file(default_tpl_path_abs)
+        st.error(f"기본 템플릿을 찾을 수 없습니다: {default_tpl_path_abs}")
+    except Exception as e:
+        st.error(f"기본 템플릿 로드 오류: {e}")
+    return None
+
+# --- 공통: 성능 진단 UI ---
+def render_profile_option(file_names: List[str], key: str) -> Tuple[Optional[str], bool]:
+    """(cProfile로 측정할 파일 1개 또는 None, tracemalloc 파일별 메모리 측정 여부)"""
+    with st.expander("성능 진단 (선택)", expanded=False):
+        enabled = st.checkbox("파일 1개 cProfile 캡처", value=False, key=f"{key}_enabled")
+        target = st.selectbox("대상 파일", options=file_names, key=f"{key}_target", disabled=not enabled)
+        trace_memory = st.checkbox(
+            "파일별 피크 메모리 측정 (tracemalloc — 느려지며 순차 처리됨)", value=False, key=f"{key}_memory"
+        )
+    return (target if enabled else None), trace_memory
+
+def render_timings(timers: List[StageTimer], profile: Optional[Dict[str, Any]], key: str):
+    """배치 단계별 소요 시간(ms) 표 + cProfile 결과 다운로드"""
+    if timers:
+        st.subheader("단계별 소요 시간 (ms)")
+        st.dataframe(timings_dataframe(timers), use_container_width=True, hide_index=True)
+    if profile:
+        st.caption(f"cProfile: {profile['file']}")
+        stem = Path(profile["file"]).stem
+        c1, c2 = st.columns(2)
+        c1.download_button("📈 .prof 다운로드 (snakeviz/pstats)", data=profile["prof"],
+                           file_name=f"{stem}.prof", mime="application/octet-stream", on_click="ignore", key=f"{key}_prof")
+        c2.download_button("📝 요약 텍스트 다운로드", data=profile["text"].encode("utf-8"),
+                           file_name=f"{stem}.profile.txt", mime="text/plain", on_click="ignore", key=f"{key}_prof_txt")
+
+def render_tech_analytics(get_entries: Callable[[], Any], key: str):
+    """배치 전체의 기술 스택 빈도/동시 출현 집계 (체크 시에만 계산)"""
+    with st.expander("기술 스택 분석 (배치 집계)", expanded=False):
+        if not st.checkbox("분석 실행", value=False, key=f"{key}_enabled"):
+            st.caption("조직·분류(language/os/tools/audio_processing/data_handling/etc)별 항목 빈도와 함께 쓰인 항목 쌍을 집계합니다.")
+            return
+        items = tech_items_frame(get_entries())
+        if items.empty:
+            st.info("집계할 기술 스택 항목이 없습니다.")
+            return
+        freq, cooc = tech_frequency(items), tech_cooccurrence(items)
+        c1, c2, c3 = st.columns(3)
+        c1.metric("레코드", f"{items['record'].nunique():,}")
+        c2.metric("고유 항목", f"{items['item'].nunique():,}")
+        c3.metric("조직", f"{items['org'].nunique():,}")
+        orgs = [TECH_ALL_ORGS] + sorted(items["org"].unique())
+        org = st.selectbox("조직", options=orgs, key=f"{key}_org")
+        st.write("**항목 빈도**")
+        st.dataframe(freq[freq["org"] == org], use_container_width=True, hide_index=True)
+        st.write("**함께 쓰인 항목 (상위 100)**")
+        st.dataframe(cooc[cooc["org"] == org].head(100), use_container_width=True, hide_index=True)
+        st.download_button("📊 분석 결과 CSV ZIP 다운로드", data=lambda: tech_report_zip(items, freq, cooc),
+                           file_name="tech_stack_analytics.zip", mime="application/zip", on_click="ignore", key=f"{key}_dl")
 
 
 # --- 탭 1: 엑셀 (D12:F) → JSON 변환기 (스크립트 1) ---
-with tab1:
+@st.fragment
+def render_tab_excel_to_json():
     st.header("엑셀 (D12~F열) → JSON txt 변환기")
     st.write("특정 포맷의 엑셀 파일(12행, D/E/F열)을 읽어 JSON으로 변환합니다.")
 
-    uploaded_files_s1 = st.file_uploader(
-        "엑셀 파일(.xlsx, .xls)을 하나 이상 선택하세요",
-        type=["xlsx", "xls"],
+    uploads_s1 = st.file_uploader(
+        "엑셀 파일(.xlsx, .xls)을 하나 이상 선택하세요 (여러 파일을 ZIP으로 묶어 올려도 됩니다)",
+        type=["xlsx", "xls", "zip"],
         accept_multiple_files=True,
         key="excel_uploader_s1"  # 탭 간 구분을 위한 고유 키
     )
-
-    if uploaded_files_s1:
+    feed_col1, feed_col2 = st.columns([2, 3])
+    feed_on = feed_col1.checkbox(
+        "직전 실행 대비 변경분 기록", value=False, key="feed_enabled_s1",
+        help=f"네임스페이스·파일 이름별로 직전에 변환한 레코드를 이 서버의 공용 저장소({FEED_STORE_PATH.name})에 남겨 두고, "
+             "추가·삭제·수정된 Task만 필드 단위 차이와 함께 JSON Lines로 내려받을 수 있게 합니다.")
+    namespace_s1 = feed_col2.text_input(
+        "변경분 네임스페이스", key="feed_namespace_s1", disabled=not feed_on, placeholder="예: 음성AI팀/2025 상반기",
+        help="저장소는 모든 사용자가 함께 쓰므로, 같은 네임스페이스 안에서 같은 파일 이름끼리만 비교합니다.")
+    if feed_on and not namespace_s1.strip():
+        st.caption("네임스페이스를 입력해야 변경분을 기록합니다.")
+
+    if uploads_s1:
+        uploaded_files_s1, archives_s1 = split_archive_uploads(uploads_s1)
         all_json_strings = {}
+        all_records_s1: List[Tuple[str, List[Dict[str, Any]]]] = []  # (파일명, 레코드): 같은 이름의 다른 파일도 모두
+        timers_s1: List[StageTimer] = []
+        profile_s1 = None
+        profile_target_s1, trace_memory_s1 = render_profile_option([f.name for f in uploaded_files_s1], key="profile_s1")
+        # 같은 내용은 한 번만 변환하고, 결과 파일명(.json.txt)은 충돌 없이 확정
+        raws_s1 = [upload_bytes(f) for f in uploaded_files_s1]
+        reps_s1, out_names_s1 = plan_batch_outputs([f.name for f in uploaded_files_s1], raws_s1, json_output_identity)
+        json_by_rep: Dict[int, str] = {}
+        # 다른 위젯을 조작해 탭이 다시 실행돼도 변환은 반복하지 않도록 내용 해시별 결과 보관 (이번 업로드에 없는 항목은 비움)
+        cache_s1: Dict[str, Tuple[List[Dict[str, Any]], str]] = st.session_state.setdefault("cache_s1", {})
+        digests_s1 = [hashlib.sha256(raw).hexdigest() for raw in raws_s1]
+        corpus_s1 = get_corpus_index()
+        # 변경분: 재실행마다 스냅숏을 다시 넘기지 않도록 (네임스페이스, 스냅숏 이름, 내용 해시)별로 한 번만 기록
+        # 스냅숏 이름은 일반 파일이면 파일명(같은 이름·다른 내용은 번호로 구분), ZIP 항목이면 폴더 포함 경로
+        sources_s1 = feed_sources([f.name for f in uploaded_files_s1], digests_s1)
+        feed_store_s1 = get_change_feed_store()
+        feeds_s1: Dict[Tuple[str, str, str], Dict[str, Any]] = st.session_state.setdefault("feeds_s1", {})
+        feed_keys_s1: List[Tuple[str, str, str]] = []
+
+        def track_feed_s1(source: str, name: str, digest: str, records: List[Dict[str, Any]]):
+            if feed_store_s1 is None:
+                return
+            key = (feed_store_s1.namespace, source, digest)
+            feed_keys_s1.append(key)
+            if key not in feeds_s1:
+                feed = advance_change_feed(feed_store_s1, source, name, digest, records)
+                if feed is not None:
+                    feeds_s1[key] = feed
+
         st.subheader("변환 결과 미리보기")
 
-        for file in uploaded_files_s1:
+        for i, file in enumerate(uploaded_files_s1):
             st.markdown(f"### 파일: **{file.name}**")
-
-            try:
-                # [FIX] pandas가 openpyxl을 사용하도록 engine 명시
-                df = pd.read_excel(file, header=None, engine='openpyxl')
-            except Exception as e:
-                st.error(f"{file.name} 읽기 실패: {e}")
+            out_name = out_names_s1[i]
+            if reps_s1[i] in json_by_rep:
+                json_str = json_by_rep[reps_s1[i]]
+                st.caption(f"동일 내용: {uploaded_files_s1[reps_s1[i]].name} — 변환 결과를 재사용합니다.")
+                all_json_strings[out_name] = json_str
+                track_feed_s1(sources_s1[i], file.name, digests_s1[i], cache_s1[digests_s1[i]][0])
+                st.download_button(
+                    label=f"📄 {file.name} → JSON txt 다운로드",
+                    data=json_str.encode("utf-8"),
+                    file_name=out_name,
+                    mime="text/plain",
+                    on_click="ignore",  # 클릭해도 재실행하지 않음
+                    key=f"dl_json_{i}_{file.name}" # 개별 버튼 고유 키
+                )
                 continue
+            cached = cache_s1.get(digests_s1[i]) if file.name != profile_target_s1 else None
+            if cached is not None:
+                records, json_str = cached
+            else:
+                timer = StageTimer("Excel→JSON", file.name)
+                timers_s1.append(timer)
 
-            records = excel_to_json_records(df)
-            json_str = json.dumps(records, ensure_ascii=False, indent=2)
-
-            all_json_strings[file.name] = json_str
+                with measure_memory(timer, trace=trace_memory_s1):
+                    try:
+                        # [FIX] pandas가 openpyxl을 사용하도록 engine 명시
+                        with timer.stage("read_excel", file.size):
+                            df = pd.read_excel(file, header=None, engine='openpyxl')
+                    except Exception as e:
+                        timer.emit_log(status="error")
+                        st.error(f"{file.name} 읽기 실패: {e}")
+                        continue
+
+                    with timer.stage("excel_to_json_records"):
+                        if file.name == profile_target_s1:
+                            records, prof_bytes, prof_text = profile_call(excel_to_json_records, df)
+                            profile_s1 = {"file": file.name, "prof": prof_bytes, "text": prof_text}
+                        else:
+                            records = excel_to_json_records(df)
+                    with timer.stage("json_dumps") as info:
+                        json_str = json.dumps(records, ensure_ascii=False, indent=2)
+                        info["bytes"] = len(json_str)
+                timer.emit_log()
+                cache_s1[digests_s1[i]] = (records, json_str)
+                index_corpus_source(corpus_s1, file.name, raws_s1[i], "Excel→JSON",
+                                    lambda: corpus_docs_from_records(records), parse_org_role_from_filename_nt(file.name)[:2])
+
+            json_by_rep[reps_s1[i]] = json_str
+            all_json_strings[out_name] = json_str
+            all_records_s1.append((file.name, records))
+            track_feed_s1(sources_s1[i], file.name, digests_s1[i], records)
 
             st.code(json_str, language="json")
 
-            base_name = file.name.rsplit(".", 1)[0]
             st.download_button(
                 label=f"📄 {file.name} → JSON txt 다운로드",
                 data=json_str.encode("utf-8"),
-                file_name=f"{base_name}.json.txt",
+                file_name=out_name,
                 mime="text/plain",
-                key=f"dl_json_{file.name}" # 개별 버튼 고유 키
+                on_click="ignore",
+                key=f"dl_json_{i}_{file.name}" # 개별 버튼 고유 키
+            )
+
+        # ZIP: 항목을 하나씩 풀어 변환하고, 원본 엑셀은 변환이 끝나는 즉시 해제 (JSON 결과만 남김)
+        used_s1 = set(out_names_s1)
+        name_by_key_s1: Dict[Tuple[str, str], str] = {}
+        for archive in archives_s1:
+            st.markdown(f"### ZIP: **{archive.name}**")
+            try:
+                members = list_archive_members(archive, (".xlsx", ".xls"))
+            except zipfile.BadZipFile as e:
+                st.error(f"{archive.name}: ZIP을 읽을 수 없습니다 ({e})")
+                continue
+            progress = st.progress(0.0, text=f"엑셀 {len(members)}개")
+            rows = []
+            inflight = MemoryBudget(DEFAULT_ARCHIVE_INFLIGHT_MB * MB)
+            for k, (m, entry, error) in enumerate(iter_archive_entries(archive, members, inflight)):
+                progress.progress((k + 1) / len(members), text=f"{k + 1}/{len(members)} — {m.name}")
+                row = {"항목": m.name, "JSON 파일": "", "상태": error or ""}
+                rows.append(row)
+                if entry is None:
+                    continue
+                with entry:
+                    raw = entry.getvalue()
+                    digest = hashlib.sha256(raw).hexdigest()
+                    digests_s1.append(digest)
+                    cached = cache_s1.get(digest)
+                    if cached is None:
+                        timer = StageTimer("Excel→JSON", m.name)
+                        timers_s1.append(timer)
+                        try:
+                            with measure_memory(timer, trace=trace_memory_s1):
+                                cached = convert_excel_to_records(entry, timer)
+                        except Exception as e:
+                            timer.emit_log(status="error")
+                            row["상태"] = f"실패: {e}"
+                            continue
+                        timer.emit_log()
+                        cache_s1[digest] = cached
+                        index_corpus_source(corpus_s1, m.name, raw, "Excel→JSON",
+                                            lambda: corpus_docs_from_records(cached[0]), parse_org_role_from_filename_nt(m.name)[:2])
+                records, json_str = cached
+                base = json_output_identity(m.name)[0]
+                if (digest, base) not in name_by_key_s1:
+                    name_by_key_s1[(digest, base)] = unique_output_name(base, used_s1)
+                row["JSON 파일"] = name_by_key_s1[(digest, base)]
+                row["상태"] = "완료"
+                all_json_strings[row["JSON 파일"]] = json_str
+                all_records_s1.append((m.name, records))
+                track_feed_s1(m.label, m.name, digest, records)
+            st.dataframe(rows, use_container_width=True, hide_index=True)
+        for digest in set(cache_s1) - set(digests_s1):
+            del cache_s1[digest]
+        for key in set(feeds_s1) - set(feed_keys_s1):
+            del feeds_s1[key]
+
+        feeds = [feeds_s1[k] for k in dict.fromkeys(feed_keys_s1) if k in feeds_s1]
+        if feeds:
+            st.subheader("직전 실행 대비 변경분")
+            st.dataframe([{"파일": f["source"], "직전 실행": "있음" if f["previous_digest"] else "없음 (전체 추가)",
+                           "추가": f["summary"]["added"], "삭제": f["summary"]["removed"],
+                           "수정": f["summary"]["modified"], "그대로": f["summary"]["unchanged"]} for f in feeds],
+                         use_container_width=True, hide_index=True)
+            st.download_button(
+                label=f"🔁 변경분 JSON Lines 다운로드 ({sum(len(f['changes']) for f in feeds):,}건)",
+                data=lambda: change_feed_jsonl(feeds),
+                file_name="changes.jsonl",
+                mime="application/x-ndjson",
+                on_click="ignore",
+                key="dl_feed_s1"
             )
 
-        if len(all_json_strings) > 1:
+        if len(all_json_strings) > 1 or (archives_s1 and all_json_strings):
             st.subheader("ZIP으로 한 번에 받기")
 
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-                for fname, jstr in all_json_strings.items():
-                    base_name = fname.rsplit(".", 1)[0]
-                    zf.writestr(f"{base_name}.json.txt", jstr)
+            def build_zip_s1() -> bytes:  # 클릭할 때만 압축
+                zip_buffer = io.BytesIO()
+                with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+                    for out_name, jstr in all_json_strings.items():  # 이름은 이미 충돌 해소됨
+                        zf.writestr(out_name, jstr)
+                return zip_buffer.getvalue()
 
-            zip_buffer.seek(0)
             st.download_button(
                 label="🗜️ 모든 JSON txt 파일 ZIP 다운로드",
-                data=zip_buffer,
+                data=build_zip_s1,
                 file_name="json_outputs.zip",
                 mime="application/zip",
+                on_click="ignore",
                 key="dl_zip_s1" # 고유 키
             )
+
+        render_timings(timers_s1, profile_s1, key="timings_s1")
+        render_tech_analytics(
+            lambda: (e for name, recs in all_records_s1 for e in tech_entries_from_records(name, recs)),
+            key="tech_s1",
+        )
     else:
         st.info("이곳에서 엑셀 파일을 업로드하면 JSON으로 변환됩니다.")
 
 
 # --- 탭 2: TXT (JSON) → 엑셀 (양식 채우기) (스크립트 2) ---
-with tab2:
+@st.fragment
+def render_tab_txt_to_excel():
     st.header("TXT(JSON) → Excel 변환기")
     st.write("특정 포맷의 JSON이 담긴 TXT 파일을 업로드하면, Non-Track/Track 엑셀 템플릿을 채웁니다.")
 
     # 탭 2의 모드 선택
     mode_s2 = st.radio(
         "모드 선택", 
-        options=["Non Track", "Track"], 
+        options=["Non Track", "Track", MODE_BOTH], 
         horizontal=True, 
-        key="mode_s2" # 고유 키
+        key="mode_s2", # 고유 키
+        help=f"{MODE_BOTH}: TXT를 한 번만 읽어 Non Track/Track 워크북을 함께 만듭니다 (Track 조건까지 통과한 파일만 변환)."
     )
+    output_s2 = st.radio(
+        "출력 방식",
+        options=["직무별 워크북", "통합 워크북 1개"],
+        horizontal=True,
+        key="output_s2",
+        disabled=mode_s2 == MODE_BOTH,
+        help="통합: 직무(Track은 직무×트랙)마다 Task/Skill 시트 한 쌍을 워크북 1개에 담고, 맨 앞에 시트 목록을 둡니다. "
+             f"({MODE_BOTH} 모드는 직무별 워크북만)"
+    )
+    combined_s2 = output_s2 == "통합 워크북 1개" and mode_s2 != MODE_BOTH
 
     # 템플릿 설정 (사이드바 대신 Expander 사용)
     with st.expander("템플릿 설정 (필수)", expanded=True):
-        tpl_upload_s2 = st.file_uploader(
-            "템플릿 업로드 (.xlsx) — (선택)", 
-            type=["xlsx"], 
-            accept_multiple_files=False, 
-            key="tpl_uploader_s2" # 고유 키
-        )
-
-        template_bytes_s2 = None # 템플릿 로딩 상태
-        
-        if mode_s2 == "Non Track":
-            default_tpl_path_name = DEFAULT_TEMPLATE_NONTRACK
-            tpl_label = DEFAULT_TEMPLATE_NONTRACK
+        if mode_s2 == MODE_BOTH:
+            # 모드별 템플릿이 모두 있어야 실행 가능
+            templates_s2 = {m: render_template_source_s2(m, key=f"tpl_uploader_s2_{m}",
+                                                       label=f"{m} 템플릿 업로드 (.xlsx) — (선택)")
+                            for m in OUTPUT_MODES}
+            template_bytes_s2 = templates_s2 if all(t is not None for t in templates_s2.values()) else None
         else:
-            default_tpl_path_name = DEFAULT_TEMPLATE_TRACK
-            tpl_label = DEFAULT_TEMPLATE_TRACK
-
-        if tpl_upload_s2 is None:
-            # 기본 템플릿 로드 시도
-            try:
-                # Streamlit 배포 환경에서는 상대 경로가 다를 수 있으므로,
-                # 스크립트 위치 기준으로 경로를 잡습니다.
-                script_dir = Path(__file__).parent
-                default_tpl_path_abs = script_dir / TEMPLATE_DIR / default_tpl_path_name
-
-                if default_tpl_path_abs.exists():
-                    st.success(f"기본 템플릿 사용: {tpl_label}")
-                    template_bytes_s2 = default_tpl_path_abs.read_bytes()
-                else:
-                    st.error(f"기본 템플릿을 찾을 수 없습니다: {default_tpl_path_abs}")
-            except Exception as e:
-                st.error(f"기본 템플릿 로드 오류: {e}")
-        else:
-            template_bytes_s2 = tpl_upload_s2.read()
-            st.success(f"업로드한 템플릿 사용: {tpl_upload_s2.name}")
+            template_bytes_s2 = render_template_source_s2(mode_s2, key="tpl_uploader_s2")
 
         st.divider()
-        if mode_s2 == "Non Track":
+        if "Non Track" in output_modes(mode_s2):
             st.markdown(
                 """
     **규칙 요약 — Non Track**
@@ -1101,7 +3543,7 @@ with tab2:
       - 전역 폰트 '현대하모니 L' 적용, `Task`/`Skill` 시트 `B1`/`B2` 한글 자모 교정
                 """
             )
-        else:
+        if "Track" in output_modes(mode_s2):
             st.markdown(
                 """
     **규칙 요약 — Track**
@@ -1123,89 +3565,402 @@ with tab2:
     st.warning("⚠️ **주의:** 이 기능은 '도구 1'에서 생성된 JSON과 호환되지 않습니다. 'Non-Track/Track' 템플릿에 맞는 별도의 JSON(txt) 파일을 업로드해야 합니다.")
     
     uploaded_files_s2 = st.file_uploader(
-        "여러 파일을 동시에 올릴 수 있습니다.", 
-        type=["txt"], 
+        "여러 파일을 동시에 올릴 수 있습니다. TXT를 ZIP으로 묶어 올리면 항목을 하나씩 풀어 변환합니다.", 
+        type=["txt", "zip"], 
         accept_multiple_files=True, 
         key="txt_uploader_s2" # 고유 키
     )
 
     # 탭 2의 미리보기
     if uploaded_files_s2:
-        st.write("**파일명 파싱 미리보기**")
+        st.write("**파일명 파싱 / 입력 검증 미리보기**")
         preview_s2 = []
-        for f in uploaded_files_s2:
-            if mode_s2 == "Non Track":
-                org, role_display, role_for_filename = parse_org_role_from_filename_nt(f.name)
-                out = f"Non Track_Paper Interview_{sanitize_filename_component(org)}_{sanitize_filename_component(role_for_filename)}.xlsx"
-                preview_s2.append({"원본 파일": f.name, "상위조직명": org, "직무명": role_display, "생성될 엑셀": out})
-            else:
-                org, job = parse_org_and_job_from_filename_track(f.name)
-                out = f"Track_Paper Interview_{sanitize_filename_component(org)}_{sanitize_filename_component(job)}.xlsx"
-                preview_s2.append({"원본 파일": f.name, "상위조직명": org, "직무명(파일 규칙)": job, "생성될 엑셀": out})
+        txt_files_s2, archives_s2 = split_archive_uploads(uploaded_files_s2)
+        checks_s2 = preflight_txt_batch(txt_files_s2, mode_s2, cache=st.session_state.setdefault("checks_s2", {}))
+        # 변환 작업과 같은 규칙(검증 통과 파일만, 내용 중복 제거, 이름 충돌 해소)으로 결과 파일명 미리 계산
+        valid_s2 = [f for f, c in zip(txt_files_s2, checks_s2) if c.ok]
+        reps_s2, names_s2 = plan_batch_outputs([f.name for f in valid_s2], [upload_bytes(f) for f in valid_s2],
+                                               lambda name: txt_output_identity(name, mode_s2))
+        if combined_s2:
+            orgs_s2 = [txt_output_identity(f.name, mode_s2)[1][0] for j, f in enumerate(valid_s2) if reps_s2[j] == j]
+            names_s2 = [combined_output_name(mode_s2, orgs_s2)] * len(valid_s2)
+        planned_s2 = {id(f): (output_names_text(names_s2[j]), valid_s2[reps_s2[j]].name if reps_s2[j] != j else "")
+                      for j, f in enumerate(valid_s2)}
+        for f, check in zip(txt_files_s2, checks_s2):
+            out, dup = planned_s2.get(id(f), ("", ""))
+            preview_s2.append({"원본 파일": f.name, **preview_identity_s2(f.name, mode_s2), "생성될 엑셀": out,
+                               "동일 내용": dup, "입력 형식": check.shape, "검증": check.summary()})
+        # ZIP은 목록만 읽음 (검증·중복 확인·파일명 확정은 변환하면서 항목별로)
+        for archive in archives_s2:
+            try:
+                members = list_archive_members(archive, (".txt",))
+            except zipfile.BadZipFile as e:
+                st.error(f"{archive.name}: ZIP을 읽을 수 없습니다 ({e})")
+                continue
+            st.caption(f"ZIP {archive.name}: TXT {len(members)}개 — 변환할 때 하나씩 풀어 검증합니다.")
+            for m in members:
+                out = "" if combined_s2 else output_names_text(txt_output_identity(m.name, mode_s2)[0])
+                preview_s2.append({"원본 파일": m.label, **preview_identity_s2(m.name, mode_s2), "생성될 엑셀": out,
+                                   "동일 내용": "", "입력 형식": "", "검증": "변환 시 검사"})
         st.dataframe(preview_s2, use_container_width=True)
+        invalid_s2 = sum(1 for c in checks_s2 if not c.ok)
+        if invalid_s2:
+            st.warning(f"{invalid_s2}개 파일이 검증에 실패했습니다. 변환 시 이 파일들은 건너뜁니다. (모드: {mode_s2})")
+        profile_target_s2, trace_memory_s2 = render_profile_option([f.name for f in txt_files_s2], key="profile_s2")
+        render_tech_analytics(lambda: tech_entries_from_uploads(iter_uploads_with_archives(uploaded_files_s2, (".txt",)), mode_s2),
+                              key="tech_s2")
+    else:
+        profile_target_s2, trace_memory_s2 = None, False
+
+    with st.expander("메모리 예산 / 병렬 처리", expanded=False):
+        budget_mb_s2 = st.number_input(
+            "배치 메모리 예산 (MB)", min_value=64, max_value=65536, value=DEFAULT_MEMORY_BUDGET_MB, step=64,
+            key="budget_mb_s2",
+            help="절반은 변환 중인 워크북, 절반은 완료된 결과 보관에 사용합니다. "
+                 "초과 시 병렬도를 줄이고, 결과는 임시 폴더에 기록합니다."
+        )
+        workers_s2 = st.number_input("최대 동시 변환 수", min_value=1, max_value=32,
+                                     value=min(4, os.cpu_count() or 1), step=1, key="workers_s2")
+
+    # 탭 2의 세션 상태 (탭 1과 분리): 백그라운드 변환 작업 1개
+    job_s2: Optional[ConversionJob] = st.session_state.get("job_s2")
 
     # 탭 2의 실행 버튼
     run_s2 = st.button(
         "변환 실행", 
         type="primary", 
-        disabled=not uploaded_files_s2, 
+        disabled=not uploaded_files_s2 or (job_s2 is not None and job_s2.running), 
         key="run_s2" # 고유 키
     )
 
-    # 탭 2의 세션 상태 (탭 1과 분리)
-    if "results_data_s2" not in st.session_state:
-        st.session_state["results_data_s2"] = {}
-    if "errors_data_s2" not in st.session_state:
-        st.session_state["errors_data_s2"] = []
-    if "last_mode_s2" not in st.session_state:
-        st.session_state["last_mode_s2"] = mode_s2
-
     # 탭 2의 실행 로직
     if run_s2 and uploaded_files_s2:
         if template_bytes_s2 is None: # 템플릿이 로드되었는지 확인
             st.error("템플릿을 찾을 수 없습니다. 템플릿을 업로드하거나 기본 템플릿 경로를 확인하세요.")
         else:
-            results_s2: Dict[str, bytes] = {}
-            errors_s2: List[str] = []
-            with st.spinner("변환 중..."):
-                for uf in uploaded_files_s2:
+            if job_s2 is not None:
+                job_s2.close()  # 이전 배치 결과(임시 파일 포함) 해제
+            job_s2 = ConversionJob(
+                list(uploaded_files_s2), mode_s2, template_bytes_s2,
+                budget_bytes=int(budget_mb_s2) * MB, max_workers=int(workers_s2),
+                trace_memory=trace_memory_s2, profile_target=profile_target_s2,
+                combined=combined_s2, corpus=get_corpus_index(),
+            ).start()
+            st.session_state["job_s2"] = job_s2
+
+    # 탭 2의 결과 렌더링
+    if job_s2 is not None:
+        render_job_s2(job_s2)
+
+    render_update_s2(mode_s2)
+    render_pipeline_s2()
+
+
+def pair_updates(workbooks: List[Any], txts: List[Any], mode: str) -> Tuple[List[Tuple[Any, Any, str]], List[str]]:
+    """TXT에서 생성될 엑셀 파일명과 같은 이름의 기존 워크북끼리 짝지음 → [(워크북, TXT, 모드)].
+    1:1 업로드면 이름과 무관하게 짝지음 (Non Track + Track이면 워크북 파일명 접두어로 모드 판단).
+    Non Track + Track은 TXT 1개가 모드별 워크북 2개와 짝지어질 수 있음"""
+    if len(workbooks) == 1 and len(txts) == 1:
+        wb_mode = mode
+        if mode == MODE_BOTH:
+            wb_mode = "Track" if workbooks[0].name.startswith("Track_") else "Non Track"
+        return [(workbooks[0], txts[0], wb_mode)], []
+    by_name = {wb_file.name: wb_file for wb_file in workbooks}
+    pairs, unmatched = [], []
+    for txt in txts:
+        out_names = []
+        for m in output_modes(mode):
+            out_name, _ = txt_output_identity(txt.name, m)
+            if out_name in by_name:
+                pairs.append((by_name.pop(out_name), txt, m))
+            else:
+                out_names.append(out_name)
+        if len(out_names) == len(output_modes(mode)):
+            missing = ", ".join(f"'{n}'" for n in out_names)
+            unmatched.append(f"{txt.name} → {missing} 워크북 없음")
+    unmatched += [f"{name} → 짝이 되는 TXT 없음" for name in by_name]
+    return pairs, unmatched
+
+def render_update_s2(mode: str):
+    """기존 워크북 + 새 JSON → 달라진 템플릿 셀만 다시 쓰고, 검토자 수정안 열은 그대로 둠"""
+    with st.expander("기존 워크북 업데이트 (검토 내용 유지)", expanded=False):
+        st.caption(f"모드: {mode} — Task A/C, Skill A/B/D/F, B1/B2(트랙 시트는 D1 포함) 중 값이 달라진 셀만 다시 씁니다. "
+                   "수정안 열(Task B/D, Skill C/E/G)은 항목(이름, 없으면 설명)을 따라 새 행으로 옮기고, "
+                   "새 JSON에서 빠진 항목의 수정안은 지운 뒤 경고로 알려 줍니다. 그 밖의 내용은 건드리지 않습니다.")
+        c1, c2 = st.columns(2)
+        workbooks = c1.file_uploader("기존 워크북 (.xlsx)", type=["xlsx"], accept_multiple_files=True, key="upd_wb_s2")
+        txts = c2.file_uploader("새 TXT(JSON)", type=["txt"], accept_multiple_files=True, key="upd_txt_s2")
+        if not workbooks or not txts:
+            return
+        pairs, unmatched = pair_updates(workbooks, txts, mode)
+        for msg in unmatched:
+            st.write(f"• {msg}")
+        if st.button("업데이트 실행", disabled=not pairs, key="upd_run_s2"):
+            results = []
+            with st.spinner("업데이트 중..."):
+                for wb_file, txt, wb_mode in pairs:
+                    timer = StageTimer(f"{wb_mode} 업데이트", wb_file.name)
                     try:
-                        if mode_s2 == "Non Track":
-                            name, bio = process_uploaded_txt_nontrack(uf, template_bytes_s2)
-                        else:
-                            name, bio = process_uploaded_txt_track(uf, template_bytes_s2)
-                        results_s2[name] = bio.getvalue()
+                        bio, changes, notes = update_existing_workbook(
+                            upload_bytes(wb_file), txt.name, upload_bytes(txt), wb_mode, timer=timer)
+                        timer.emit_log()
+                        results.append({"name": wb_file.name, "data": bio.getvalue() if bio else None,
+                                        "changes": changes, "notes": notes, "error": None})
                     except Exception as e:
-                        errors_s2.append(f"{uf.name} → 실패: {e} (line: {e.__traceback__.tb_lineno if e.__traceback__ else 'N/A'})") # 오류 디버깅을 위해 라인 번호 추가
-            st.session_state["results_data_s2"] = results_s2
-            st.session_state["errors_data_s2"] = errors_s2
-            st.session_state["last_mode_s2"] = mode_s2
+                        timer.emit_log(status="error")
+                        logger.exception(f"{wb_file.name} 업데이트 실패")
+                        results.append({"name": wb_file.name, "data": None, "changes": [], "notes": [], "error": str(e)})
+            st.session_state["upd_results_s2"] = results
+
+        for i, res in enumerate(st.session_state.get("upd_results_s2") or []):
+            if res["error"]:
+                st.error(f"{res['name']} 업데이트 실패: {res['error']}")
+                continue
+            for note in res["notes"]:
+                st.warning(f"{res['name']}: {note}")
+            if res["data"] is None:
+                st.info(f"{res['name']}: 바뀐 셀이 없습니다.")
+                continue
+            st.download_button(f"⬇️ {res['name']} (셀 {len(res['changes'])}개 변경) 다운로드", data=res["data"],
+                               file_name=res["name"], mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                               on_click="ignore",
+                               key=f"upd_dl_{i}_{res['name']}")
+            st.dataframe([{"시트": c["sheet"], "셀": c["cell"], "이전": cell_text_value(c["old"]), "변경": cell_text_value(c["new"])}
+                          for c in res["changes"]], use_container_width=True, hide_index=True)
+
+def render_pipeline_s2():
+    """원본 엑셀(도구 1 입력) → Non Track 워크북을 한 번에 (중간 JSON txt 없이)"""
+    with st.expander("원본 엑셀 → Non Track 워크북 바로 변환 (JSON txt 단계 생략)", expanded=False):
+        st.caption("도구 1의 엑셀(12행, D/E/F열)을 읽어 레코드를 바로 Non Track 템플릿에 채웁니다. "
+                   "파일명 규칙(상위조직명/직무명)은 엑셀 파일명에 적용됩니다.")
+        uploads = st.file_uploader("엑셀 파일(.xlsx, .xls)", type=["xlsx", "xls"], accept_multiple_files=True,
+                                   key="pipe_uploader_s2")
+        tpl_upload = st.file_uploader("Non Track 템플릿 (.xlsx) — (선택, 없으면 기본 템플릿)", type=["xlsx"],
+                                      key="pipe_tpl_s2")
+        c1, c2 = st.columns(2)
+        keep_json = c1.checkbox("중간 JSON txt도 함께 받기", value=False, key="pipe_json_s2")
+        workers = c2.number_input("최대 동시 변환 수", min_value=1, max_value=32,
+                                  value=min(4, os.cpu_count() or 1), step=1, key="pipe_workers_s2")
+        if st.button("바로 변환", disabled=not uploads, key="pipe_run_s2"):
+            default_tpl = TEMPLATE_DIR / DEFAULT_TEMPLATE_NONTRACK
+            if tpl_upload is None and not default_tpl.exists():
+                st.error(f"기본 템플릿을 찾을 수 없습니다: {default_tpl}")
+                return
+            template = ParsedTemplate(upload_bytes(tpl_upload) if tpl_upload else read_template_file(default_tpl))
+            previous = st.session_state.pop("pipe_s2", None)
+            if previous is not None:
+                previous["store"].close()  # 이전 결과(임시 파일 포함) 해제
+            # TXT 배치와 같은 규칙: 같은 내용·같은 결과 이름은 한 번만, 이름 충돌은 번호로 해소 (중간 JSON 이름도)
+            names, raws = [f.name for f in uploads], [upload_bytes(f) for f in uploads]
+            reps, out_names = plan_batch_outputs(names, raws, lambda name: txt_output_identity(name, "Non Track"))
+            _, json_names = plan_batch_outputs(names, raws, json_output_identity)
+            json_name_of = {id(uploads[j]): json_names[j] for j in range(len(uploads))}
+            todo = sorted(set(reps))
+            store = ResultStore(memory_limit_bytes=DEFAULT_MEMORY_BUDGET_MB * MB // 2)
+            sink = (lambda name, text: store.put(name, text.encode("utf-8"))) if keep_json else None
+            with st.spinner("변환 중..."):
+                timers, errors, _ = convert_txt_batch(
+                    [uploads[j] for j in todo], "Excel→Non Track", template, store,
+                    budget=MemoryBudget(DEFAULT_MEMORY_BUDGET_MB * MB // 2), max_workers=int(workers),
+                    out_names=[out_names[j] for j in todo],
+                    process_fn=lambda f, tpl, timer=None: process_excel_to_nontrack(
+                        f, tpl, timer=timer, json_sink=sink, json_name=json_name_of[id(f)]),
+                )
+            st.session_state["pipe_s2"] = {"store": store, "timers": timers, "errors": errors,
+                                           "skipped": len(uploads) - len(todo)}
 
-    # 탭 2의 결과 렌더링
-    results_data_s2: Dict[str, bytes] = st.session_state.get("results_data_s2", {})
-    errors_data_s2: List[str] = st.session_state.get("errors_data_s2", [])
-    last_mode_s2 = st.session_state.get("last_mode_s2", mode_s2)
+        result = st.session_state.get("pipe_s2")
+        if result is None:
+            return
+        store = result["store"]
+        if result["skipped"]:
+            st.caption(f"내용이 같은 파일 {result['skipped']}개는 한 번만 변환했습니다.")
+        for err in result["errors"]:
+            st.error(err)
+        for i, name in enumerate(store.names()):
+            is_json = name.endswith(".json.txt")
+            st.download_button(f"{'📄' if is_json else '⬇️'} {name} 다운로드", data=store.loader(name), file_name=name,
+                               mime="text/plain" if is_json else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                               on_click="ignore", key=f"pipe_dl_{i}_{name}")
+        if len(store) > 1:
+            st.download_button("🗜️ 전체 결과 ZIP 다운로드", data=lambda: write_zip_from_store(store),
+                               file_name="excel_nontrack_outputs.zip", mime="application/zip",
+                               on_click="ignore", key="pipe_zip_s2")
+        render_timings(result["timers"], None, key="timings_pipe_s2")
+
+def render_job_s2(job: ConversionJob):
+    """진행 중에는 1초마다 이 영역만 갱신(fragment)하고, 끝나면 전체를 한 번 다시 그립니다."""
+
+    @st.fragment(run_every=1.0 if job.running else None)
+    def job_panel():
+        if not job.running and st.session_state.get("job_s2_polling"):
+            st.session_state["job_s2_polling"] = False
+            st.rerun()  # 자동 갱신 중지
+        st.session_state["job_s2_polling"] = job.running
 
-    if results_data_s2:
         st.subheader("2) 변환 결과")
+        total, finished = len(job.uploads), job.finished_count()
+        summary = (f"{finished}/{total} 처리 — 완료 {job.count(FILE_DONE)}, 실패 {job.count(FILE_FAILED)}, "
+                   f"검증 실패 {job.count(FILE_INVALID)}, 취소 {job.count(FILE_CANCELLED)} — 모드: {job.mode}")
+        st.progress(finished / total if total else 1.0, text=summary)
+        if job.running:
+            st.button("⏹️ 남은 변환 취소", on_click=job.cancel, disabled=job.cancel_event.is_set(), key="cancel_s2")
+        with st.expander("파일별 진행 상태", expanded=job.running):
+            st.dataframe(job.status_rows(), use_container_width=True, hide_index=True)
+        render_results_s2(job)
+
+    job_panel()
+
+def render_results_s2(job: ConversionJob):
+    results_data_s2 = job.store
+    errors_data_s2 = job.errors
+
+    if results_data_s2:
         col1, col2 = st.columns([2, 1])
 
         with col1:
-            st.success(f"{len(results_data_s2)}개 파일 생성 완료 — 모드: {last_mode_s2}")
-            for fname, b in results_data_s2.items():
+            if job.running:
+                st.info(f"{len(results_data_s2)}개 파일 생성됨 — 완료된 파일부터 바로 받을 수 있습니다.")
+            else:
+                st.success(f"{len(results_data_s2)}개 파일 생성 완료 — 모드: {job.mode}")
+            if results_data_s2.spilled_count():
+                st.info(f"메모리 예산 초과로 {results_data_s2.spilled_count()}개 결과를 임시 폴더에 기록했습니다. (클릭 시 디스크에서 읽음)")
+            for fname in results_data_s2.names():
                 st.download_button(
                     label=f"⬇️ {fname} 다운로드",
-                    data=b,
+                    data=results_data_s2.loader(fname),
                     file_name=fname,
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                     use_container_width=True,
+                    on_click="ignore",
                     key=f"dl_excel_{fname}" # 고유 키
                 )
 
         with col2:
-            render_sequential_downloads(results_data_s2) # 순차 다운로드
+            if job.running:
+                st.caption("전체 다운로드는 모든 변환이 끝난 뒤 제공됩니다.")
+            elif results_data_s2.spilled_count():
+                # 순차 다운로드는 모든 결과를 base64로 페이지에 싣기 때문에, 디스크 결과가 있으면 ZIP으로 대체
+                st.download_button(
+                    label="🗜️ 전체 결과 ZIP 다운로드",
+                    data=lambda: write_zip_from_store(results_data_s2),
+                    file_name="excel_outputs.zip",
+                    mime="application/zip",
+                    on_click="ignore",
+                    key="dl_zip_s2"
+                )
+            else:
+                render_sequential_downloads(dict(results_data_s2.items())) # 순차 다운로드
+
+    if not job.running:
+        render_timings(job.timers, job.profile, key="timings_s2")
 
     if errors_data_s2:
         st.warning("일부 파일 변환 중 오류가 발생했습니다.")
         for msg in errors_data_s2:
             st.write(f"• {msg}")
+
+
+def main():
+    st.set_page_config(page_title="Excel ↔ JSON 변환 도구", layout="wide")
+    st.title("🚀 Excel ↔ JSON 변환 도구")
+    st.write("두 가지 변환 도구를 탭으로 분리하여 제공합니다.")
+
+    tab1, tab2, tab3 = st.tabs([
+        "🛠️ 도구 1: 엑셀 (D12:F) → JSON 변환기",
+        "✨ 도구 2: TXT (JSON) → 엑셀 (양식 채우기)",
+        "🔎 Task/Skill 검색"
+    ])
+
+    with tab1:
+        render_tab_excel_to_json()
+
+    with tab2:
+        render_tab_txt_to_excel()
+
+    with tab3:
+        render_tab_corpus_search()
+
+
+# --- 탭 3: 변환한 Task/Skill 검색 ---
+@st.fragment
+def render_tab_corpus_search():
+    st.header("Task/Skill 검색")
+    st.write("도구 1·2에서 변환한 파일의 Task/Skill 이름, 설명, 기술 스택을 검색합니다.")
+    ns_col1, ns_col2 = st.columns([2, 3])
+    ns_col1.checkbox("변환 시 자동 색인", value=False, key="corpus_enabled",
+                     help=f"변환한 입력을 이 서버의 공용 인덱스({CORPUS_INDEX_DIR.name}/)에 네임스페이스별로 추가합니다. "
+                          "같은 파일·같은 내용은 다시 색인하지 않습니다.")
+    ns_col2.text_input("검색 인덱스 네임스페이스", key="corpus_namespace", placeholder="예: 음성AI팀/2025 상반기",
+                       help="인덱스는 이 서버의 모든 사용자가 함께 씁니다. 같은 네임스페이스를 입력한 사용자끼리만 "
+                            "색인한 내용을 검색할 수 있으므로, 민감한 자료는 팀 밖에서 추측하기 어려운 이름을 쓰세요.")
+    namespace = corpus_namespace()
+    if not namespace:
+        st.info("네임스페이스를 입력하면 그 네임스페이스의 인덱스를 검색하고, 자동 색인을 켠 경우 변환한 파일을 추가합니다.")
+        return
+    try:
+        index = CorpusIndex(namespace)
+    except (sqlite3.Error, OSError) as e:
+        st.error(f"검색 인덱스를 열 수 없습니다: {e}")
+        return
+    stats = index.stats()
+    c1, c2, c3 = st.columns(3)
+    c1.metric("파일", f"{stats['files']:,}")
+    c2.metric("레코드", f"{stats['records']:,}")
+    c3.metric("사전 단어", f"{stats['terms']:,}")
+
+    q_col, field_col, mode_col, limit_col = st.columns([4, 1, 2, 1])
+    query = q_col.text_input("검색어", key="corpus_query", placeholder="예: Kaldi, 음성 인식")
+    field = field_col.selectbox("범위", options=list(CORPUS_FIELDS), key="corpus_field")
+    mode = mode_col.radio("방식", options=CORPUS_MODES, horizontal=True, key="corpus_mode",
+                          help="포함: 부분 일치 / 접두: 단어·항목 시작 일치 / 유사: 오타 허용(3글자 이상)")
+    limit = limit_col.number_input("최대 건수", min_value=10, max_value=1000, value=50, step=10, key="corpus_limit")
+    if query.strip():
+        started = time.perf_counter()
+        results = index.search(query, CORPUS_FIELDS[field], mode, limit=int(limit))
+        st.caption(f"{len(results):,}건 · {(time.perf_counter() - started) * 1000:.1f} ms")
+        st.dataframe(results, use_container_width=True, hide_index=True)
+
+    with st.expander("여러 조직에 같은 이름으로 나오는 항목", expanded=False):
+        d1, d2 = st.columns(2)
+        kind = d1.radio("구분", options=["task", "skill"], horizontal=True, key="corpus_dup_kind")
+        min_orgs = d2.number_input("최소 조직 수", min_value=2, max_value=100, value=2, key="corpus_dup_min")
+        if st.button("조회", key="corpus_dup_run"):
+            st.dataframe(index.duplicate_names(kind, int(min_orgs)), use_container_width=True, hide_index=True)
+
+    with st.expander("문구가 조금씩 다른 근접 중복 묶음", expanded=False):
+        st.caption("이름+설명을 글자 4-gram MinHash로 비교해 유사도 기준 이상인 문서를 묶고, 묶음마다 대표 문구를 고릅니다. "
+                   "대표 문구를 한 번 검토하면 같은 묶음의 문서는 구성 목록에서 차이만 확인하면 됩니다.")
+        n1, n2 = st.columns(2)
+        nd_kind = n1.radio("구분", options=["전체", "task", "skill"], horizontal=True, key="corpus_nd_kind")
+        nd_threshold = n2.slider("유사도 기준", min_value=0.5, max_value=0.95, value=NEAR_DUP_THRESHOLD, step=0.05,
+                                 key="corpus_nd_threshold", help="추정 Jaccard 유사도(글자 4-gram). 낮출수록 크게 묶입니다.")
+        if st.button("묶기", key="corpus_nd_run"):
+            timer = StageTimer("near_dup")
+            docs = index.near_dup_docs(None if nd_kind == "전체" else nd_kind)
+            clusters, members = find_near_duplicates(docs, nd_threshold, timer=timer)
+            st.session_state["corpus_nd_result"] = {"clusters": clusters, "members": members, "docs": len(docs),
+                                                    "threshold": nd_threshold, "seconds": timer.total_seconds()}
+        result = st.session_state.get("corpus_nd_result")
+        if result:
+            clusters, members = result["clusters"], result["members"]
+            st.caption(f"문서 {result['docs']:,}건 → 묶음 {len(clusters):,}개 (문서 {len(members):,}건) · "
+                       f"{result['seconds']:.2f}s")
+            st.dataframe(clusters, use_container_width=True, hide_index=True)
+            if len(clusters):
+                pick = st.selectbox("묶음 구성 보기", options=list(clusters["cluster"]), key="corpus_nd_pick")
+                st.dataframe(members[members["cluster"] == pick], use_container_width=True, hide_index=True)
+                c1, c2 = st.columns(2)
+                c1.download_button("📄 묶음 보고서 JSON 다운로드",
+                                   data=lambda: near_dup_report_json(clusters, members, result["threshold"]),
+                                   file_name="near_duplicates.json", mime="application/json", on_click="ignore",
+                                   key="corpus_nd_json")
+                c2.download_button("📊 묶음별 문서 CSV 다운로드",
+                                   data=lambda: members.to_csv(index=False).encode("utf-8-sig"),
+                                   file_name="near_duplicates.csv", mime="text/csv", on_click="ignore",
+                                   key="corpus_nd_csv")
+
+
+# Streamlit은 스크립트를 __main__으로 실행하므로, 다른 모듈에서 import할 때는 UI가 그려지지 않습니다.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+"""
+합성 워크로드 기반 성능 벤치마크
+
+단계별(excel_to_json_records, parse_tech_stack, load_json_from_txt_bytes,
+build_workbook_nontrack, build_workbook_track, apply_vba_*, compact_styles) 소요 시간을 측정해
+JSON 리포트로 남기고, 저장된 기준(baseline)과 비교해 회귀 시 exit code 1로 종료합니다.
+스타일 표 정리 전/후의 결과 크기·저장 시간·스타일 개수는 배치(--batch개 파일) 단위로 따로 보고합니다.
+
+사용 예:
+    python bench.py --rows 500 --tasks 10 --skills 7 --tracks 4 --repeat 5 --out bench_report.json
+    python bench.py --save-baseline bench_baseline.json
+    python bench.py --baseline bench_baseline.json --tolerance 0.25
+"""
+import argparse
+import json
+import platform
+import random
+import re
+import statistics
+import sys
+import time
+import zipfile
+from datetime import datetime, timezone
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import openpyxl
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Alignment, Font
+from openpyxl.styles.borders import Border, Side
+
+import app
+
+
+# ==========================
+# 합성 입력 생성기
+# ==========================
+WORDS = [
+    "음성", "인식", "모델", "데이터", "파이프라인", "평가", "배포", "최적화", "전처리", "학습",
+    "서비스", "품질", "분석", "설계", "운영", "검증", "자동화", "플랫폼", "성능", "개선",
+]
+TECH_POOL = {
+    "Language": ["Python", "C++", "Java", "Go", "Rust", "Kotlin", "SQL"],
+    "Tools": ["Docker", "Kubernetes", "Git", "Jenkins", "Airflow", "MLflow", "Kaldi"],
+    "Audio": ["librosa", "sox", "ffmpeg", "torchaudio", "WebRTC VAD"],
+    "Data": ["pandas", "Spark", "Kafka", "PostgreSQL", "Parquet"],
+}
+
+
+def _sentence(rng: random.Random, n_words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n_words))
+
+
+def _tech_text(rng: random.Random) -> str:
+    lines = []
+    for cat, pool in TECH_POOL.items():
+        k = rng.randint(1, 3)
+        lines.append(f"* {cat}: {', '.join(rng.sample(pool, k))}")
+    return "\n".join(lines)
+
+
+def _tech_dict(rng: random.Random) -> Dict[str, List[str]]:
+    return {
+        "language": rng.sample(TECH_POOL["Language"], 2),
+        "os": ["Linux"],
+        "tools": rng.sample(TECH_POOL["Tools"], 2),
+    }
+
+
+def make_source_workbook(n_rows: int, seed: int = 0) -> bytes:
+    """도구 1 입력: 12행부터 D(업무명)/E(설명)/F(테크 스택)이 채워진 워크북"""
+    rng = random.Random(seed)
+    wb = Workbook()
+    ws = wb.active
+    ws["A1"] = "업무분장표"
+    for i in range(n_rows):
+        r = 12 + i
+        ws.cell(row=r, column=4, value=f"업무 {i + 1} {_sentence(rng, 2)}")
+        ws.cell(row=r, column=5, value=_sentence(rng, 12) + "\n" + _sentence(rng, 8))
+        ws.cell(row=r, column=6, value=_tech_text(rng))
+    bio = BytesIO(); wb.save(bio)
+    return bio.getvalue()
+
+
+def make_nontrack_json(n_tasks: int, n_skills: int, seed: int = 0) -> Dict[str, Any]:
+    """도구 2 Non Track 입력: {"tasks": [...], "skills": [{"skill": {...}, "related_tasks": [...]}]}"""
+    rng = random.Random(seed)
+    tasks = [
+        {
+            "task_id": f"T{i + 1:03d}",
+            "task_name": f"업무 {i + 1} {_sentence(rng, 2)}",
+            "task_description": _sentence(rng, 20) + " [cite: 1]",
+        }
+        for i in range(n_tasks)
+    ]
+    skills = []
+    for i in range(n_skills):
+        related = [{"task_id": t["task_id"]} for t in rng.sample(tasks, min(3, len(tasks)))]
+        skills.append({
+            "skill": {
+                "name": f"스킬 {i + 1} {_sentence(rng, 1)}",
+                "definition": _sentence(rng, 25) + " (Source: 내부 문서)",
+                "tech_stack": _tech_dict(rng),
+                "rank": i + 1,
+            },
+            "related_tasks": related,
+        })
+    return {"tasks": tasks, "skills": skills}
+
+
+def make_track_json(n_tracks: int, tasks_per_track: int, skills_per_track: int,
+                    n_common: int, seed: int = 0) -> Dict[str, Any]:
+    """도구 2 Track 입력: meta.tracks + 트랙별 task/skill + common 범위 스킬(related_tasks로 트랙 연결)"""
+    rng = random.Random(seed)
+    tracks = [{"track_name": f"트랙{t + 1} {rng.choice(WORDS)}", "track_code": f"TR{t + 1}"} for t in range(n_tracks)]
+    tasks, skills = [], []
+    for tr in tracks:
+        track_ref = {"name": tr["track_name"], "code": tr["track_code"]}
+        for i in range(tasks_per_track):
+            tasks.append({
+                "task_id": f"{tr['track_code']}-T{i + 1:02d}",
+                "task_name": f"{tr['track_code']} 업무 {i + 1} {_sentence(rng, 2)}",
+                "task_description": _sentence(rng, 20),
+                "track": track_ref,
+            })
+        for i in range(skills_per_track):
+            skills.append({
+                "skill": {
+                    "name": f"{tr['track_code']} 스킬 {i + 1}",
+                    "definition": _sentence(rng, 25) + " [cite: 2]",
+                    "tech_stack": _tech_dict(rng),
+                    "rank": i + 1,
+                },
+                "track": track_ref,
+                "track_scope": "track",
+                "related_tasks": [],
+            })
+    for i in range(n_common):
+        related = [
+            {"task_name": t["task_name"], "track": t["track"]}
+            for t in rng.sample(tasks, min(2 * max(n_tracks, 1), len(tasks)))
+        ]
+        skills.append({
+            "skill": {
+                "name": f"공통 스킬 {i + 1}",
+                "definition": _sentence(rng, 25),
+                "tech_stack": _tech_dict(rng),
+                "rank": None if i % 3 == 0 else i + 1,
+            },
+            "track_scope": "common",
+            "related_tasks": related,
+        })
+    return {"meta": {"tracks": tracks}, "tasks": tasks, "skills": skills}
+
+
+def make_template() -> bytes:
+    """기본 템플릿이 없을 때 사용하는 최소 템플릿(Description/Task/Skill, 테두리·병합·열 너비 포함)"""
+    thin = Side(style="thin", color="000000")
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    header_font = Font(name="맑은 고딕", sz=11, b=True)
+
+    wb = Workbook()
+    desc = wb.active
+    desc.title = "Description"
+    desc["A1"] = "Paper Interview 안내"
+    for r in (8, 15):
+        desc.cell(row=r, column=2, value="안내 문구")
+
+    for title, headers, last_row in (
+        ("Task", ["Task 명", "Task 명 수정안", "Task 설명", "Task 설명 수정안"], 14),
+        ("Skill", ["유관업무", "스킬 명", "스킬 명 수정안", "스킬 설명", "스킬 설명 수정안", "테크 스택", "테크 스택 수정안"], 11),
+    ):
+        ws = wb.create_sheet(title)
+        ws["A1"] = "상위조직명"; ws["A2"] = "직무명"
+        ws.merge_cells("B1:C1"); ws.merge_cells("B2:C2")
+        for c, h in enumerate(headers, start=1):
+            cell = ws.cell(row=4, column=c, value=h)
+            cell.font = header_font
+            cell.border = border
+            cell.alignment = Alignment(horizontal="center", vertical="center")
+            ws.column_dimensions[cell.column_letter].width = 30
+        for r in range(5, last_row + 1):
+            ws.row_dimensions[r].height = 60
+            for c in range(1, len(headers) + 1):
+                ws.cell(row=r, column=c).border = border
+    bio = BytesIO(); wb.save(bio)
+    return bio.getvalue()
+
+
+def load_template_bytes(name: str) -> bytes:
+    path = app.TEMPLATE_DIR / name
+    return path.read_bytes() if path.exists() else make_template()
+
+
+# ==========================
+# 측정
+# ==========================
+def time_stage(fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """fn을 repeat회 실행한 소요 시간(초). setup이 있으면 매 회 setup() 결과를 fn 인자로 넘기고, setup 시간은 제외"""
+    runs = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        t0 = time.perf_counter()
+        fn(arg) if setup else fn()
+        runs.append(time.perf_counter() - t0)
+    return {
+        "median_s": statistics.median(runs),
+        "min_s": min(runs),
+        "runs": runs,
+    }
+
+
+def run_benchmarks(args) -> Dict[str, Any]:
+    src_xlsx = make_source_workbook(args.rows, seed=args.seed)
+    nt_data = make_nontrack_json(args.tasks, args.skills, seed=args.seed)
+    tr_data = make_track_json(args.tracks, args.tasks, args.skills, args.common, seed=args.seed)
+    # TXT 안에 JSON 전후 텍스트가 섞인 경우(fallback 경로)도 함께 측정
+    nt_txt = ("아래는 결과입니다.\n" + json.dumps(nt_data, ensure_ascii=False, indent=2) + "\n끝.").encode("utf-8")
+    tr_txt = json.dumps(tr_data, ensure_ascii=False, indent=2).encode("utf-8")
+    tpl_nt = load_template_bytes(app.DEFAULT_TEMPLATE_NONTRACK)
+    tpl_tr = load_template_bytes(app.DEFAULT_TEMPLATE_TRACK)
+
+    df = pd.read_excel(BytesIO(src_xlsx), header=None, engine="openpyxl")
+    tech_texts = [str(v) for v in df.iloc[11:, 5].tolist()]
+
+    stages: Dict[str, Dict[str, Any]] = {}
+    r = args.repeat
+    stages["read_excel"] = time_stage(lambda: pd.read_excel(BytesIO(src_xlsx), header=None, engine="openpyxl"), r)
+    stages["excel_to_json_records"] = time_stage(lambda: app.excel_to_json_records(df), r)
+    stages["parse_tech_stack"] = time_stage(lambda: [app.parse_tech_stack(t) for t in tech_texts], r)
+    stages["load_json_from_txt_bytes"] = time_stage(
+        lambda: (app.load_json_from_txt_bytes(nt_txt), app.load_json_from_txt_bytes(tr_txt)), r)
+    stages["build_workbook_nontrack"] = time_stage(
+        lambda: app.build_workbook_nontrack(tpl_nt, "조직", "직무", nt_data), r)
+    stages["build_workbook_track"] = time_stage(
+        lambda: app.build_workbook_track(tpl_tr, "조직", "직무", tr_data), r)
+
+    # VBA 패스는 Track 결과물(트랙 시트 포함)을 매 회 새로 로드해 단독 측정
+    track_out = app.build_workbook_track(tpl_tr, "조직", "직무", tr_data).getvalue()
+    fresh = lambda: load_workbook(BytesIO(track_out))
+    stages["apply_vba_description_edits"] = time_stage(app.apply_vba_description_edits, r, setup=fresh)
+    stages["apply_vba_extra_borders_and_dims"] = time_stage(app.apply_vba_extra_borders_and_dims, r, setup=fresh)
+    stages["apply_vba_global_font"] = time_stage(lambda wb: app.apply_vba_global_font(wb, "현대하모니 L"), r, setup=fresh)
+    stages["apply_vba_korean_fix_to_headers"] = time_stage(app.apply_vba_korean_fix_to_headers, r, setup=fresh)
+    stages["compact_styles"] = time_stage(app.compact_styles, r, setup=fresh)
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "openpyxl": openpyxl.__version__,
+            "pandas": pd.__version__,
+            "params": {
+                "rows": args.rows, "tasks": args.tasks, "skills": args.skills,
+                "tracks": args.tracks, "common": args.common,
+                "repeat": args.repeat, "seed": args.seed,
+            },
+        },
+        "stages": stages,
+        "style_compaction": style_compaction_report(args, tpl_nt, tpl_tr),
+    }
+
+
+STYLE_COUNT_TAGS = ("fonts", "fills", "borders", "cellXfs")
+
+def style_counts(xlsx: bytes) -> Dict[str, int]:
+    """저장된 xl/styles.xml의 목록별 항목 수"""
+    with zipfile.ZipFile(BytesIO(xlsx)) as zf:
+        xml = zf.read("xl/styles.xml").decode("utf-8")
+    counts = {}
+    for tag in STYLE_COUNT_TAGS:
+        m = re.search(rf'<{tag} count="(\d+)"', xml)
+        counts[tag] = int(m.group(1)) if m else 0
+    return counts
+
+
+def style_compaction_report(args, tpl_nt: bytes, tpl_tr: bytes) -> Dict[str, Any]:
+    """모드별로 같은 배치(시드만 다른 --batch개 파일)를 스타일 정리 없이/정리하고 변환해
+    결과 크기 합계, 저장(save)·정리(compact_styles) 시간 합계의 반복 중앙값, 파일당 평균 스타일 개수를 비교"""
+    batches = {
+        "Non Track": (app.process_uploaded_txt_nontrack, app.ParsedTemplate(tpl_nt),
+                      [make_nontrack_json(args.tasks, args.skills, seed=args.seed + i) for i in range(args.batch)]),
+        "Track": (app.process_uploaded_txt_track, app.ParsedTemplate(tpl_tr),
+                  [make_track_json(args.tracks, args.tasks, args.skills, args.common, seed=args.seed + i)
+                   for i in range(args.batch)]),
+    }
+    report: Dict[str, Any] = {}
+    try:
+        for mode, (process, template, docs) in batches.items():
+            txts = [json.dumps(d, ensure_ascii=False).encode("utf-8") for d in docs]
+            report[mode] = {"files": len(txts)}
+            for label, compact in (("before", False), ("after", True)):
+                app.COMPACT_STYLES = compact
+                save_runs, compact_runs = [], []
+                for _ in range(args.repeat):
+                    outputs, save_s, compact_s = [], 0.0, 0.0
+                    for i, raw in enumerate(txts):
+                        timer = app.StageTimer(mode, f"조직_직무{i}.txt")
+                        _, bio = process(app.NamedBytesIO(f"조직_직무{i}.txt", raw), template, timer=timer)
+                        outputs.append(bio.getvalue())
+                        save_s += sum(st["seconds"] for st in timer.stages if st["stage"] == "save")
+                        compact_s += sum(st["seconds"] for st in timer.stages if st["stage"] == "compact_styles")
+                    save_runs.append(save_s); compact_runs.append(compact_s)
+                counts = [style_counts(b) for b in outputs]
+                report[mode][label] = {
+                    "bytes": sum(len(b) for b in outputs),
+                    "save_s": statistics.median(save_runs),
+                    "compact_s": statistics.median(compact_runs),
+                    "styles": {tag: sum(c[tag] for c in counts) / len(counts) for tag in STYLE_COUNT_TAGS},
+                }
+    finally:
+        app.COMPACT_STYLES = True
+    return report
+
+
+# ==========================
+# 기준 비교
+# ==========================
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float, min_delta_s: float) -> List[str]:
+    """기준 대비 median이 (1 + tolerance)배를 넘고 절대 차이가 min_delta_s 이상이면 회귀로 판단"""
+    regressions = []
+    if baseline.get("meta", {}).get("params") != report["meta"]["params"]:
+        print("Warning: 기준과 워크로드 파라미터가 다릅니다. 비교 결과를 신뢰하기 어렵습니다.", file=sys.stderr)
+    cur_stages = report["stages"]
+    for name, base in baseline.get("stages", {}).items():
+        cur = cur_stages.get(name)
+        if cur is None:
+            print(f"Warning: 현재 리포트에 '{name}' 단계가 없습니다.", file=sys.stderr)
+            continue
+        b, c = base["median_s"], cur["median_s"]
+        ratio = c / b if b > 0 else float("inf")
+        flag = ratio > 1 + tolerance and (c - b) >= min_delta_s
+        cur["baseline_median_s"] = b
+        cur["ratio"] = ratio
+        if flag:
+            regressions.append(f"{name}: {b * 1000:.2f}ms → {c * 1000:.2f}ms (x{ratio:.2f})")
+    return regressions
+
+
+def print_table(report: Dict[str, Any]):
+    print(f"{'stage':36s} {'median(ms)':>11s} {'min(ms)':>9s} {'vs base':>8s}")
+    for name, s in report["stages"].items():
+        ratio = f"x{s['ratio']:.2f}" if "ratio" in s else ""
+        print(f"{name:36s} {s['median_s'] * 1000:11.2f} {s['min_s'] * 1000:9.2f} {ratio:>8s}")
+    print(f"\n{'style compaction (batch)':26s} {'bytes':>17s} {'save(ms)':>15s} {'compact(ms)':>11s}  styles/file (fonts/fills/borders/cellXfs)")
+    for mode, r in report.get("style_compaction", {}).items():
+        b, a = r["before"], r["after"]
+        styles = lambda x: "/".join(f"{x['styles'][t]:g}" for t in STYLE_COUNT_TAGS)
+        print(f"{mode + ' x' + str(r['files']):26s} {b['bytes']:>8d}→{a['bytes']:<8d} "
+              f"{b['save_s'] * 1000:>7.1f}→{a['save_s'] * 1000:<7.1f} {a['compact_s'] * 1000:>11.1f}  "
+              f"{styles(b)} → {styles(a)}")
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Excel ↔ JSON 변환 도구 벤치마크")
+    p.add_argument("--rows", type=int, default=500, help="도구 1 원본 워크북 행 수 (D12:F)")
+    p.add_argument("--tasks", type=int, default=10, help="Non Track task 수 / Track 트랙당 task 수")
+    p.add_argument("--skills", type=int, default=7, help="Non Track skill 수 / Track 트랙당 skill 수")
+    p.add_argument("--tracks", type=int, default=4, help="Track 트랙 수")
+    p.add_argument("--common", type=int, default=6, help="Track common 범위 스킬 수")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--batch", type=int, default=8, help="스타일 정리 비교에 쓸 모드별 파일 수")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", type=Path, default=Path("bench_report.json"))
+    p.add_argument("--baseline", type=Path, help="비교할 기준 리포트(JSON)")
+    p.add_argument("--save-baseline", type=Path, help="이번 결과를 기준 리포트로 저장")
+    p.add_argument("--tolerance", type=float, default=0.25, help="허용 배율(0.25 → 25%% 느려질 때까지 허용)")
+    p.add_argument("--min-delta-ms", type=float, default=1.0, help="이보다 작은 절대 차이는 노이즈로 무시")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = run_benchmarks(args)
+
+    regressions = []
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(report, baseline, args.tolerance, args.min_delta_ms / 1000)
+    report["regressions"] = regressions
+
+    args.out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print_table(report)
+
+    if regressions:
+        print("\nREGRESSION:", file=sys.stderr)
+        for line in regressions:
+            print(f"  - {line}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+검토 완료 워크북 수정안 수집 도구
+
+검토자가 돌려준 Paper Interview 워크북(Non Track / Track)에서 수정안 열에 적힌 내용만 모아
+원래 값과 나란히 하나의 변경 목록(JSON 또는 CSV)으로 만듭니다.
+  - Task 시트  : A(Task 명) → B(수정안), C(Task 설명) → D(수정안)
+  - Skill 시트 : B(스킬 명) → C(수정안), D(스킬 설명) → E(수정안), F(테크 스택) → G(수정안)
+  - Track은 '트랙 n_Task' / '트랙 n_Skill' 시트에 같은 규칙 적용 (통합 워크북의 '번호_직무명_…' 시트 포함)
+
+워크북은 읽기 전용 모드로 스트리밍해서 읽고, 파일 단위로 여러 프로세스에 나눠 처리합니다.
+
+사용 예:
+    python harvest.py returned/ --out changes.json
+    python harvest.py returned/ more.xlsx --out changes.csv --workers 8
+종료 코드: 0 = 정상, 2 = 읽지 못한 파일 있음
+"""
+import argparse
+import csv
+import json
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from openpyxl import load_workbook
+
+import app
+
+# (필드명, 원래 값 열, 수정안 열) — 1부터 시작하는 열 번호
+TASK_FIELDS = (("task_name", 1, 2), ("task_description", 3, 4))
+SKILL_FIELDS = (("skill_name", 2, 3), ("definition", 4, 5), ("tech_stack", 6, 7))
+SHEET_LAYOUTS = {
+    "Task": (TASK_FIELDS, 1, app.TASK_START_ROW_NT, app.TASK_END_ROW_NT),      # 항목 이름 열: A
+    "Skill": (SKILL_FIELDS, 2, app.SKILL_START_ROW_NT, app.SKILL_END_ROW_NT),  # 항목 이름 열: B
+}
+# 통합 워크북은 '07_직무명_Task', '07_직무명_트랙 1_Skill'처럼 앞에 직무 번호가 붙음
+SHEET_PATTERN = re.compile(r"^(?:\d+_(?:.*?_)?)?(?:트랙\s*(?P<track>\d+)_)?(?P<kind>Task|Skill)$")
+CSV_COLUMNS = ["file", "workbook", "org", "job", "track", "sheet", "row", "item",
+               "field", "cell", "original", "correction"]
+
+
+def cell_text(v: Any) -> str:
+    return "" if v is None else str(v).strip()
+
+
+def iter_input_files(paths: List[Path]) -> Iterator[Path]:
+    for path in paths:
+        found = sorted(path.rglob("*.xlsx")) if path.is_dir() else [path]
+        for p in found:
+            if not p.name.startswith(("~$", ".")):  # 엑셀 잠금 파일/숨김 파일
+                yield p
+
+
+def harvest_sheet(ws, kind: str) -> Iterator[Dict[str, Any]]:
+    fields, item_col, row_start, row_end = SHEET_LAYOUTS[kind]
+    max_col = max(corr for _, _, corr in fields)
+    for r, values in enumerate(ws.iter_rows(min_row=row_start, max_row=row_end, max_col=max_col,
+                                            values_only=True), start=row_start):
+        values = tuple(values) + (None,) * (max_col - len(values))
+        for field, orig_col, corr_col in fields:
+            correction = cell_text(values[corr_col - 1])
+            original = cell_text(values[orig_col - 1])
+            if not correction or correction == original:
+                continue
+            yield {
+                "row": r,
+                "item": cell_text(values[item_col - 1]),
+                "field": field,
+                "cell": f"{chr(64 + corr_col)}{r}",
+                "original": original,
+                "correction": correction,
+            }
+
+
+def harvest_workbook(path: str) -> Dict[str, Any]:
+    """워크북 1개에서 수정안 추출 → {file, changes, error}"""
+    changes: List[Dict[str, Any]] = []
+    try:
+        wb = load_workbook(path, read_only=True, data_only=True)
+    except Exception as e:
+        return {"file": path, "changes": changes, "error": f"{type(e).__name__}: {e}"}
+    try:
+        matches = [SHEET_PATTERN.match(n) for n in wb.sheetnames]
+        workbook_type = "Track" if any(m and m.group("track") for m in matches) else "Non Track"
+        for name in wb.sheetnames:
+            m = SHEET_PATTERN.match(name)
+            if not m:
+                continue
+            ws = wb[name]
+            # 1~2행 B~D: B1 상위조직, B2 직무, D1 트랙명
+            top = [tuple(row) + (None,) * 3 for row in
+                   ws.iter_rows(min_row=1, max_row=2, min_col=2, max_col=4, values_only=True)]
+            top += [(None,) * 3] * (2 - len(top))
+            base = {
+                "file": path,
+                "workbook": workbook_type,
+                "org": cell_text(top[0][0]),
+                "job": cell_text(top[1][0]),
+                "track": cell_text(top[0][2]) if m.group("track") else "",
+                "sheet": name,
+            }
+            for change in harvest_sheet(ws, m.group("kind")):
+                changes.append({**base, **change})
+    except Exception as e:
+        return {"file": path, "changes": changes, "error": f"{type(e).__name__}: {e}"}
+    finally:
+        wb.close()
+    return {"file": path, "changes": changes, "error": None}
+
+
+def harvest_files(files: List[Path], workers: int) -> Dict[str, Any]:
+    jobs = [str(p) for p in files]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(harvest_workbook, jobs, chunksize=max(1, len(jobs) // (workers * 8))))
+    else:
+        results = [harvest_workbook(j) for j in jobs]
+    return {
+        "files": len(results),
+        "files_with_changes": sum(1 for r in results if r["changes"]),
+        "changes": [c for r in results for c in r["changes"]],
+        "errors": [{"file": r["file"], "error": r["error"]} for r in results if r["error"]],
+    }
+
+
+def write_report(report: Dict[str, Any], out: Path, fmt: str):
+    if fmt == "csv":
+        # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+        with open(out, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+            writer.writeheader()
+            writer.writerows(report["changes"])
+    else:
+        out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="검토 완료 워크북의 수정안 열을 모아 변경 목록(JSON/CSV) 생성")
+    p.add_argument("inputs", type=Path, nargs="+", help="워크북 파일 또는 폴더(하위 폴더의 .xlsx 포함)")
+    p.add_argument("--out", type=Path, required=True, help="결과 파일 (.json 또는 .csv)")
+    p.add_argument("--format", choices=["json", "csv"], help="출력 형식 (기본: --out 확장자로 판단)")
+    p.add_argument("--workers", type=int, default=4)
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    files = list(iter_input_files(args.inputs))
+    fmt = args.format or ("csv" if args.out.suffix.lower() == ".csv" else "json")
+    report = harvest_files(files, args.workers)
+    write_report(report, args.out, fmt)
+    print(f"워크북 {report['files']}개 — 수정 있음 {report['files_with_changes']}, "
+          f"수정안 {len(report['changes'])}건, 오류 {len(report['errors'])}")
+    for e in report["errors"][:20]:
+        print(f"- {e['file']}: {e['error']}", file=sys.stderr)
+    return 2 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
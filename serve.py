@@ -0,0 +1,468 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 HTTP 변환 서비스 (+ 부하 테스트)
+
+Streamlit UI 없이 다른 도구에서 같은 변환기를 호출할 수 있도록 엔드포인트를 제공합니다.
+변환은 템플릿을 미리 파싱해 둔 프로세스 풀(--workers)에서 실행되고, 대기열(--queue)을 넘으면 503을 돌려줍니다.
+
+  GET  /healthz
+  POST /v1/excel-to-json?filename=원본.xlsx   (본문: 엑셀 바이너리)     → JSON txt
+  POST /v1/nontrack?filename=조직_직무.txt     (본문: TXT(JSON))        → xlsx
+  POST /v1/track?filename=조직_직무.txt        (본문: TXT(JSON))        → xlsx
+  위 POST에 multipart/form-data로 파일 여러 개를 보내면 완료되는 순서대로 ZIP을 스트리밍합니다.
+  (실패한 파일은 ZIP 안의 errors.json에 기록, 같은 결과를 낼 중복 파일은 한 번만 변환)
+  변환 실패는 입력 문제(JSON 파싱/구조 검증, 읽을 수 없는 엑셀)면 422, 워커/템플릿 문제면 500/503입니다.
+  (묶음 요청은 errors.json의 status 값)
+
+사용 예:
+    python serve.py serve --port 8765 --workers 4
+    curl -s --data-binary @조직_직무.txt "http://127.0.0.1:8765/v1/nontrack?filename=조직_직무.txt" -o out.xlsx
+    curl -s -F file=@a.txt -F file=@b.txt http://127.0.0.1:8765/v1/track -o out.zip
+    python serve.py loadtest --spawn --kind nontrack --concurrency 8 --requests 200
+"""
+import argparse
+import email.parser
+import email.policy
+import json
+import multiprocessing
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import zipfile
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from openpyxl.utils.exceptions import InvalidFileException
+
+import app
+
+KIND_EXCEL, KIND_NONTRACK, KIND_TRACK = "excel-to-json", "nontrack", "track"
+ROUTES = {f"/v1/{k}": k for k in (KIND_EXCEL, KIND_NONTRACK, KIND_TRACK)}
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class InputError(ValueError):
+    """요청 본문 자체를 변환할 수 없음 (JSON 파싱/구조 검증 실패, 읽을 수 없는 엑셀) → 422"""
+
+
+# ==========================
+# 워커 프로세스 (템플릿 사전 로드)
+# ==========================
+_WORKER_TEMPLATES: Dict[str, app.ParsedTemplate] = {}
+
+
+def _init_worker(template_paths: Dict[str, Optional[str]]):
+    for kind, path in template_paths.items():
+        if path and Path(path).exists():
+            _WORKER_TEMPLATES[kind] = app.ParsedTemplate(Path(path).read_bytes())
+
+
+def _ping() -> bool:
+    return True
+
+
+def convert_in_worker(kind: str, filename: str, data: bytes) -> Tuple[str, bytes]:
+    """워커에서 변환 1건 → (결과 파일명, 결과 bytes). 입력 문제는 InputError로 구분해 올림"""
+    timer = app.StageTimer(f"http:{kind}", filename)
+    try:
+        if kind == KIND_EXCEL:
+            try:  # 템플릿을 쓰지 않으므로 읽기/변환 실패는 입력 엑셀 문제
+                text = app.convert_excel_to_json_text(BytesIO(data), timer=timer)
+            except (InvalidFileException, zipfile.BadZipFile, ValueError, KeyError, IndexError) as e:
+                raise InputError(f"엑셀을 읽을 수 없습니다: {e}") from None
+            out = (f"{Path(filename).stem}.json.txt", text.encode("utf-8"))
+        else:
+            template = _WORKER_TEMPLATES.get(kind)
+            if template is None:
+                raise FileNotFoundError(f"{kind} 템플릿이 로드되지 않았습니다.")
+            check = app.validate_txt_input(filename, data, "Track" if kind == KIND_TRACK else "Non Track")
+            if not check.ok:
+                raise InputError(f"검증 실패 [{check.shape}]: {'; '.join(check.errors)}")
+            process_fn = app.process_uploaded_txt_track if kind == KIND_TRACK else app.process_uploaded_txt_nontrack
+            name, bio = process_fn(app.NamedBytesIO(filename, data), template, timer=timer)
+            out = (name, bio.getvalue())
+    except Exception:
+        timer.emit_log(status="error")
+        raise
+    timer.emit_log()
+    return out
+
+
+class ConversionPool:
+    """프로세스 풀 + 대기열 상한. 상한을 넘는 요청은 바로 거절(503)해 지연이 무한정 늘지 않게 합니다."""
+
+    def __init__(self, workers: int, queue_size: int, template_paths: Dict[str, Optional[Path]]):
+        self.workers = workers
+        self.template_paths = {k: (str(v) if v else None) for k, v in template_paths.items()}
+        self.loaded_kinds = [k for k, v in template_paths.items() if v and v.exists()]
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),  # 스레드가 있는 서버 프로세스에서 fork 회피
+            initializer=_init_worker,
+            initargs=(self.template_paths,),
+        )
+        # 첫 요청 지연을 없애기 위해 워커를 미리 띄워 템플릿까지 로드
+        for f in [self._executor.submit(_ping) for _ in range(workers)]:
+            f.result()
+
+    def try_acquire(self, n: int = 1) -> bool:
+        acquired = 0
+        for _ in range(n):
+            if not self._slots.acquire(blocking=False):
+                self.release(acquired)
+                return False
+            acquired += 1
+        return True
+
+    def release(self, n: int = 1):
+        for _ in range(n):
+            self._slots.release()
+
+    def submit(self, kind: str, filename: str, data: bytes):
+        """try_acquire로 자리를 확보한 뒤 호출. 완료 시 자리 반환 (풀이 깨져 제출이 실패해도 반환)"""
+        try:
+            future = self._executor.submit(convert_in_worker, kind, filename, data)
+        except BaseException:
+            self.release()
+            raise
+        future.add_done_callback(lambda _: self.release())
+        return future
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+# ==========================
+# HTTP
+# ==========================
+class ChunkedWriter:
+    """HTTP chunked 전송 스트림. tell/seek가 없으므로 zipfile이 스트리밍 모드(data descriptor)로 씁니다."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, b) -> int:
+        if b:
+            self.wfile.write(f"{len(b):X}\r\n".encode("ascii"))
+            self.wfile.write(b)
+            self.wfile.write(b"\r\n")
+        return len(b)
+
+    def flush(self):
+        self.wfile.flush()
+
+    def close(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def parse_multipart(content_type: str, body: bytes) -> List[Tuple[str, bytes]]:
+    """multipart/form-data → [(파일명, bytes)] (파일이 아닌 필드는 무시)"""
+    msg = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+    )
+    files = []
+    for part in msg.iter_parts():
+        filename = part.get_filename()
+        if filename:
+            files.append((filename, part.get_payload(decode=True) or b""))
+    return files
+
+
+def error_status(e: BaseException) -> int:
+    """변환 예외 → HTTP 상태. 입력 문제만 4xx, 워커/풀/템플릿 문제는 서버 쪽 오류"""
+    if isinstance(e, InputError):
+        return 422
+    if isinstance(e, (BrokenExecutor, FileNotFoundError)):  # BrokenProcessPool, 템플릿 미로드
+        return 503
+    return 500
+
+
+def content_disposition(filename: str) -> str:
+    ascii_name = filename.encode("ascii", "replace").decode("ascii").replace("?", "_").replace('"', "")
+    return f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{urllib.parse.quote(filename)}"
+
+
+class ConversionHandler(BaseHTTPRequestHandler):
+    server_version = "ExcelJsonConverter/1.0"
+    protocol_version = "HTTP/1.1"
+    pool: ConversionPool = None  # make_server에서 주입
+    max_body_bytes: int = 50 * 1024 * 1024
+
+    def log_message(self, fmt, *args):
+        app.logger.info(json.dumps({"event": "http_access", "client": self.client_address[0],
+                                    "line": fmt % args}, ensure_ascii=False))
+
+    def _send_json(self, status: int, obj: Dict[str, Any], close: bool = False):
+        """close=True: 요청 본문을 읽지 않고 응답할 때. keep-alive에서 남은 본문이 다음 요청으로 해석되지 않도록 연결을 닫음"""
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if close:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urllib.parse.urlsplit(self.path).path
+        if path == "/healthz":
+            self._send_json(200, {"status": "ok", "workers": self.pool.workers, "templates": self.pool.loaded_kinds})
+        else:
+            self._send_json(404, {"error": f"알 수 없는 경로: {path}"})
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        kind = ROUTES.get(url.path)
+        if kind is None:
+            return self._send_json(404, {"error": f"알 수 없는 경로: {url.path}"}, close=True)
+        if kind != KIND_EXCEL and kind not in self.pool.loaded_kinds:
+            return self._send_json(503, {"error": f"{kind} 템플릿이 없습니다. --template-{kind} 옵션을 확인하세요."},
+                                   close=True)
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length <= 0:
+            return self._send_json(400, {"error": "본문이 비어 있습니다."}, close=True)
+        if length > self.max_body_bytes:
+            return self._send_json(413, {"error": f"본문이 너무 큽니다 (최대 {self.max_body_bytes} bytes)."},
+                                   close=True)
+        body = self.rfile.read(length)
+
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("multipart/form-data"):
+            files = parse_multipart(content_type, body)
+            if not files:
+                return self._send_json(400, {"error": "multipart에 파일이 없습니다."})
+            return self._handle_batch(kind, files)
+
+        query = urllib.parse.parse_qs(url.query)
+        filename = (query.get("filename") or [""])[0] or ("upload.xlsx" if kind == KIND_EXCEL else "upload.txt")
+        return self._handle_single(kind, filename, body)
+
+    def _handle_single(self, kind: str, filename: str, data: bytes):
+        if not self.pool.try_acquire():
+            return self._send_json(503, {"error": "작업 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요."})
+        try:
+            out_name, out_bytes = self.pool.submit(kind, filename, data).result()
+        except Exception as e:
+            return self._send_json(error_status(e), {"error": f"{filename} 변환 실패: {e}"})
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8" if kind == KIND_EXCEL else XLSX_MIME)
+        self.send_header("Content-Length", str(len(out_bytes)))
+        self.send_header("Content-Disposition", content_disposition(out_name))
+        self.end_headers()
+        self.wfile.write(out_bytes)
+
+    def _handle_batch(self, kind: str, files: List[Tuple[str, bytes]]):
+        # 같은 결과를 낼 파일은 대표 1개만 변환하고, ZIP 안 이름은 완료 순서와 무관하게 미리 확정
+        reps, out_names = app.plan_batch_outputs([n for n, _ in files], [d for _, d in files], output_identity(kind))
+        groups: Dict[int, List[int]] = {}
+        for i, r in enumerate(reps):
+            groups.setdefault(r, []).append(i)
+        if not self.pool.try_acquire(len(groups)):
+            return self._send_json(503, {"error": "작업 대기열이 가득 찼습니다. 파일 수를 줄이거나 잠시 후 다시 시도하세요."})
+        futures = {}
+        try:
+            for r in groups:
+                futures[self.pool.submit(kind, *files[r])] = r
+        except BrokenExecutor as e:
+            self.pool.release(len(groups) - len(futures) - 1)  # 제출하지 못한 나머지 자리 (실패한 1건은 submit이 반환)
+            for future in futures:
+                future.cancel()
+            return self._send_json(503, {"error": f"변환 워커를 사용할 수 없습니다: {e}"})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/zip")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Content-Disposition", content_disposition(f"{kind}_outputs.zip"))
+        self.end_headers()
+
+        stream = ChunkedWriter(self.wfile)
+        errors, written = [], set()
+        with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as zf:
+            for future in as_completed(futures):  # 끝나는 순서대로 바로 전송
+                members = groups[futures[future]]
+                try:
+                    _, out_bytes = future.result()
+                except Exception as e:
+                    errors.extend({"file": files[i][0], "status": error_status(e), "error": str(e)} for i in members)
+                    continue
+                for i in members:
+                    if out_names[i] not in written:  # 같은 이름 = 같은 결과
+                        written.add(out_names[i])
+                        zf.writestr(out_names[i], out_bytes)
+                stream.flush()
+            if errors:
+                zf.writestr("errors.json", json.dumps(errors, ensure_ascii=False, indent=2))
+        stream.close()
+
+
+def output_identity(kind: str):
+    if kind == KIND_EXCEL:
+        return app.json_output_identity
+    mode = "Track" if kind == KIND_TRACK else "Non Track"
+    return lambda name: app.txt_output_identity(name, mode)
+
+
+def make_server(host: str, port: int, pool: ConversionPool, max_body_mb: int = 50) -> ThreadingHTTPServer:
+    handler = type("BoundConversionHandler", (ConversionHandler,),
+                   {"pool": pool, "max_body_bytes": max_body_mb * 1024 * 1024})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+# ==========================
+# 부하 테스트
+# ==========================
+def build_payload(kind: str, seed: int = 0) -> Tuple[str, bytes]:
+    import bench  # 합성 입력 생성기 재사용
+    if kind == KIND_EXCEL:
+        return "조직_직무.xlsx", bench.make_source_workbook(50, seed=seed)
+    if kind == KIND_TRACK:
+        data = bench.make_track_json(4, 10, 7, 6, seed=seed)
+    else:
+        data = bench.make_nontrack_json(10, 7, seed=seed)
+    return "조직_직무_skill.txt", json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def run_loadtest(base_url: str, kind: str, concurrency: int, total: int) -> Dict[str, Any]:
+    filename, payload = build_payload(kind)
+    url = f"{base_url}/v1/{kind}?filename={urllib.parse.quote(filename)}"
+    latencies: List[float] = []
+    failures: List[str] = []
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker():
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            req = urllib.request.Request(url, data=payload, method="POST",
+                                         headers={"Content-Type": "application/octet-stream"})
+            t0 = time.perf_counter()
+            try:
+                with urllib.request.urlopen(req, timeout=120) as resp:
+                    resp.read()
+                with lock:
+                    latencies.append(time.perf_counter() - t0)
+            except (urllib.error.URLError, OSError) as e:
+                with lock:
+                    failures.append(str(e))
+
+    t_start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t_start
+
+    lat_ms = sorted(x * 1000 for x in latencies)
+    pct = lambda p: round(lat_ms[min(len(lat_ms) - 1, int(round(p / 100 * (len(lat_ms) - 1))))], 1) if lat_ms else None
+    return {
+        "kind": kind, "concurrency": concurrency, "requests": total,
+        "ok": len(latencies), "failed": len(failures),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "mean": round(statistics.mean(lat_ms), 1) if lat_ms else None,
+            "p50": pct(50), "p95": pct(95), "p99": pct(99), "max": pct(100),
+        },
+        "sample_errors": failures[:5],
+    }
+
+
+def template_paths_from_args(args) -> Dict[str, Optional[Path]]:
+    return {KIND_NONTRACK: args.template_nontrack, KIND_TRACK: args.template_track}
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Excel ↔ JSON 변환 HTTP 서비스")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    def add_server_options(sp):
+        sp.add_argument("--host", default="127.0.0.1")
+        sp.add_argument("--port", type=int, default=8765)
+        sp.add_argument("--workers", type=int, default=max(1, (multiprocessing.cpu_count() or 2) - 1))
+        sp.add_argument("--queue", type=int, default=32, help="워커가 바쁠 때 대기시킬 최대 파일 수")
+        sp.add_argument("--max-body-mb", type=int, default=50)
+        sp.add_argument("--template-nontrack", type=Path, default=app.TEMPLATE_DIR / app.DEFAULT_TEMPLATE_NONTRACK)
+        sp.add_argument("--template-track", type=Path, default=app.TEMPLATE_DIR / app.DEFAULT_TEMPLATE_TRACK)
+
+    add_server_options(sub.add_parser("serve", help="서비스 실행"))
+
+    lt = sub.add_parser("loadtest", help="로컬 부하 테스트")
+    add_server_options(lt)
+    lt.add_argument("--url", help="이미 실행 중인 서비스 주소 (예: http://127.0.0.1:8765)")
+    lt.add_argument("--spawn", action="store_true", help="임시 포트에 서비스를 띄워 테스트 (템플릿이 없으면 합성 템플릿 사용)")
+    lt.add_argument("--kind", choices=[KIND_EXCEL, KIND_NONTRACK, KIND_TRACK], default=KIND_NONTRACK)
+    lt.add_argument("--concurrency", type=int, default=8)
+    lt.add_argument("--requests", type=int, default=100)
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    if args.command == "serve":
+        pool = ConversionPool(args.workers, args.queue, template_paths_from_args(args))
+        server = make_server(args.host, args.port, pool, args.max_body_mb)
+        app.logger.info(json.dumps({"event": "http_started", "url": f"http://{args.host}:{args.port}",
+                                    "workers": args.workers, "templates": pool.loaded_kinds}, ensure_ascii=False))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            pool.shutdown()
+        return 0
+
+    # loadtest
+    if not args.url and not args.spawn:
+        print("--url 또는 --spawn 중 하나가 필요합니다.", file=sys.stderr)
+        return 2
+    server = pool = tmpdir = None
+    base_url = args.url
+    if args.spawn:
+        import tempfile
+        import bench
+        paths = template_paths_from_args(args)
+        if not all(p and p.exists() for p in paths.values()):
+            tmpdir = tempfile.TemporaryDirectory()
+            synthetic = Path(tmpdir.name) / "template.xlsx"
+            synthetic.write_bytes(bench.make_template())
+            paths = {k: (p if p and p.exists() else synthetic) for k, p in paths.items()}
+        pool = ConversionPool(args.workers, args.queue, paths)
+        server = make_server("127.0.0.1", 0, pool, args.max_body_mb)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        report = run_loadtest(base_url, args.kind, args.concurrency, args.requests)
+        report["workers"] = args.workers if args.spawn else None
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    finally:
+        if server is not None:
+            server.shutdown(); server.server_close()
+        if pool is not None:
+            pool.shutdown()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+    return 0 if report["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""배치 변환: 일반 파일과 ZIP 항목의 결과 파일명이 겹치면 서로 덮어쓰지 않고 접미사로 구분되는지 확인"""
+import io
+import json
+import zipfile
+
+import app
+import bench
+
+
+class Upload(io.BytesIO):
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name, self.size = name, len(data)
+
+
+def track_txt(seed):
+    return json.dumps(bench.make_track_json(3, 6, 4, 3, seed), ensure_ascii=False).encode()
+
+
+def zip_upload(name, entries):
+    bio = io.BytesIO()
+    with zipfile.ZipFile(bio, "w") as zf:
+        for entry_name, data in entries:
+            zf.writestr(entry_name, data)
+    return Upload(name, bio.getvalue())
+
+
+def test_both_mode_loose_and_zip_entry_with_same_name_keep_separate_outputs():
+    tpl = bench.make_template()
+    uploads = [Upload("조직A_직무1.txt", track_txt(0)), zip_upload("b.zip", [("x/조직A_직무1.txt", track_txt(1))])]
+    job = app.ConversionJob(uploads, app.MODE_BOTH, {"Non Track": tpl, "Track": tpl}, budget_bytes=256 * app.MB).start()
+    job._thread.join()
+    try:
+        assert job.errors == []
+        names = job.store.names()
+        assert len(names) == len(set(names)) == 4
+        assert len({job.store.get(n) for n in names}) == 4
+    finally:
+        job.close()
+
+
+def test_json_output_names_keep_compound_suffix():
+    raws = [b"1", b"2"]
+    _, names = app.plan_batch_outputs(["a.xlsx", "a.xlsx"], raws, app.json_output_identity)
+    assert sorted(names) == ["a (2).json.txt", "a.json.txt"]
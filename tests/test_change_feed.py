@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""도구 1 변경분: 행 식별자 기준 비교와 네임스페이스 분리"""
+import io
+import zipfile
+
+import app
+
+
+def rec(name, desc, tools=()):
+    return {"task_name": name, "task_description": desc, "tech_stack": {"tools": list(tools)}}
+
+
+def test_insert_edit_rename_delete():
+    old = [rec("A", "a"), rec("B", "b", ["x"]), rec("C", "c"), rec("E", "e")]
+    new = [rec("New", "n"), rec("A", "a"), rec("B", "b", ["x", "y"]), rec("C2", "c")]
+    ops = {(c["op"], c.get("task_name") or c["record"]["task_name"]): c for c in app.record_change_feed(old, new)}
+    assert set(ops) == {("added", "New"), ("modified", "B"), ("modified", "C2"), ("removed", "E")}
+    assert ops[("modified", "B")]["changes"] == {"tech_stack.tools": {"old": ["x"], "new": ["x", "y"]}}
+    assert "previous_id" in ops[("modified", "C2")]
+
+
+def test_same_file_name_in_other_namespace_is_not_compared(tmp_path):
+    path = tmp_path / "feed.sqlite3"
+    app.ChangeFeedStore("팀A", path).advance("직무.xlsx", "d1", [rec("A", "a")])
+    feed = app.ChangeFeedStore("팀B", path).advance("직무.xlsx", "d2", [rec("B", "b")])
+    assert feed["previous_digest"] is None
+    assert [c["op"] for c in feed["changes"]] == ["added"]
+    again = app.ChangeFeedStore("팀A", path).advance("직무.xlsx", "d3", [rec("A", "a"), rec("B", "b")])
+    assert again["previous_digest"] == "d1" and again["summary"]["added"] == 1
+
+
+def test_same_named_sources_get_separate_snapshots():
+    names = ["직무.xlsx", "직무.xlsx", "직무.xlsx", "기타.xlsx"]
+    assert app.feed_sources(names, ["d1", "d2", "d1", "d1"]) == ["직무.xlsx", "직무.xlsx (2)", "직무.xlsx", "기타.xlsx"]
+
+
+def test_zip_members_in_different_folders_have_distinct_labels():
+    bio = io.BytesIO()
+    with zipfile.ZipFile(bio, "w") as zf:
+        zf.writestr("x/직무.xlsx", b"1")
+        zf.writestr("y/직무.xlsx", b"2")
+    archive = app.NamedBytesIO("b.zip", bio.getvalue())
+    members = app.list_archive_members(archive, (".xlsx",))
+    assert [m.name for m in members] == ["직무.xlsx", "직무.xlsx"]
+    assert [m.label for m in members] == ["b.zip/x/직무.xlsx", "b.zip/y/직무.xlsx"]
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""입력 사전 검증: 앞뒤 문장이 섞인 TXT의 JSON 오류 위치가 원래 파일 기준인지 확인"""
+import app
+
+
+def test_error_line_counts_leading_prose():
+    raw = "아래는 결과입니다.\n설명 한 줄\n{\n  \"tasks\": [\n    {\"task_name\": \"a\",}\n  ]\n}\n끝".encode("utf-8")
+    check = app.validate_txt_input("a.txt", raw, "Non Track")
+    assert len(check.errors) == 1
+    assert "줄 5" in check.errors[0]
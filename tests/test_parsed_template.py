@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""템플릿 캐시(ParsedTemplate): 복제본으로 만든 워크북이 매번 load_workbook으로 만든 것과 같은지 확인"""
+import json
+
+import pytest
+
+import app
+import bench
+import wbdiff
+
+
+def built_pair(tmp_path, template, mode):
+    if mode == "Track":
+        data = bench.make_track_json(3, 6, 4, 3, seed=1)
+        build = lambda tpl: app.build_workbook_track(tpl, "조직A", "직무", json.loads(json.dumps(data)))
+    else:
+        data = bench.make_nontrack_json(8, 6, seed=1)
+        build = lambda tpl: app.build_workbook_nontrack(tpl, "조직A", "직무", json.loads(json.dumps(data)))
+    paths = tmp_path / "parsed.xlsx", tmp_path / "fresh.xlsx"
+    paths[0].write_bytes(build(template).getvalue())
+    paths[1].write_bytes(build(template.template_bytes).getvalue())  # bytes → 매번 load_workbook
+    return paths
+
+
+@pytest.mark.parametrize("mode", ["Non Track", "Track"])
+def test_parsed_template_matches_fresh_load(tmp_path, mode):
+    template = app.ParsedTemplate(bench.make_template())
+    assert template._pickled is not None
+    assert wbdiff.diff_workbooks(*built_pair(tmp_path, template, mode)) == []
+
+
+def test_falls_back_to_load_workbook_when_clone_fails(tmp_path, monkeypatch):
+    def broken_loads(data):
+        raise AttributeError("'Worksheet' object has no attribute '_add_row'")
+
+    template = app.ParsedTemplate(bench.make_template())
+    monkeypatch.setattr(app.pickle, "loads", broken_loads)
+    assert wbdiff.diff_workbooks(*built_pair(tmp_path, template, "Non Track")) == []
+    assert template._pickled is None
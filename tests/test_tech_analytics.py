@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""기술 스택 분석: 항목이 없는 배치도 빈 표로 처리되는지 확인"""
+import pytest
+
+import app
+
+
+@pytest.mark.parametrize("entries", [
+    [],
+    [("o", "f", None)],
+    [("o", "f", {"language": []})],
+    [("o", "f", {"tools": ["[cite: 1]"]})],
+])
+def test_no_tech_items_gives_empty_frame(entries):
+    items = app.tech_items_frame(entries)
+    assert items.empty
+    assert list(items.columns) == ["org", "file", "record", "category", "item"]
+    assert app.tech_frequency(items).empty
+
+
+def test_items_are_aggregated():
+    items = app.tech_items_frame([("o", "f", {"language": ["Python", "py"]}), ("o", "g", {"tools": ["Kaldi"]})])
+    assert sorted(items["item"]) == ["Kaldi", "Python"]
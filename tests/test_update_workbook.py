@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""기존 워크북 업데이트: 수정안 열이 행 번호가 아닌 항목을 따라가는지 확인"""
+from io import BytesIO
+
+from openpyxl import load_workbook
+
+import app
+import bench
+
+
+def tasks(*names):
+    return [{"task_name": n, "task_description": f"{n} 설명", "tech_stack": {}} for n in names]
+
+
+def reviewed_workbook(records, corrections):
+    wb = load_workbook(app.build_workbook_nontrack(bench.make_template(), "조직A", "직무", records))
+    for coord, value in corrections.items():
+        wb["Task"][coord] = value
+    bio = BytesIO()
+    wb.save(bio)
+    return bio.getvalue()
+
+
+def updated(existing, records):
+    bio, changes, notes = app.update_workbook_nontrack(existing, "조직A", "직무", records)
+    return load_workbook(bio)["Task"], changes, notes
+
+
+def test_insert_task_moves_correction_with_item():
+    existing = reviewed_workbook(tasks("업무 1", "업무 2", "업무 3"), {"B6": "업무 2 수정안", "D6": "설명 수정안"})
+    ws, _, notes = updated(existing, tasks("새 업무", "업무 1", "업무 2", "업무 3"))
+    assert [ws[f"A{r}"].value for r in range(5, 9)] == ["새 업무", "업무 1", "업무 2", "업무 3"]
+    assert ws["B7"].value == "업무 2 수정안" and ws["D7"].value == "설명 수정안"
+    assert ws["B6"].value is None and ws["D6"].value is None
+    assert notes == []
+
+
+def test_delete_task_reports_orphaned_correction():
+    existing = reviewed_workbook(tasks("업무 1", "업무 2", "업무 3"), {"B5": "업무 1 수정안", "B7": "업무 3 수정안"})
+    ws, _, notes = updated(existing, tasks("업무 2", "업무 3"))
+    assert [ws[f"A{r}"].value for r in range(5, 7)] == ["업무 2", "업무 3"]
+    assert ws["B5"].value is None
+    assert ws["B6"].value == "업무 3 수정안"
+    assert ws["B7"].value is None
+    assert len(notes) == 1 and "업무 1" in notes[0] and "업무 1 수정안" in notes[0]
+
+
+def test_renamed_task_keeps_correction_by_description():
+    records = tasks("업무 1", "업무 2")
+    existing = reviewed_workbook(records, {"B6": "이름 수정안"})
+    renamed = [dict(records[0]), {**records[1], "task_name": "업무 2 (개정)"}]
+    ws, _, notes = updated(existing, tasks("추가") + renamed)
+    assert ws["A7"].value == "업무 2 (개정)" and ws["B7"].value == "이름 수정안"
+    assert notes == []
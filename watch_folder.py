@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+감시 폴더 증분 변환 데몬
+
+입력 폴더를 주기적으로 훑어, 새로 생겼거나 내용(sha256)이 바뀐 파일만 변환해 출력 폴더에 씁니다.
+  - .xlsx / .xls           → 도구 1 (Excel → JSON txt)   : {stem}.json.txt
+  - .txt (이름이 트랙 규칙에 맞음) → 도구 2 Track        : Track_Paper Interview_{조직}_{직무}.xlsx
+  - .txt (그 외)           → 도구 2 Non Track            : Non Track_Paper Interview_{조직}_{직무}.xlsx
+
+처리 이력은 manifest(JSON)에 남기므로 재시작해도 이미 변환한 파일은 건너뜁니다.
+템플릿은 한 번 파싱해 두고(ParsedTemplate) 파일이 바뀔 때만 다시 읽습니다.
+
+사용 예:
+    python watch_folder.py --input ./inbox --output ./outbox
+    python watch_folder.py --input ./inbox --output ./outbox --once          # 한 번만 훑고 종료
+    python watch_folder.py --input ./inbox --output ./outbox --track-pattern "(?i)track"
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import app
+
+MANIFEST_VERSION = 1
+EXCEL_SUFFIXES = {".xlsx", ".xls"}
+TXT_SUFFIXES = {".txt"}
+# 기본 트랙 판별 규칙: 파일명 토큰에 'track' 또는 '트랙'이 있으면 Track
+DEFAULT_TRACK_PATTERN = r"(?i)(^|[_\s])(track|트랙)([_\s]|$)"
+KIND_EXCEL, KIND_NONTRACK, KIND_TRACK = "excel_to_json", "Non Track", "Track"
+
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def classify(path: Path, track_re: "re.Pattern[str]") -> Optional[str]:
+    """변환 종류 결정 (대상이 아니면 None)"""
+    if path.name.startswith(("~$", ".")):  # 엑셀 잠금 파일/숨김 파일
+        return None
+    suffix = path.suffix.lower()
+    if suffix in EXCEL_SUFFIXES:
+        return KIND_EXCEL
+    if suffix in TXT_SUFFIXES:
+        return KIND_TRACK if track_re.search(path.stem) else KIND_NONTRACK
+    return None
+
+
+class Manifest:
+    """입력 상대경로 → {sha256, size, mtime_ns, kind, template_sha256, outputs, status, ...}"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            try:
+                doc = json.loads(path.read_text(encoding="utf-8"))
+                if doc.get("version") == MANIFEST_VERSION:
+                    self.files = doc.get("files", {})
+            except (OSError, json.JSONDecodeError) as e:
+                app.logger.warning(f"manifest 읽기 실패, 새로 시작합니다: {e}")
+
+    def save(self):
+        doc = {"version": MANIFEST_VERSION, "files": self.files}
+        atomic_write_bytes(self.path, json.dumps(doc, ensure_ascii=False, indent=2).encode("utf-8"))
+
+
+class TemplateCache:
+    """종류별 템플릿을 파싱된 상태로 보관하고, 템플릿 파일의 mtime/크기가 바뀔 때만 다시 읽음"""
+
+    def __init__(self, paths: Dict[str, Optional[Path]]):
+        self.paths = paths
+        self._cache: Dict[str, Tuple[Tuple[int, int], app.ParsedTemplate, str]] = {}
+
+    def get(self, kind: str) -> Tuple[app.ParsedTemplate, str]:
+        path = self.paths.get(kind)
+        if path is None or not path.exists():
+            raise FileNotFoundError(f"{kind} 템플릿을 찾을 수 없습니다: {path}")
+        stat = path.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._cache.get(kind)
+        if cached is None or cached[0] != key:
+            data = path.read_bytes()
+            cached = (key, app.ParsedTemplate(data), hashlib.sha256(data).hexdigest())
+            self._cache[kind] = cached
+            app.logger.info(json.dumps({"event": "template_loaded", "kind": kind, "path": str(path)}, ensure_ascii=False))
+        return cached[1], cached[2]
+
+
+class FolderWatcher:
+    def __init__(self, input_dir: Path, output_dir: Path, manifest: Manifest, templates: TemplateCache,
+                 track_pattern: str = DEFAULT_TRACK_PATTERN, recursive: bool = False, settle_seconds: float = 1.0):
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.manifest = manifest
+        self.templates = templates
+        self.track_re = re.compile(track_pattern)
+        self.recursive = recursive
+        self.settle_seconds = settle_seconds
+
+    def iter_candidates(self):
+        it = self.input_dir.rglob("*") if self.recursive else self.input_dir.iterdir()
+        for path in sorted(it):
+            if path.is_file() and not self._is_inside_output(path):
+                kind = classify(path, self.track_re)
+                if kind:
+                    yield path, kind
+
+    def _is_inside_output(self, path: Path) -> bool:
+        try:
+            path.resolve().relative_to(self.output_dir.resolve())
+            return True
+        except ValueError:
+            return False
+
+    def scan_once(self) -> Dict[str, int]:
+        """한 번 훑기: 변경된 파일만 변환 → {converted, skipped, failed, waiting}"""
+        counts = {"converted": 0, "skipped": 0, "failed": 0, "waiting": 0}
+        now = time.time()
+        for path, kind in self.iter_candidates():
+            rel = path.relative_to(self.input_dir).as_posix()
+            stat = path.stat()
+            if now - stat.st_mtime < self.settle_seconds:
+                counts["waiting"] += 1  # 복사 중일 수 있으므로 다음 주기에 처리
+                continue
+            entry = self.manifest.files.get(rel)
+            template_sha = None
+            if kind != KIND_EXCEL:
+                try:
+                    _, template_sha = self.templates.get(kind)
+                except FileNotFoundError as e:
+                    app.logger.warning(f"{rel} 건너뜀 — {e}")
+                    counts["failed"] += 1
+                    continue
+
+            # 1) 크기/mtime이 그대로이고 지난번에 성공했으면 해시 계산 없이 건너뜀 (실패한 파일은 다시 시도)
+            if (entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns
+                    and entry.get("kind") == kind and entry.get("template_sha256") == template_sha
+                    and entry.get("status") == "ok"):
+                counts["skipped"] += 1
+                continue
+            # 2) 내용 해시가 같으면 메타데이터만 갱신
+            digest = file_sha256(path)
+            if (entry and entry.get("sha256") == digest and entry.get("kind") == kind
+                    and entry.get("template_sha256") == template_sha and entry.get("status") == "ok"):
+                entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                self.manifest.save()
+                counts["skipped"] += 1
+                continue
+
+            ok = self.convert(path, rel, kind, digest, stat, template_sha)
+            counts["converted" if ok else "failed"] += 1
+        return counts
+
+    def convert(self, path: Path, rel: str, kind: str, digest: str, stat: os.stat_result,
+                template_sha: Optional[str]) -> bool:
+        timer = app.StageTimer(f"watch:{kind}", rel)
+        out_dir = self.output_dir / Path(rel).parent
+        outputs: List[str] = []
+        status, error = "ok", None
+        try:
+            if kind == KIND_EXCEL:
+                json_str = app.convert_excel_to_json_text(path, timer=timer)
+                out_path = out_dir / f"{path.stem}.json.txt"
+                atomic_write_bytes(out_path, json_str.encode("utf-8"))
+            else:
+                template, _ = self.templates.get(kind)
+                process_fn = app.process_uploaded_txt_track if kind == KIND_TRACK else app.process_uploaded_txt_nontrack
+                with open(path, "rb") as f:
+                    out_name, bio = process_fn(f, template, timer=timer)
+                out_path = out_dir / out_name
+                atomic_write_bytes(out_path, bio.getvalue())
+            outputs.append(out_path.relative_to(self.output_dir).as_posix())
+        except Exception as e:
+            status, error = "error", str(e)
+            app.logger.exception(f"{rel} 변환 실패")
+        timer.emit_log(status=status)
+
+        self.manifest.files[rel] = {
+            "sha256": digest,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "kind": kind,
+            "template_sha256": template_sha,
+            "outputs": outputs,
+            "status": status,
+            "error": error,
+            "processed_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        self.manifest.save()
+        return status == "ok"
+
+    def run_forever(self, interval: float):
+        app.logger.info(json.dumps({"event": "watch_started", "input": str(self.input_dir),
+                                    "output": str(self.output_dir)}, ensure_ascii=False))
+        try:
+            while True:
+                counts = self.scan_once()
+                if counts["converted"] or counts["failed"]:
+                    app.logger.info(json.dumps({"event": "watch_scan", **counts}, ensure_ascii=False))
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            app.logger.info(json.dumps({"event": "watch_stopped"}))
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="감시 폴더 증분 변환 (Excel→JSON, TXT→Non Track/Track)")
+    p.add_argument("--input", type=Path, required=True, help="감시할 입력 폴더")
+    p.add_argument("--output", type=Path, required=True, help="결과를 쓸 폴더")
+    p.add_argument("--manifest", type=Path, help="처리 이력 파일 (기본: <output>/.watch_manifest.json)")
+    p.add_argument("--template-nontrack", type=Path, default=app.TEMPLATE_DIR / app.DEFAULT_TEMPLATE_NONTRACK)
+    p.add_argument("--template-track", type=Path, default=app.TEMPLATE_DIR / app.DEFAULT_TEMPLATE_TRACK)
+    p.add_argument("--track-pattern", default=DEFAULT_TRACK_PATTERN, help="TXT 파일명(확장자 제외)이 맞으면 Track으로 변환할 정규식")
+    p.add_argument("--interval", type=float, default=2.0, help="폴더 확인 주기(초)")
+    p.add_argument("--settle", type=float, default=1.0, help="마지막 수정 후 이 시간(초)이 지나야 처리 (복사 중 파일 보호)")
+    p.add_argument("--recursive", action="store_true", help="하위 폴더까지 감시 (출력은 같은 상대 경로에 생성)")
+    p.add_argument("--once", action="store_true", help="한 번만 훑고 종료")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if not args.input.is_dir():
+        print(f"입력 폴더가 없습니다: {args.input}", file=sys.stderr)
+        return 2
+    args.output.mkdir(parents=True, exist_ok=True)
+    manifest = Manifest(args.manifest or args.output / ".watch_manifest.json")
+    templates = TemplateCache({KIND_NONTRACK: args.template_nontrack, KIND_TRACK: args.template_track})
+    watcher = FolderWatcher(args.input, args.output, manifest, templates,
+                            track_pattern=args.track_pattern, recursive=args.recursive,
+                            settle_seconds=args.settle)
+    if args.once:
+        counts = watcher.scan_once()
+        app.logger.info(json.dumps({"event": "watch_scan", **counts}, ensure_ascii=False))
+        return 1 if counts["failed"] else 0
+    watcher.run_forever(args.interval)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
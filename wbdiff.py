@@ -0,0 +1,414 @@
+# -*- coding: utf-8 -*-
+"""
+워크북 의미 비교 도구 (골든 파일 회귀 확인용)
+
+xlsx 안의 XML 파트를 스트리밍(iterparse)으로 읽어 시트별로
+셀 값, 병합, 글꼴, 맞춤(alignment), 테두리, 열 너비/행 높이를 비교합니다.
+zip 타임스탬프, docProps, 파트 순서, 스타일 인덱스 번호처럼 결과와 무관한 차이는 무시합니다.
+관련 파트의 CRC가 모두 같으면 XML을 읽지 않고 '같음'으로 판정합니다.
+
+사용 예:
+    python wbdiff.py golden.xlsx output.xlsx
+    python wbdiff.py --dirs golden/ outputs/ --workers 8 --report diff_report.json
+종료 코드: 0 = 모두 같음, 1 = 차이 있음, 2 = 읽기 오류
+"""
+import argparse
+import json
+import posixpath
+import re
+import sys
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from xml.etree.ElementTree import iterparse
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+NS_R_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+CELL_REF = re.compile(r"([A-Z]+)(\d+)")
+# 비교에 영향을 주는 파트 (이 파트들의 CRC가 같으면 내용도 같음)
+RELEVANT_PARTS = re.compile(r"^xl/(workbook\.xml|_rels/workbook\.xml\.rels|sharedStrings\.xml|styles\.xml|worksheets/[^/]+\.xml)$")
+
+
+def col_index(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + (ord(ch) - 64)
+    return n
+
+
+def col_letter(idx: int) -> str:
+    s = ""
+    while idx:
+        idx, r = divmod(idx - 1, 26)
+        s = chr(65 + r) + s
+    return s
+
+
+def as_bool(v: Optional[str], default: bool = False) -> bool:
+    if v is None:
+        return default
+    return v.lower() in ("1", "true")
+
+
+def norm_color(el) -> Optional[Tuple]:
+    if el is None:
+        return None
+    rgb = el.get("rgb")
+    if rgb:
+        rgb = rgb.upper()
+        return ("rgb", "FF" + rgb if len(rgb) == 6 else rgb)
+    for key in ("theme", "indexed", "auto"):
+        if el.get(key) is not None:
+            return (key, el.get(key), el.get("tint"))
+    return None
+
+
+def iter_elements(zf: zipfile.ZipFile, part: str, tags: Set[str]) -> Iterator:
+    """part를 스트리밍으로 읽으며 tags에 해당하는 요소가 끝날 때마다 반환 (반환 후 정리해 메모리 유지)"""
+    with zf.open(part) as f:
+        for _, el in iterparse(f, events=("end",)):
+            if el.tag in tags:
+                yield el
+                el.clear()
+
+
+# ==========================
+# 파트 읽기
+# ==========================
+def read_sheet_paths(zf: zipfile.ZipFile) -> List[Tuple[str, str]]:
+    """[(시트명, 워크시트 파트 경로)] — 워크북 순서대로"""
+    targets = {}
+    for el in iter_elements(zf, "xl/_rels/workbook.xml.rels", {NS_REL + "Relationship"}):
+        target = el.get("Target", "")
+        path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+        targets[el.get("Id")] = path
+    sheets = []
+    for el in iter_elements(zf, "xl/workbook.xml", {NS_MAIN + "sheet"}):
+        sheets.append((el.get("name"), targets.get(el.get(NS_R_ID), "")))
+    return sheets
+
+
+def read_shared_strings(zf: zipfile.ZipFile) -> List[str]:
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return []
+    out = []
+    for si in iter_elements(zf, "xl/sharedStrings.xml", {NS_MAIN + "si"}):
+        # 서식 있는 텍스트(r/t)는 이어 붙이고, 발음 표기(rPh)는 제외
+        phonetic = {id(t) for rph in si.iter(NS_MAIN + "rPh") for t in rph.iter(NS_MAIN + "t")}
+        out.append("".join(t.text or "" for t in si.iter(NS_MAIN + "t") if id(t) not in phonetic))
+    return out
+
+
+class StyleTable:
+    """cellXfs 인덱스 → (글꼴, 맞춤, 테두리) 의미 값. 인덱스 번호가 달라도 같은 서식이면 같다고 봅니다."""
+
+    def __init__(self, zf: zipfile.ZipFile):
+        self.fonts: List[Tuple] = []
+        self.borders: List[Tuple] = []
+        self.xfs: List[Tuple] = []
+        if "xl/styles.xml" not in zf.namelist():
+            return
+        section = None
+        with zf.open("xl/styles.xml") as f:
+            for event, el in iterparse(f, events=("start", "end")):
+                tag = el.tag
+                if event == "start":
+                    if tag in (NS_MAIN + "fonts", NS_MAIN + "borders", NS_MAIN + "cellXfs", NS_MAIN + "cellStyleXfs", NS_MAIN + "dxfs"):
+                        section = tag
+                    continue
+                if tag == NS_MAIN + "font" and section == NS_MAIN + "fonts":
+                    self.fonts.append(self._font(el)); el.clear()
+                elif tag == NS_MAIN + "border" and section == NS_MAIN + "borders":
+                    self.borders.append(self._border(el)); el.clear()
+                elif tag == NS_MAIN + "xf" and section == NS_MAIN + "cellXfs":
+                    self.xfs.append(self._xf(el)); el.clear()
+                elif tag in (NS_MAIN + "fonts", NS_MAIN + "borders", NS_MAIN + "cellXfs", NS_MAIN + "cellStyleXfs", NS_MAIN + "dxfs"):
+                    section = None
+
+    @staticmethod
+    def _font(el) -> Tuple:
+        def child(name):
+            return el.find(NS_MAIN + name)
+
+        def flag(name):
+            c = child(name)
+            return c is not None and as_bool(c.get("val"), True)
+
+        name, sz, u, va = child("name"), child("sz"), child("u"), child("vertAlign")
+        return (
+            ("name", name.get("val") if name is not None else None),
+            ("sz", float(sz.get("val")) if sz is not None else None),
+            ("b", flag("b")), ("i", flag("i")), ("strike", flag("strike")),
+            ("u", (u.get("val") or "single") if u is not None else None),
+            ("vertAlign", va.get("val") if va is not None else None),
+            ("color", norm_color(child("color"))),
+        )
+
+    @staticmethod
+    def _border(el) -> Tuple:
+        sides = []
+        for side in ("left", "right", "top", "bottom", "diagonal"):
+            s = el.find(NS_MAIN + side)
+            style = s.get("style") if s is not None else None
+            sides.append((side, style, norm_color(s.find(NS_MAIN + "color")) if (s is not None and style) else None))
+        return tuple(sides)
+
+    @staticmethod
+    def _xf(el) -> Tuple:
+        al = el.find(NS_MAIN + "alignment")
+        alignment = None
+        if al is not None:
+            alignment = (
+                ("horizontal", al.get("horizontal")),
+                ("vertical", al.get("vertical")),
+                ("wrapText", as_bool(al.get("wrapText"))),
+                ("shrinkToFit", as_bool(al.get("shrinkToFit"))),
+                ("textRotation", int(al.get("textRotation") or 0)),
+                ("indent", int(al.get("indent") or 0)),
+            )
+            if all(not v for _, v in alignment):
+                alignment = None
+        return (int(el.get("fontId") or 0), int(el.get("borderId") or 0), alignment)
+
+    def resolve(self, idx: int) -> Tuple:
+        font_id, border_id, alignment = self.xfs[idx] if idx < len(self.xfs) else (0, 0, None)
+        font = self.fonts[font_id] if font_id < len(self.fonts) else None
+        border = self.borders[border_id] if border_id < len(self.borders) else None
+        return (font, alignment, border)
+
+
+class SheetModel:
+    __slots__ = ("cells", "merges", "cols", "rows")
+
+    def __init__(self):
+        self.cells: Dict[Tuple[int, int], Tuple[Any, int]] = {}
+        self.merges: Set[str] = set()
+        self.cols: Dict[int, Tuple] = {}
+        self.rows: Dict[int, Tuple] = {}
+
+
+def read_sheet(zf: zipfile.ZipFile, part: str, sst: List[str]) -> SheetModel:
+    model = SheetModel()
+    tags = {NS_MAIN + "c", NS_MAIN + "row", NS_MAIN + "mergeCell", NS_MAIN + "col"}
+    for el in iter_elements(zf, part, tags):
+        tag = el.tag
+        if tag == NS_MAIN + "c":
+            m = CELL_REF.match(el.get("r") or "")
+            if not m:
+                continue
+            value = cell_value(el, sst)
+            style = int(el.get("s") or 0)
+            model.cells[(int(m.group(2)), col_index(m.group(1)))] = (value, style)
+        elif tag == NS_MAIN + "row":
+            if el.get("ht") is not None or as_bool(el.get("hidden")):
+                model.rows[int(el.get("r"))] = (float(el.get("ht")) if el.get("ht") else None, as_bool(el.get("hidden")))
+        elif tag == NS_MAIN + "mergeCell":
+            model.merges.add(el.get("ref"))
+        elif tag == NS_MAIN + "col":
+            lo, hi = int(el.get("min")), int(el.get("max"))
+            dims = (float(el.get("width")) if el.get("width") else None, as_bool(el.get("hidden")))
+            for c in range(lo, min(hi, lo + 1024) + 1):  # 끝까지 펼친 범위(…16384)는 앞부분만 비교
+                model.cols[c] = dims
+    return model
+
+
+def cell_value(el, sst: List[str]):
+    t = el.get("t")
+    f = el.find(NS_MAIN + "f")
+    if f is not None and f.text:
+        return ("f", f.text)
+    if t == "inlineStr":
+        is_ = el.find(NS_MAIN + "is")
+        return ("s", "".join(x.text or "" for x in is_.iter(NS_MAIN + "t"))) if is_ is not None else None
+    v = el.find(NS_MAIN + "v")
+    if v is None or v.text is None:
+        return None
+    if t == "s":
+        return ("s", sst[int(v.text)])
+    if t in ("str",):
+        return ("s", v.text)
+    if t == "b":
+        return ("b", v.text == "1")
+    if t == "e":
+        return ("e", v.text)
+    try:
+        return ("n", float(v.text))
+    except ValueError:
+        return ("s", v.text)
+
+
+# ==========================
+# 비교
+# ==========================
+def merged_interior_cells(ranges: Set[str]) -> Set[Tuple[int, int]]:
+    cells = set()
+    for ref in ranges:
+        if ":" not in ref:
+            continue
+        (c1, r1), (c2, r2) = (CELL_REF.match(x).groups() for x in ref.split(":"))
+        for r in range(int(r1), int(r2) + 1):
+            for c in range(col_index(c1), col_index(c2) + 1):
+                cells.add((r, c))
+        cells.discard((int(r1), col_index(c1)))
+    return cells
+
+
+def relevant_crcs(zf: zipfile.ZipFile) -> Dict[str, int]:
+    return {i.filename: i.CRC for i in zf.infolist() if RELEVANT_PARTS.match(i.filename)}
+
+
+def diff_workbooks(path_a: Path, path_b: Path, max_diffs: int = 100) -> List[Dict[str, Any]]:
+    diffs: List[Dict[str, Any]] = []
+
+    def add(sheet, kind, where, a, b) -> bool:
+        diffs.append({"sheet": sheet, "kind": kind, "where": where, "a": a, "b": b})
+        return len(diffs) >= max_diffs
+
+    with zipfile.ZipFile(path_a) as za, zipfile.ZipFile(path_b) as zb:
+        if relevant_crcs(za) == relevant_crcs(zb):
+            return []  # 빠른 경로: 관련 파트가 바이트 단위로 같음
+
+        sheets_a, sheets_b = read_sheet_paths(za), read_sheet_paths(zb)
+        names_a, names_b = [n for n, _ in sheets_a], [n for n, _ in sheets_b]
+        if names_a != names_b:
+            if add(None, "sheets", "workbook", names_a, names_b):
+                return diffs
+        sst_a, sst_b = read_shared_strings(za), read_shared_strings(zb)
+        styles_a, styles_b = StyleTable(za), StyleTable(zb)
+        parts_b = dict(sheets_b)
+        resolved_a: Dict[int, Tuple] = {}
+        resolved_b: Dict[int, Tuple] = {}
+
+        def style_a(i):
+            if i not in resolved_a:
+                resolved_a[i] = styles_a.resolve(i)
+            return resolved_a[i]
+
+        def style_b(i):
+            if i not in resolved_b:
+                resolved_b[i] = styles_b.resolve(i)
+            return resolved_b[i]
+
+        default_a, default_b = style_a(0), style_b(0)
+        for name, part_a in sheets_a:
+            if name not in parts_b:
+                continue
+            sa, sb = read_sheet(za, part_a, sst_a), read_sheet(zb, parts_b[name], sst_b)
+
+            if sa.merges != sb.merges:
+                if add(name, "merges", None, sorted(sa.merges - sb.merges), sorted(sb.merges - sa.merges)):
+                    return diffs
+            for c in sorted(set(sa.cols) | set(sb.cols)):
+                if sa.cols.get(c) != sb.cols.get(c):
+                    if add(name, "column", col_letter(c), sa.cols.get(c), sb.cols.get(c)):
+                        return diffs
+            for r in sorted(set(sa.rows) | set(sb.rows)):
+                if sa.rows.get(r) != sb.rows.get(r):
+                    if add(name, "row", r, sa.rows.get(r), sb.rows.get(r)):
+                        return diffs
+
+            # 병합 영역의 좌상단 외 셀은 글꼴/맞춤이 표시되지 않으므로 테두리만 비교
+            covered = merged_interior_cells(sa.merges & sb.merges)
+            for key in sorted(set(sa.cells) | set(sb.cells)):
+                va, ia = sa.cells.get(key, (None, 0))
+                vb, ib = sb.cells.get(key, (None, 0))
+                coord = f"{col_letter(key[1])}{key[0]}"
+                if va != vb:
+                    if add(name, "value", coord, va and va[1], vb and vb[1]):
+                        return diffs
+                fa, aa, ba = style_a(ia) if key in sa.cells else default_a
+                fb, ab, bb = style_b(ib) if key in sb.cells else default_b
+                checks = (("border", ba, bb),) if key in covered else (("font", fa, fb), ("alignment", aa, ab), ("border", ba, bb))
+                for kind, x, y in checks:
+                    if x != y:
+                        if add(name, kind, coord, _jsonable(x), _jsonable(y)):
+                            return diffs
+    return diffs
+
+
+def _jsonable(style_part):
+    """보고용: (키, 값...) 튜플 목록 → 기본값이 아닌 항목만 담은 dict"""
+    if style_part is None:
+        return None
+    out = {}
+    for key, *rest in style_part:
+        value = rest[0] if len(rest) == 1 else list(rest)
+        if value not in (None, False, 0, [None, None]):
+            out[key] = value
+    return out
+
+
+def compare_pair(args: Tuple[str, str, int]) -> Dict[str, Any]:
+    a, b, max_diffs = args
+    try:
+        diffs = diff_workbooks(Path(a), Path(b), max_diffs)
+        return {"a": a, "b": b, "equal": not diffs, "diffs": diffs}
+    except Exception as e:
+        return {"a": a, "b": b, "equal": False, "error": str(e), "diffs": []}
+
+
+def compare_dirs(dir_a: Path, dir_b: Path, workers: int, max_diffs: int) -> Dict[str, Any]:
+    files_a = {p.relative_to(dir_a).as_posix() for p in dir_a.rglob("*.xlsx")}
+    files_b = {p.relative_to(dir_b).as_posix() for p in dir_b.rglob("*.xlsx")}
+    common = sorted(files_a & files_b)
+    jobs = [(str(dir_a / rel), str(dir_b / rel), max_diffs) for rel in common]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(compare_pair, jobs, chunksize=max(1, len(jobs) // (workers * 8))))
+    else:
+        results = [compare_pair(j) for j in jobs]
+    return {
+        "compared": len(results),
+        "equal": sum(1 for r in results if r["equal"]),
+        "different": [r for r in results if not r["equal"]],
+        "only_in_a": sorted(files_a - files_b),
+        "only_in_b": sorted(files_b - files_a),
+    }
+
+
+def format_diff(d: Dict[str, Any]) -> str:
+    where = f"{d['sheet']}!{d['where']}" if d["sheet"] else str(d["where"])
+    return f"[{d['kind']}] {where}: {d['a']!r} → {d['b']!r}"
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="xlsx 의미 비교 (값/병합/글꼴/맞춤/테두리/열·행 크기)")
+    p.add_argument("a", type=Path, help="기준(골든) 워크북 또는 --dirs일 때 폴더")
+    p.add_argument("b", type=Path, help="비교 대상 워크북 또는 --dirs일 때 폴더")
+    p.add_argument("--dirs", action="store_true", help="두 폴더의 같은 상대 경로 xlsx끼리 비교")
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument("--max-diffs", type=int, default=100, help="파일당 최대 차이 보고 수")
+    p.add_argument("--report", type=Path, help="결과 JSON 저장 경로")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.dirs:
+        report = compare_dirs(args.a, args.b, args.workers, args.max_diffs)
+        print(f"비교 {report['compared']}개 — 같음 {report['equal']}, 다름 {len(report['different'])}, "
+              f"a에만 {len(report['only_in_a'])}, b에만 {len(report['only_in_b'])}")
+        for r in report["different"][:20]:
+            print(f"- {r['a']}: {r.get('error') or format_diff(r['diffs'][0])}")
+        if args.report:
+            args.report.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        if any(r.get("error") for r in report["different"]):
+            return 2
+        return 0 if not (report["different"] or report["only_in_a"] or report["only_in_b"]) else 1
+
+    result = compare_pair((str(args.a), str(args.b), args.max_diffs))
+    if args.report:
+        args.report.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    if result.get("error"):
+        print(f"읽기 오류: {result['error']}", file=sys.stderr)
+        return 2
+    for d in result["diffs"]:
+        print(format_diff(d))
+    print("같음" if result["equal"] else f"차이 {len(result['diffs'])}건")
+    return 0 if result["equal"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())